@@ -13,6 +13,10 @@ setup(
         "llama-index-llms-gemini>=0.1.6",
         "chromadb>=0.4.18",
         "python-dotenv>=1.0.0",
+        "onnxruntime>=1.16.0",
+        "tokenizers>=0.15.0",
+        "huggingface-hub>=0.19.0",
+        "numpy>=1.24.0",
         "llama-parse>=0.1.4",
         "PyPDF2>=3.0.1",
         "pdf2image>=1.16.3",
@@ -26,6 +30,7 @@ setup(
         "rich>=13.7.0",
         "tqdm>=4.66.1",
         "pydantic>=2.5.0",
+        "pyyaml>=6.0",
     ],
     entry_points={
         "console_scripts": [
@@ -10,16 +10,11 @@ from rich.console import Console
 from rich.table import Table
 from rich import print as rprint
 
-from .core.registry import Registry
-from .core.chroma_client import ChromaManager
-from .ingestion.pdf_ingestor import PDFIngestor
-from .ingestion.github_ingestor import GitHubIngestor
-from .ingestion.web_ingestor import WebIngestor
-from .query.query_engine import QueryEngine
-from .config import LOG_LEVEL, LOG_FORMAT
-
-# Setup logging
-logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
+from .config import INDEX_PROFILES, LOG_FORMAT, settings
+
+# Heavy modules (chromadb, llama_parse, google.generativeai, GitPython, ...)
+# are imported inside each command so that light commands start instantly.
+
 logger = logging.getLogger(__name__)
 
 # Rich console for pretty output
@@ -66,26 +61,47 @@ def set_default_root(root_path: str) -> bool:
 @click.group()
 def cli():
     """SmartDoc2: LlamaIndex-powered documentation system."""
-    pass
+    # Configured here rather than at import so `--help` never reads .env
+    logging.basicConfig(level=settings.log_level, format=LOG_FORMAT)
+
+
+def run_operation(method: str, **params):
+    """
+    Run a ResourceContext operation, forwarding to the workspace daemon if
+    one is running and falling back to an in-process context otherwise.
+    
+    Only a daemon that cannot be reached falls back; once a request has
+    been sent, a dropped connection is an error, since the daemon may
+    already have done the work.
+    """
+    from .daemon.client import forward, DaemonUnavailable
+    
+    try:
+        return forward(method, **params)
+    except DaemonUnavailable:
+        pass
+    
+    from .context import ResourceContext
+    return ResourceContext().run(method, **params)
 
 
 @cli.command()
 @click.argument('pdf_path', type=click.Path(exists=True))
 @click.option('--no-schematics', is_flag=True, help='Skip schematic analysis')
 @click.option('--query', type=str, help='Query context for better schematic analysis')
-def index_pdf(pdf_path, no_schematics, query):
+@click.option('--resume', is_flag=True, help="Continue an interrupted run from its checkpoint")
+def index_pdf(pdf_path, no_schematics, query, resume):
     """Index a PDF document (datasheet, manual, etc.)."""
     try:
         console.print(f"[bold blue]Indexing PDF:[/bold blue] {pdf_path}")
         
-        registry = Registry()
-        chroma = ChromaManager()
-        ingestor = PDFIngestor(registry, chroma)
-        
-        ingestor.ingest(
-            pdf_path,
+        # Absolute, so a daemon with another working directory finds it
+        run_operation(
+            'index_pdf',
+            pdf_path=str(Path(pdf_path).resolve()),
             analyze_schematics=not no_schematics,
-            query_context=query
+            initial_query=query,
+            resume=resume
         )
         
         console.print(f"[bold green]✓ Successfully indexed:[/bold green] {pdf_path}")
@@ -99,16 +115,13 @@ def index_pdf(pdf_path, no_schematics, query):
 @cli.command()
 @click.argument('repo_url')
 @click.option('--branch', type=str, help='Branch to clone (default: main/master)')
-def fetch_repo(repo_url, branch):
+@click.option('--resume', is_flag=True, help="Continue an interrupted run from its checkpoint (reuses its clone)")
+def fetch_repo(repo_url, branch, resume):
     """Clone and index a GitHub repository."""
     try:
         console.print(f"[bold blue]Fetching repository:[/bold blue] {repo_url}")
         
-        registry = Registry()
-        chroma = ChromaManager()
-        ingestor = GitHubIngestor(registry, chroma)
-        
-        ingestor.ingest(repo_url, branch=branch)
+        run_operation('fetch_repo', repo_url=repo_url, branch=branch, resume=resume)
         
         console.print(f"[bold green]✓ Successfully indexed:[/bold green] {repo_url}")
         
@@ -125,11 +138,7 @@ def web(url):
     try:
         console.print(f"[bold blue]Scraping web page:[/bold blue] {url}")
         
-        registry = Registry()
-        chroma = ChromaManager()
-        ingestor = WebIngestor(registry, chroma)
-        
-        ingestor.ingest(url)
+        run_operation('index_web', url=url)
         
         console.print(f"[bold green]✓ Successfully indexed:[/bold green] {url}")
         
@@ -139,29 +148,109 @@ def web(url):
         raise click.Abort()
 
 
+@cli.command('ingest-batch')
+@click.argument('manifest', type=click.Path(exists=True, dir_okay=False))
+@click.option('--workers', type=click.IntRange(min=1), help='Sources ingested at once (default: manifest, then BATCH_WORKERS)')
+@click.option('--resume', is_flag=True, help="Continue interrupted PDFs and repositories from their checkpoints")
+def ingest_batch(manifest, workers, resume):
+    """Ingest every source listed in a YAML manifest, several at a time."""
+    try:
+        console.print(f"[bold blue]Batch ingestion:[/bold blue] {manifest}")
+
+        # Absolute, so a daemon with another working directory finds it
+        summary = run_operation(
+            'ingest_batch', manifest_path=str(Path(manifest).resolve()), workers=workers, resume=resume
+        )
+
+    except Exception as e:
+        console.print(f"[bold red]✗ Error:[/bold red] {e}")
+        logger.exception("Batch ingestion failed")
+        raise click.Abort()
+
+    status_styles = {'success': 'green', 'skipped': 'yellow', 'failed': 'red', 'cancelled': 'dim'}
+    table = Table(title=f"Batch Ingestion ({summary['workers']} workers)")
+    table.add_column("Type", style="cyan")
+    table.add_column("Source", overflow="fold")
+    table.add_column("Status")
+    table.add_column("Chunks", justify="right")
+    table.add_column("Seconds", justify="right")
+
+    for record in summary['sources']:
+        style = status_styles.get(record['status'], 'white')
+        status = f"[{style}]{record['status']}[/{style}]"
+        if record['error']:
+            status += f"\n[dim]{record['error']}[/dim]"
+        table.add_row(
+            record['type'],
+            record['source'],
+            status,
+            f"{record['chunks']:,}",
+            f"{record['seconds']:.1f}"
+        )
+
+    console.print()
+    console.print(table)
+    console.print(
+        f"\n[bold]{summary['success']}/{summary['total']} indexed[/bold], "
+        f"{summary['chunks']:,} chunks in {summary['seconds']:.1f}s"
+        f" ({summary['skipped']} skipped, {summary['failed']} failed, {summary['cancelled']} cancelled)"
+    )
+    for service, usage in summary['services'].items():
+        console.print(
+            f"[dim]  {service}: {usage['calls']} calls, limit {usage['limit'] or 'none'}, "
+            f"{usage['wait_seconds']:.1f}s waiting for a slot[/dim]"
+        )
+
+    if summary['failed']:
+        raise click.exceptions.Exit(1)
+
+
 @cli.command()
-@click.argument('query_text')
+@click.argument('query_text', required=False)
+@click.option('--batch', 'batch_file', type=click.File('r'), help='Run every query in FILE (one per line) in one batch')
 @click.option('--reprocess', is_flag=True, help='Automatically reprocess schematics if needed')
 @click.option('--source', type=str, help='Filter by source path')
 @click.option('--type', 'source_type', type=click.Choice(['pdf', 'github', 'web']), help='Filter by source type')
-def query(query_text, reprocess, source, source_type):
+def query(query_text, batch_file, reprocess, source, source_type):
     """Query the documentation database."""
+    from .query.query_engine import QueryEngine
+    
+    if bool(query_text) == bool(batch_file):
+        raise click.UsageError("Give either QUERY_TEXT or --batch FILE")
+    
     try:
-        chroma = ChromaManager()
-        registry = Registry()
-        engine = QueryEngine(registry, chroma)
+        if batch_file:
+            query_texts = [line.strip() for line in batch_file if line.strip()]
+            if not query_texts:
+                console.print("[yellow]No queries in batch file.[/yellow]")
+                return
+            
+            all_results = run_operation(
+                'query_many',
+                query_texts=query_texts,
+                source_filter=source,
+                source_type_filter=source_type,
+                reprocess=reprocess
+            )
+            
+            for idx, results in enumerate(all_results, 1):
+                console.print(f"\n[bold]Query {idx}/{len(all_results)}:[/bold] {results['query']}\n")
+                console.print(QueryEngine.format_results(results))
+            return
         
         # Query with filters
-        results = engine.query(
-            query_text,
+        results = run_operation(
+            'query',
+            query_text=query_text,
             source_filter=source,
-            source_type_filter=source_type
+            source_type_filter=source_type,
+            reprocess=reprocess
         )
         
         # Display results
         if results:
             console.print(f"\n[bold]Query:[/bold] {query_text}\n")
-            console.print(engine.format_results(results))
+            console.print(QueryEngine.format_results(results))
         else:
             console.print("[yellow]No results found.[/yellow]")
             
@@ -173,29 +262,41 @@ def query(query_text, reprocess, source, source_type):
 
 @cli.command()
 @click.option('--type', 'source_type', type=click.Choice(['pdf', 'github', 'web', 'all']), default='all')
-def list_sources(source_type):
-    """List all indexed sources."""
+@click.option('--limit', type=click.IntRange(min=1), default=100, show_default=True, help='Sources per page')
+@click.option('--offset', type=click.IntRange(min=0), default=0, help='Sources to skip')
+@click.option('--cursor', type=str, default=None, help='Continue after a previous page (printed below each page)')
+def list_sources(source_type, limit, offset, cursor):
+    """List indexed sources, newest first."""
     try:
-        registry = Registry()
-        
-        if source_type == 'all':
-            sources = registry.list_sources()
-        else:
-            sources = registry.list_sources(source_type=source_type)
+        page = run_operation(
+            'list_sources_page',
+            source_type=None if source_type == 'all' else source_type,
+            limit=limit,
+            cursor=cursor,
+            offset=offset
+        )
+        sources = page['sources']
         
         if not sources:
-            console.print("[yellow]No sources indexed yet.[/yellow]")
+            if page['total']:
+                console.print(f"[yellow]No sources on this page ({page['total']} total).[/yellow]")
+            else:
+                console.print("[yellow]No sources indexed yet.[/yellow]")
             return
         
         # Create table
-        table = Table(title=f"Indexed Sources ({len(sources)} total)")
+        if cursor or page['next_cursor'] or offset:
+            title = f"Indexed Sources ({len(sources)} shown, {page['total']} total)"
+        else:
+            title = f"Indexed Sources ({page['total']} total)"
+        table = Table(title=title)
         table.add_column("#", style="dim")
         table.add_column("Type", style="cyan")
         table.add_column("Source", style="green")
         table.add_column("Indexed", style="blue")
         table.add_column("Status", style="yellow")
         
-        for idx, source in enumerate(sources, 1):
+        for idx, source in enumerate(sources, offset + 1):
             source_type = source.get('source_type', 'unknown')
             source_path = source.get('source_path', 'N/A')
             indexed_at = source.get('indexed_at', 'N/A')
@@ -211,6 +312,9 @@ def list_sources(source_type):
         
         console.print(table)
         
+        if page['next_cursor']:
+            console.print(f"[dim]Next page: smartdoc list-sources --cursor {page['next_cursor']}[/dim]")
+        
     except Exception as e:
         console.print(f"[bold red]✗ Error:[/bold red] {e}")
         logger.exception("Failed to list sources")
@@ -218,38 +322,64 @@ def list_sources(source_type):
 
 
 @cli.command()
-def stats():
+@click.option('--recount', is_flag=True, help='Rebuild the document counters by scanning the collection')
+def stats(recount):
     """Display database statistics."""
     try:
-        registry = Registry()
-        chroma = ChromaManager()
-        
-        # Get stats
-        sources = registry.list_sources()
-        sources_by_type = {}
-        for source in sources:
-            stype = source.get('source_type', 'unknown')
-            sources_by_type[stype] = sources_by_type.get(stype, 0) + 1
-        
-        # ChromaDB stats
-        try:
-            collection = chroma.get_collection()
-            doc_count = collection.count()
-        except:
-            doc_count = 0
+        workspace_stats = run_operation('stats', recount=recount)
         
         # Display stats
         console.print("\n[bold]SmartDoc Workspace Statistics[/bold]")
         console.print("=" * 80)
         
         console.print(f"\n[bold cyan]Registry:[/bold cyan]")
-        console.print(f"  Total sources: {len(sources)}")
+        console.print(f"  Total sources: {workspace_stats['total_sources']}")
         console.print(f"  Sources by type:")
-        for stype, count in sources_by_type.items():
+        for stype, count in workspace_stats['sources_by_type'].items():
             console.print(f"    {stype}: {count}")
         
         console.print(f"\n[bold cyan]ChromaDB:[/bold cyan]")
-        console.print(f"  Total documents: {doc_count}")
+        console.print(f"  Total documents: {workspace_stats['total_documents']}")
+        if workspace_stats.get('documents_by_type'):
+            console.print(f"  Documents by type:")
+            for dtype, count in workspace_stats['documents_by_type'].items():
+                console.print(f"    {dtype}: {count}")
+        index = workspace_stats.get('index')
+        if index:
+            params = ', '.join(f"{k}={v}" for k, v in index.items() if k != 'profile')
+            console.print(f"  Index profile: {index['profile']}" + (f" ({params})" if params else ""))
+        shards = workspace_stats.get('shards') or []
+        if len(shards) > 1:
+            console.print(f"  Collections:")
+            for shard in shards:
+                console.print(f"    {shard['name']}: {shard['documents']}")
+        if workspace_stats.get('counts_stale'):
+            console.print("  [yellow]Per-type counts are out of date; run `smartdoc stats --recount`[/yellow]")
+        
+        storage = workspace_stats.get('storage')
+        if storage:
+            console.print(f"\n[bold cyan]Vector storage:[/bold cyan]")
+            if storage['mode'] == 'compact':
+                console.print(f"  Mode: compact ({storage['full_dims']} → {storage['index_dims']} dims, float16 side store)")
+            else:
+                console.print(f"  Mode: full ({storage['index_dims'] or '-'} dims, float32)")
+            console.print(f"  Disk: {storage['disk_mb']:.1f}MB (ChromaDB {storage['chroma_mb']:.1f}MB, side store {storage['side_store_mb']:.1f}MB)")
+            if storage['index_ram_mb'] is not None:
+                ram = f"  Index RAM (est.): {storage['index_ram_mb']:.1f}MB"
+                if storage['full_index_ram_mb'] != storage['index_ram_mb']:
+                    ram += f" (full vectors: {storage['full_index_ram_mb']:.1f}MB)"
+                console.print(ram)
+            if storage.get('recall') is not None:
+                console.print(
+                    f"  Recall@{storage['recall_k']}: {storage['recall']:.3f} with re-scoring "
+                    f"({storage['recall_without_rescore']:.3f} without; delta {storage['recall'] - 1:+.3f} vs full)"
+                )
+        
+        cache_stats = workspace_stats.get('embedding_cache')
+        if cache_stats:
+            console.print(f"\n[bold cyan]Embedding cache:[/bold cyan]")
+            console.print(f"  Entries: {cache_stats['entries']:,} / {cache_stats['max_entries']:,} ({cache_stats['size_mb']:.1f}MB)")
+            console.print(f"  Hit rate: {cache_stats['hit_rate']:.1%} ({cache_stats['hits']:,} hits, {cache_stats['misses']:,} misses)")
         
         console.print()
         
@@ -259,10 +389,40 @@ def stats():
         raise click.Abort()
 
 
+def _pipeline_table(stages: dict) -> Table:
+    """Per-stage throughput of an ingestion pipeline run (see ingestion.pipeline)."""
+    table = Table(title=f"Pipeline Stages (bottleneck: {stages.get('bottleneck', '?')})")
+    table.add_column("Stage", style="cyan")
+    table.add_column("Workers", justify="right")
+    table.add_column("Items in/out", justify="right")
+    table.add_column("Busy s", justify="right")
+    table.add_column("Blocked s", justify="right")
+    table.add_column("Starved s", justify="right")
+    table.add_column("Items/s", justify="right")
+    table.add_column("Busy %", justify="right")
+
+    for name, stage in stages.items():
+        if not isinstance(stage, dict):
+            continue
+        table.add_row(
+            name,
+            str(stage['workers']),
+            f"{stage['items_in']:,}/{stage['items_out']:,}",
+            f"{stage['busy_seconds']:.2f}",
+            f"{stage['blocked_seconds']:.2f}",
+            f"{stage['starved_seconds']:.2f}",
+            f"{stage['items_per_second']:,.1f}",
+            f"{stage['utilization']:.0%}"
+        )
+    return table
+
+
 @cli.command()
 @click.argument('source_path')
 def logs(source_path):
     """Show processing logs for a source."""
+    from .core.registry import Registry
+    
     try:
         registry = Registry()
         logs = registry.get_processing_logs(source_path)
@@ -295,6 +455,13 @@ def logs(source_path):
             console.print(f"\n[bold][{timestamp}] {step}[/bold]")
             console.print(f"Status: {status_emoji} {status}")
             
+            # Timing
+            if log.get('duration_ms') is not None:
+                timing = f"Time: {log['duration_ms']:,.0f} ms wall"
+                if log.get('cpu_ms') is not None:
+                    timing += f", {log['cpu_ms']:,.0f} ms CPU"
+                console.print(timing)
+            
             # Message
             message = log.get('message')
             if message:
@@ -308,10 +475,38 @@ def logs(source_path):
                     details_dict = json.loads(details) if isinstance(details, str) else details
                     console.print("Details:")
                     for key, value in details_dict.items():
+                        if key == 'stages':
+                            continue
                         console.print(f"  - {key}: {value}")
+                    if isinstance(details_dict.get('stages'), dict):
+                        console.print(_pipeline_table(details_dict['stages']))
                 except:
                     console.print(f"Details: {details}")
         
+        # Profile of the timed steps
+        timed = [log for log in logs if log.get('duration_ms') is not None]
+        if timed:
+            total_ms = sum(log['duration_ms'] for log in timed) or 1.0
+            table = Table(title="Step Profile")
+            table.add_column("Step", style="cyan")
+            table.add_column("Status")
+            table.add_column("Wall ms", justify="right")
+            table.add_column("CPU ms", justify="right")
+            table.add_column("% of total", justify="right")
+            
+            for log in timed:
+                cpu_ms = log.get('cpu_ms')
+                table.add_row(
+                    log.get('step', 'unknown'),
+                    log.get('status', 'unknown'),
+                    f"{log['duration_ms']:,.0f}",
+                    f"{cpu_ms:,.0f}" if cpu_ms is not None else "-",
+                    f"{log['duration_ms'] / total_ms:.0%}"
+                )
+            
+            console.print()
+            console.print(table)
+        
         console.print()
         
     except Exception as e:
@@ -321,10 +516,29 @@ def logs(source_path):
 
 
 @cli.command()
-@click.argument('source_path')
-def remove(source_path):
+@click.argument('source_path', required=False)
+@click.option('--resume', is_flag=True, help='Finish removals that were interrupted')
+def remove(source_path, resume):
     """Remove a source from the database."""
+    from .core.registry import Registry
+    
+    if bool(source_path) == resume:
+        raise click.UsageError("Give either SOURCE_PATH or --resume")
+    
     try:
+        if resume:
+            results = run_operation('resume_removals')
+            if not results:
+                console.print("[dim]No interrupted removals.[/dim]")
+            for result in results:
+                console.print(f"[bold green]✓ Removed:[/bold green] {result['source_path']} "
+                              f"({result['documents_deleted']} documents)")
+            return
+        
+        if not Registry().get_source(source_path):
+            console.print(f"[bold red]✗ Source not found:[/bold red] {source_path}")
+            return
+        
         console.print(f"[bold yellow]Removing source:[/bold yellow] {source_path}")
         
         # Confirm
@@ -332,46 +546,136 @@ def remove(source_path):
             console.print("[dim]Cancelled.[/dim]")
             return
         
-        registry = Registry()
-        chroma = ChromaManager()
-        
-        # Get source info
-        sources = registry.list_sources()
-        source_info = None
-        for s in sources:
-            if s['source_path'] == source_path:
-                source_info = s
-                break
-        
-        if not source_info:
-            console.print(f"[bold red]✗ Source not found:[/bold red] {source_path}")
-            return
-        
-        # Delete from ChromaDB
-        try:
-            collection = chroma.get_collection()
-            results = collection.get(where={"source": source_path})
-            if results['ids']:
-                collection.delete(ids=results['ids'])
-                console.print(f"[green]✓ Deleted {len(results['ids'])} documents from ChromaDB[/green]")
-        except Exception as e:
-            console.print(f"[yellow]⚠ Warning: Could not delete from ChromaDB: {e}[/yellow]")
-        
-        # Delete from registry
-        registry.remove_source(source_path)
+        # Delete chunks (paged), then registry row, schematic cache and logs
+        result = run_operation('remove_source', source_path=source_path)
+        console.print(f"[green]✓ Deleted {result['documents_deleted']} documents from ChromaDB[/green]")
         
         console.print(f"[bold green]✓ Successfully removed:[/bold green] {source_path}")
         
     except Exception as e:
         console.print(f"[bold red]✗ Error:[/bold red] {e}")
+        console.print("[dim]Run `smartdoc remove --resume` to finish an interrupted removal[/dim]")
         logger.exception("Failed to remove source")
         raise click.Abort()
 
 
+@cli.command('rebuild-index')
+@click.option('--profile', type=click.Choice(list(INDEX_PROFILES)), required=True, help='HNSW index profile')
+def rebuild_index(profile):
+    """Rebuild the vector index with another HNSW profile.
+    
+    Copies the stored vectors into a collection created with the profile's
+    parameters; nothing is re-embedded.
+    """
+    try:
+        console.print(f"[bold blue]Rebuilding index with profile:[/bold blue] {profile}")
+        result = run_operation('rebuild_index', profile=profile)
+        console.print(
+            f"[bold green]✓ Rebuilt {result['documents']} documents in {result['collections']} collections[/bold green] "
+            f"({result['previous_profile']} → {result['profile']}, {result['seconds']:.1f}s)"
+        )
+    except Exception as e:
+        console.print(f"[bold red]✗ Error:[/bold red] {e}")
+        logger.exception("Failed to rebuild index")
+        raise click.Abort()
+
+
+@cli.command()
+@click.option('--dims', type=int, default=None, help='Dimensions kept by the PCA projection (default: COMPACT_DIMENSIONS)')
+@click.option('--expand', is_flag=True, help='Go back to full float32 vectors')
+def compact(dims, expand):
+    """Store PCA-reduced vectors to shrink disk and RAM use.
+    
+    Full vectors move to a float16 side store and re-score the top
+    candidates of every query. Re-run after an interruption to finish.
+    """
+    try:
+        if expand:
+            console.print("[bold blue]Restoring full vectors...[/bold blue]")
+            result = run_operation('compact_vectors', expand=True)
+            console.print(
+                f"[bold green]✓ Expanded {result['documents']} documents[/bold green] "
+                f"in {result['collections']} collections ({result['seconds']:.1f}s)"
+            )
+            return
+        
+        console.print("[bold blue]Compacting vectors...[/bold blue]")
+        result = run_operation('compact_vectors', dims=dims)
+        console.print(
+            f"[bold green]✓ Compacted {result['documents']} documents[/bold green] "
+            f"({result['full_dims']} → {result['dims']} dims, {result['seconds']:.1f}s)"
+        )
+        if result.get('recall') is not None:
+            console.print(
+                f"  Recall@{result['recall_k']}: {result['recall']:.3f} with re-scoring, "
+                f"{result['recall_without_rescore']:.3f} without"
+            )
+    except Exception as e:
+        console.print(f"[bold red]✗ Error:[/bold red] {e}")
+        logger.exception("Failed to compact vectors")
+        raise click.Abort()
+
+
+@cli.group()
+def cache():
+    """Inspect and prune the schematic vision cache."""
+
+
+@cache.command('stats')
+def cache_stats():
+    """Show schematic vision cache size and hit rates."""
+    try:
+        stats = run_operation('schematic_cache_stats')
+        
+        console.print("\n[bold]Schematic Vision Cache[/bold]")
+        console.print("=" * 50)
+        max_age = f"{stats['max_age_days']} days" if stats['max_age_days'] else "none"
+        console.print(f"Entries: {stats['entries']:,} / {stats['max_entries']:,} ({stats['size_mb']:.1f}MB, max age {max_age})")
+        console.print(f"Lifetime hits: {stats['total_hits']:,} ({stats['never_hit']:,} entries never hit)")
+        if stats.get('least_recent_use'):
+            console.print(f"Least recently used: {stats['least_recent_use']}")
+        
+        console.print("\n[bold]This process[/bold]")
+        console.print(f"  In memory: {stats['memory_entries']:,} / {stats['memory_max_entries']:,}")
+        console.print(
+            f"  Hit rate: {stats['hit_rate']:.1%} ({stats['memory_hits']:,} from memory, "
+            f"{stats['disk_hits']:,} from disk, {stats['misses']:,} misses)"
+        )
+        console.print()
+    except Exception as e:
+        console.print(f"[bold red]✗ Error:[/bold red] {e}")
+        logger.exception("Failed to get cache stats")
+        raise click.Abort()
+
+
+@cache.command('prune')
+@click.option('--max-entries', type=int, default=None, help='Entries kept (default: SCHEMATIC_CACHE_MAX_ENTRIES)')
+@click.option('--max-age-days', type=float, default=None, help='Drop entries not used for this long (0 = no age limit)')
+def cache_prune(max_entries, max_age_days):
+    """Evict least recently used schematic vision results."""
+    try:
+        result = run_operation('prune_schematic_cache', max_entries=max_entries, max_age_days=max_age_days)
+        console.print(
+            f"[bold green]✓ Pruned {result['expired'] + result['evicted']} entries[/bold green] "
+            f"({result['expired']} expired, {result['evicted']} over the size limit; {result['remaining']} remain)"
+        )
+    except Exception as e:
+        console.print(f"[bold red]✗ Error:[/bold red] {e}")
+        logger.exception("Failed to prune cache")
+        raise click.Abort()
+
+
 @cli.command()
 @click.option('--confirm', is_flag=True, help='Confirm reset without prompting')
 def reset(confirm):
     """Reset the entire database (⚠️ destructive!)."""
+    from .daemon.client import DaemonClient
+    
+    # A daemon keeps the registry (and its WAL) open and would outlive the reset
+    if DaemonClient().is_running():
+        console.print("[bold red]✗ A daemon is running for this workspace.[/bold red] Stop it first: smartdoc daemon --stop")
+        raise click.Abort()
+    
     try:
         if not confirm:
             console.print("[bold red]⚠️  WARNING: This will delete ALL indexed data![/bold red]")
@@ -379,15 +683,28 @@ def reset(confirm):
                 console.print("[dim]Cancelled.[/dim]")
                 return
         
-        from .config import REGISTRY_DB
+        import shutil
+        from .config import CHECKPOINTS_DIR, REGISTRY_DB
+        from .core.chroma_client import ChromaManager
         
-        # Delete registry
+        # Empty the collection
+        ChromaManager().reset_collection()
+        console.print("[green]✓ Cleared ChromaDB collection[/green]")
+        
+        # Delete registry, with its WAL sidecars so nothing is replayed into the next one
         registry_path = Path(REGISTRY_DB)
         if registry_path.exists():
-            os.remove(registry_path)
+            for suffix in ("", "-wal", "-shm"):
+                path = Path(f"{registry_path}{suffix}")
+                if path.exists():
+                    os.remove(path)
             console.print("[green]✓ Deleted registry database[/green]")
         
-        # Reset ChromaDB (will be recreated on next use)
+        # Checkpoints of interrupted ingestions refer to the deleted sources
+        if CHECKPOINTS_DIR.exists():
+            shutil.rmtree(CHECKPOINTS_DIR)
+            console.print("[green]✓ Deleted ingestion checkpoints[/green]")
+        
         console.print("[bold green]✓ Database reset complete[/bold green]")
         console.print("[dim]Run any index command to recreate the database[/dim]")
         
@@ -397,6 +714,54 @@ def reset(confirm):
         raise click.Abort()
 
 
+@cli.command()
+@click.option('--stop', is_flag=True, help='Stop the daemon running for this workspace')
+@click.option('--status', is_flag=True, help='Show whether a daemon is running for this workspace')
+@click.option('--no-warm', is_flag=True, help='Skip preloading the collection and embedding model')
+def daemon(stop, status, no_warm):
+    """Run a persistent daemon that keeps this workspace warm.
+    
+    While it runs, query, list-sources, stats and the indexing commands
+    are forwarded to it over a Unix socket. Set SMARTDOC_NO_DAEMON=1 to
+    bypass it.
+    """
+    from .daemon.client import DaemonClient, DaemonError, DaemonUnavailable
+    
+    client = DaemonClient()
+    
+    if stop or status:
+        try:
+            info = client.call('ping')
+        except DaemonUnavailable:
+            console.print("[yellow]No daemon running for this workspace.[/yellow]")
+            return
+        except DaemonError as e:
+            console.print(f"[bold red]✗ Daemon not responding:[/bold red] {e}")
+            raise click.Abort()
+        
+        if stop:
+            client.call('shutdown')
+            console.print(f"[bold green]✓ Stopped daemon[/bold green] (pid {info['pid']})")
+        else:
+            console.print(f"[bold green]● Daemon running[/bold green] (pid {info['pid']})")
+            console.print(f"  Socket:   {info['socket']}")
+            console.print(f"  Uptime:   {info['uptime_s']}s")
+            console.print(f"  Requests: {info['requests_served']}")
+        return
+    
+    from .daemon.server import DaemonServer
+    
+    server = DaemonServer()
+    console.print(f"[bold blue]Starting SmartDoc daemon[/bold blue] on {server.path}")
+    try:
+        server.serve_forever(warm=not no_warm)
+    except KeyboardInterrupt:
+        console.print("\n[dim]Daemon stopped.[/dim]")
+    except Exception as e:
+        console.print(f"[bold red]✗ Error:[/bold red] {e}")
+        raise click.Abort()
+
+
 @cli.command()
 @click.argument('root_path')
 def set_root(root_path):
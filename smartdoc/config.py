@@ -1,13 +1,23 @@
 """
 Configuration settings for SmartDoc2.
+
+Importing this module is side-effect free: paths and tuning constants are
+plain module attributes. Anything that touches the disk or the environment
+is deferred until first real use:
+
+- ``workspace.bootstrap()`` creates the ``.smartdoc_*`` tree, the registry
+  schema and the ``.env`` template (once per process).
+- ``settings`` loads the workspace ``.env`` and resolves API keys on first
+  attribute access.
 """
 
 import os
 import sys
+import threading
 import warnings
 import sqlite3
 from pathlib import Path
-from dotenv import load_dotenv  # pyright: ignore[reportMissingImports]
+from typing import Any, Dict, Optional, Tuple
 
 # Suppress noisy SSL warnings from urllib3
 warnings.filterwarnings('ignore', message='urllib3 v2 only supports OpenSSL')
@@ -16,92 +26,7 @@ warnings.filterwarnings('ignore', message='urllib3 v2 only supports OpenSSL')
 INSTALL_DIR = Path(__file__).parent.parent  # SmartDoc installation directory
 BASE_DIR = INSTALL_DIR  # Alias for compatibility
 
-# Workspace directory - dynamically named based on current working directory
-# Example: If user runs smartdoc in "MyProject" -> creates ".smartdoc_myproject"
-WORKSPACE_ROOT = Path(os.getcwd())
-PROJECT_NAME = WORKSPACE_ROOT.name.lower().replace(" ", "_").replace("-", "_")
-WORKSPACE_DIR = WORKSPACE_ROOT / f".smartdoc_{PROJECT_NAME}"
-DATA_DIR = WORKSPACE_DIR  # Alias for compatibility
-PDFS_DIR = WORKSPACE_DIR / "pdfs"
-TEMP_DIR = WORKSPACE_DIR / "temp"
-CHROMA_DIR = WORKSPACE_DIR / "chroma_db"
-
-# Track if this is first initialization
-_is_new_workspace = not WORKSPACE_DIR.exists()
-
-# Ensure workspace directory exists
-WORKSPACE_DIR.mkdir(parents=True, exist_ok=True)
-
-# Ensure directories exist
-PDFS_DIR.mkdir(parents=True, exist_ok=True)
-TEMP_DIR.mkdir(parents=True, exist_ok=True)
-CHROMA_DIR.mkdir(parents=True, exist_ok=True)
-
-# Registry Database path
-REGISTRY_DB = str(WORKSPACE_DIR / "registry.db")
-
-# Auto-initialize empty registry database if it doesn't exist
-# This allows web-manager to discover empty workspaces
-if not Path(REGISTRY_DB).exists():
-    try:
-        conn = sqlite3.connect(REGISTRY_DB)
-        cursor = conn.cursor()
-        
-        # Sources table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS sources (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                source_type TEXT NOT NULL,
-                source_path TEXT NOT NULL UNIQUE,
-                indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                file_size INTEGER,
-                status TEXT DEFAULT 'pending',
-                metadata TEXT,
-                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Schematic cache table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS schematic_cache (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                source_id INTEGER NOT NULL,
-                image_hash TEXT NOT NULL,
-                page_number INTEGER,
-                last_query TEXT,
-                vision_result TEXT,
-                analyzed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY(source_id) REFERENCES sources(id) ON DELETE CASCADE,
-                UNIQUE(image_hash, last_query)
-            )
-        """)
-        
-        # Processing logs table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS processing_logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                source_id INTEGER NOT NULL,
-                step TEXT NOT NULL,
-                status TEXT NOT NULL,
-                message TEXT,
-                details TEXT,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY(source_id) REFERENCES sources(id) ON DELETE CASCADE
-            )
-        """)
-        
-        conn.commit()
-    except sqlite3.Error as e:
-        print(f"⚠️  Failed to initialize registry database: {e}", file=sys.stderr)
-    finally:
-        if 'conn' in locals():
-            conn.close()
-
-# Auto-create .env file in workspace if it doesn't exist
-ENV_FILE = WORKSPACE_DIR / ".env"
-_env_created = False
-if not ENV_FILE.exists():
-    env_template = """# SmartDoc2 API Keys
+ENV_TEMPLATE = """# SmartDoc2 API Keys
 # Get your API keys from:
 #   - GEMINI_API_KEY: https://makersuite.google.com/app/apikey
 #   - LLAMAPARSE_API_KEY: https://cloud.llamaindex.ai/parse (optional)
@@ -119,71 +44,217 @@ GITHUB_TOKEN=your_github_token_here
 # Optional: Logging level (DEBUG, INFO, WARNING, ERROR)
 LOG_LEVEL=INFO
 """
-    ENV_FILE.write_text(env_template)
-    _env_created = True
-
-# Show initialization summary and ask about .cursorrules
-if _is_new_workspace and _env_created:
-    print(f"\n{'='*70}")
-    print(f"🚀 SmartDoc workspace initialized: {WORKSPACE_DIR.name}/")
-    print(f"{'='*70}")
-    print(f"  📁 Workspace: {WORKSPACE_DIR}")
-    print(f"  🔑 API keys:  {WORKSPACE_DIR.name}/.env")
-    print(f"{'='*70}")
-    
-    # Ask about .cursorrules
-    CURSORRULES_SOURCE = INSTALL_DIR / ".cursorrules"
-    CURSORRULES_DEST = WORKSPACE_ROOT / ".cursorrules"
-    
-    if CURSORRULES_SOURCE.exists() and not CURSORRULES_DEST.exists():
-        print(f"\n📋 Cursor AI Integration:")
-        print(f"   SmartDoc includes .cursorrules for natural language commands")
-        print(f"   (enables: 'Index PDF', 'Query SmartDoc', hardware file discovery)")
-        
-        # Only prompt if stdin is available (not in non-interactive mode)
-        if sys.stdin.isatty():
-            try:
-                response = input(f"\n   Create .cursorrules in this project? [Y/n]: ").strip().lower()
-                if response in ['', 'y', 'yes']:
-                    CURSORRULES_DEST.write_text(CURSORRULES_SOURCE.read_text())
-                    print(f"   ✓ Created .cursorrules")
-                    print(f"   → Cursor AI will now use SmartDoc integration")
-                else:
-                    print(f"   ⊘ Skipped .cursorrules")
-                    print(f"   → Add later: cp {CURSORRULES_SOURCE} ./")
-            except (EOFError, KeyboardInterrupt):
-                print(f"\n   ⊘ Skipped .cursorrules (interrupted)")
-        else:
-            # Non-interactive mode (scripts, CI/CD)
-            print(f"   → Add later: cp {CURSORRULES_SOURCE} ./")
-    elif CURSORRULES_DEST.exists():
-        print(f"\n📋 Cursor AI: .cursorrules already exists")
-    
-    print(f"\n{'='*70}")
-    print(f"⚡ Quick Start:")
-    print(f"{'='*70}")
-    print(f"  1. Add API keys:    nano {WORKSPACE_DIR.name}/.env")
-    print(f"  2. Index PDF:       smartdoc index-pdf <path>")
-    print(f"  3. Query database:  smartdoc query \"your question\"")
-    print(f"  4. View help:       smartdoc --help")
-    print(f"{'='*70}\n")
-
-# Load environment variables from workspace
-load_dotenv(dotenv_path=ENV_FILE)
-
-# API Keys
-LLAMAPARSE_API_KEY = os.getenv("LLAMAPARSE_API_KEY")
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+
+
+class Workspace:
+    """
+    Handle on the per-project ``.smartdoc_*`` directory.
+
+    The workspace is named after the directory smartdoc runs in
+    (e.g. "MyProject" -> ".smartdoc_myproject"). Computing its paths is
+    free; ``bootstrap()`` performs the on-disk initialization exactly once.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.project_name = root.name.lower().replace(" ", "_").replace("-", "_")
+        self.dir = root / f".smartdoc_{self.project_name}"
+        self.pdfs_dir = self.dir / "pdfs"
+        self.temp_dir = self.dir / "temp"
+        self.chroma_dir = self.dir / "chroma_db"
+        self.checkpoints_dir = self.dir / "checkpoints"
+        self.registry_db = str(self.dir / "registry.db")
+        self.embedding_cache_db = str(self.dir / "embedding_cache.db")
+        self.env_file = self.dir / ".env"
+        self._bootstrapped = False
+        self._lock = threading.Lock()
+
+    @property
+    def exists(self) -> bool:
+        """True if the workspace directory has been created."""
+        return self.dir.exists()
+
+    def bootstrap(self) -> "Workspace":
+        """
+        Create the workspace tree, registry and ``.env`` template if missing.
+
+        Safe to call from every entry point; only the first call per process
+        does any work.
+
+        Returns:
+            The workspace itself, for chaining
+        """
+        if self._bootstrapped:
+            return self
+
+        with self._lock:
+            if self._bootstrapped:
+                return self
+
+            is_new_workspace = not self.dir.exists()
+
+            for directory in (self.dir, self.pdfs_dir, self.temp_dir, self.chroma_dir):
+                directory.mkdir(parents=True, exist_ok=True)
+
+            # Auto-initialize empty registry database if it doesn't exist
+            # This allows web-manager to discover empty workspaces
+            if not Path(self.registry_db).exists():
+                self._init_registry()
+
+            env_created = False
+            if not self.env_file.exists():
+                self.env_file.write_text(ENV_TEMPLATE)
+                env_created = True
+
+            if is_new_workspace and env_created:
+                self._print_welcome()
+
+            self._bootstrapped = True
+
+        return self
+
+    def _init_registry(self):
+        """Create the registry schema in a fresh database."""
+        from .core.migrations import migrate
+
+        conn = None
+        try:
+            conn = sqlite3.connect(self.registry_db)
+            migrate(conn)
+        except sqlite3.Error as e:
+            print(f"⚠️  Failed to initialize registry database: {e}", file=sys.stderr)
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def _print_welcome(self):
+        """Show initialization summary and ask about .cursorrules."""
+        print(f"\n{'='*70}")
+        print(f"🚀 SmartDoc workspace initialized: {self.dir.name}/")
+        print(f"{'='*70}")
+        print(f"  📁 Workspace: {self.dir}")
+        print(f"  🔑 API keys:  {self.dir.name}/.env")
+        print(f"{'='*70}")
+
+        # Ask about .cursorrules
+        cursorrules_source = INSTALL_DIR / ".cursorrules"
+        cursorrules_dest = self.root / ".cursorrules"
+
+        if cursorrules_source.exists() and not cursorrules_dest.exists():
+            print(f"\n📋 Cursor AI Integration:")
+            print(f"   SmartDoc includes .cursorrules for natural language commands")
+            print(f"   (enables: 'Index PDF', 'Query SmartDoc', hardware file discovery)")
+
+            # Only prompt if stdin is available (not in non-interactive mode)
+            if sys.stdin.isatty():
+                try:
+                    response = input(f"\n   Create .cursorrules in this project? [Y/n]: ").strip().lower()
+                    if response in ['', 'y', 'yes']:
+                        cursorrules_dest.write_text(cursorrules_source.read_text())
+                        print(f"   ✓ Created .cursorrules")
+                        print(f"   → Cursor AI will now use SmartDoc integration")
+                    else:
+                        print(f"   ⊘ Skipped .cursorrules")
+                        print(f"   → Add later: cp {cursorrules_source} ./")
+                except (EOFError, KeyboardInterrupt):
+                    print(f"\n   ⊘ Skipped .cursorrules (interrupted)")
+            else:
+                # Non-interactive mode (scripts, CI/CD)
+                print(f"   → Add later: cp {cursorrules_source} ./")
+        elif cursorrules_dest.exists():
+            print(f"\n📋 Cursor AI: .cursorrules already exists")
+
+        print(f"\n{'='*70}")
+        print(f"⚡ Quick Start:")
+        print(f"{'='*70}")
+        print(f"  1. Add API keys:    nano {self.dir.name}/.env")
+        print(f"  2. Index PDF:       smartdoc index-pdf <path>")
+        print(f"  3. Query database:  smartdoc query \"your question\"")
+        print(f"  4. View help:       smartdoc --help")
+        print(f"{'='*70}\n")
+
+
+class Settings:
+    """
+    Environment-backed settings, resolved lazily.
+
+    The workspace ``.env`` is loaded the first time any setting is read, so
+    commands that never need an API key never pay for python-dotenv.
+    """
+
+    # attribute -> (environment variable, default)
+    _ENV_KEYS: Dict[str, Tuple[str, Optional[str]]] = {
+        'llamaparse_api_key': ("LLAMAPARSE_API_KEY", None),
+        'gemini_api_key': ("GEMINI_API_KEY", None),
+        'github_token': ("GITHUB_TOKEN", None),
+        'log_level': ("LOG_LEVEL", "INFO"),
+    }
+
+    def __init__(self, env_file: Path):
+        self.env_file = env_file
+        self._values: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+
+    def _resolve(self) -> Dict[str, Any]:
+        """Load the workspace .env (if present) and snapshot the environment."""
+        if self._values is None:
+            with self._lock:
+                if self._values is None:
+                    if self.env_file.exists():
+                        from dotenv import load_dotenv  # pyright: ignore[reportMissingImports]
+                        load_dotenv(dotenv_path=self.env_file)
+                    self._values = {
+                        attr: os.getenv(env_var, default)
+                        for attr, (env_var, default) in self._ENV_KEYS.items()
+                    }
+        return self._values
+
+    def __getattr__(self, name: str) -> Any:
+        if name in Settings._ENV_KEYS:
+            return self._resolve()[name]
+        raise AttributeError(f"'Settings' object has no attribute '{name}'")
+
+    def reload(self):
+        """Forget resolved values so the next access re-reads the environment."""
+        with self._lock:
+            self._values = None
+
+
+# Workspace directory - dynamically named based on current working directory
+workspace = Workspace(Path(os.getcwd()))
+settings = Settings(workspace.env_file)
+
+WORKSPACE_ROOT = workspace.root
+PROJECT_NAME = workspace.project_name
+WORKSPACE_DIR = workspace.dir
+DATA_DIR = WORKSPACE_DIR  # Alias for compatibility
+PDFS_DIR = workspace.pdfs_dir
+TEMP_DIR = workspace.temp_dir
+CHROMA_DIR = workspace.chroma_dir
+CHECKPOINTS_DIR = workspace.checkpoints_dir
+ENV_FILE = workspace.env_file
+
+# Registry Database path
+REGISTRY_DB = workspace.registry_db
+EMBEDDING_CACHE_DB = workspace.embedding_cache_db
 
 # File Size Limits (bytes)
 MAX_FILE_SIZE_WARNING = 5 * 1024 * 1024  # 5MB
 MAX_FILE_SIZE_HARD = 50 * 1024 * 1024    # 50MB
 
 # Chunking Settings
-CHUNK_SIZE = 1024
-CHUNK_OVERLAP = 200
-CODE_CHUNK_SIZE = 512  # Smaller for code to preserve functions
+CHUNK_SIZE = 256       # Tokens per text chunk (capped at EMBEDDING_MAX_LENGTH)
+CHUNK_OVERLAP = 48     # Tokens repeated between consecutive chunks (at most half a chunk)
+CHUNK_SIZING = "tokenizer"   # "tokenizer" (embedding model's, exact) | "approximate" (characters)
+CHUNK_CHARS_PER_TOKEN = 4.0  # Estimate used by approximate sizing
+CODE_CHUNK_SIZE = 512  # Characters; smaller for code to preserve functions
+
+# Registry Settings
+REGISTRY_CACHE_KB = 8192        # SQLite page cache per registry connection
+REGISTRY_BUSY_TIMEOUT = 30.0    # Seconds to wait for another writer's lock
+REGISTRY_STATEMENT_CACHE = 256  # Prepared statements kept per connection
+LOG_BUFFER_SIZE = 100           # Processing log entries buffered before a forced flush
+LOG_FLUSH_INTERVAL = 2.0        # Seconds a buffered log entry may wait before being written
 
 # Query Settings
 CONFIDENCE_THRESHOLD = 0.6  # Trigger vision reprocessing below this
@@ -193,7 +264,41 @@ RERANK_TOP_N = 3  # Number of results to return after reranking
 # ChromaDB Settings
 CHROMA_PERSIST_DIR = str(CHROMA_DIR)
 COLLECTION_NAME = "smartdoc_workspace"
+CHROMA_MAX_CLIENTS = 8  # Open ChromaDB clients per process (least recently used closed first)
+CHROMA_SHARDING = "none"           # Split new chunks across collections: "source_type", "size" or "none" (opt in)
+CHROMA_SHARD_MAX_CHUNKS = 250_000  # A shard rolls over to a new collection at this many chunks
+SHARD_QUERY_WORKERS = 4            # Shards searched concurrently by one query
 EMBEDDING_MODEL = "BAAI/bge-small-en-v1.5"  # Fast and efficient
+EMBEDDING_QUANTIZE = False   # Run an int8-quantized copy of the model (faster, slightly less accurate)
+EMBEDDING_BATCH_SIZE = 32    # Texts per inference call
+EMBEDDING_THREADS = 0        # ONNX Runtime intra-op threads (0 = all cores)
+EMBEDDING_MAX_LENGTH = 512   # Tokens per text (model limit)
+MODELS_CACHE_DIR = Path.home() / ".cache" / "smartdoc" / "models"  # Shared across workspaces
+EMBEDDING_CACHE_ENABLED = True         # Reuse vectors of unchanged chunks across re-ingests
+EMBEDDING_CACHE_MAX_ENTRIES = 100_000  # ~150MB at 384 dims; least recently used evicted first
+ADD_BATCH_SIZE = 256     # Chunks embedded and written per batch
+BULK_BATCH_SIZE = 2048   # Batch size in bulk-load mode
+BULK_THRESHOLD = 5000    # Ingests with at least this many chunks use bulk mode
+STATS_PAGE_SIZE = 5000   # Metadata rows per page when recounting statistics
+DELETE_PAGE_SIZE = 1000  # IDs fetched and deleted per round trip when removing a source
+REBUILD_PAGE_SIZE = 1000 # Chunks copied per round trip by `smartdoc rebuild-index`
+PIPELINE_QUEUE_SIZE = 8     # Items buffered between two ingestion pipeline stages
+PIPELINE_CHUNK_WORKERS = 2  # Threads reading and chunking files/pages concurrently
+
+# HNSW index profiles (fixed when a collection is created; change with `smartdoc rebuild-index`)
+INDEX_PROFILES = {
+    "fast": {"space": "cosine", "M": 8, "construction_ef": 64, "search_ef": 16},
+    "balanced": {"space": "cosine", "M": 16, "construction_ef": 128, "search_ef": 64},
+    "accurate": {"space": "cosine", "M": 32, "construction_ef": 256, "search_ef": 200},
+}
+INDEX_PROFILE = "balanced"  # Profile for new collections
+
+# Compact vector storage (`smartdoc compact`): PCA-reduced vectors in ChromaDB,
+# full vectors as float16 in a side store, top candidates re-scored at full precision
+COMPACT_DIMENSIONS = 128      # Dimensions kept by the projection
+COMPACT_RESCORE_FACTOR = 4    # Candidates fetched per requested result before re-scoring
+COMPACT_FIT_SAMPLE = 50_000   # Stored vectors sampled to fit the projection
+COMPACT_EVAL_QUERIES = 200    # Sampled queries for the recall measurement
 
 # GitHub Settings
 GITHUB_EXTENSIONS = [".cpp", ".h", ".ino", ".c", ".hpp", ".cc", ".cxx", ".md", ".txt", ".rst"]
@@ -208,7 +313,37 @@ GEMINI_MODEL = "gemini-2.5-pro"  # Gemini 2.5 Pro (stable, released June 2025)
 GEMINI_TEMPERATURE = 0.1  # Low temperature for technical accuracy
 VISION_MAX_RETRIES = 3
 VISION_CACHE_ENABLED = True
+SCHEMATIC_MEMORY_ENTRIES = 256         # Vision results kept in process for repeated questions
+SCHEMATIC_CACHE_MAX_ENTRIES = 5_000    # Cached vision results on disk; least recently hit evicted first
+SCHEMATIC_CACHE_MAX_AGE_DAYS = 180     # Drop results not hit for this long (0 = keep forever)
+
+# Server Settings (MCP server and daemon)
+QUERY_WORKERS = 4   # Concurrent queries
+INGEST_WORKERS = 2  # Concurrent background ingestion jobs
+BATCH_WORKERS = 4   # Sources ingested concurrently by `smartdoc ingest-batch`
+
+# Concurrent calls per external service, shared by every ingestion in the process
+SERVICE_CONCURRENCY = {
+    "llamaparse": 2,
+    "gemini": 2,
+    "github": 4,
+    "web": 8,
+}
 
 # Logging
-LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Environment-backed names kept importable for compatibility; they resolve
+# through `settings` on first access instead of at import time.
+_LAZY_SETTINGS = {
+    'LLAMAPARSE_API_KEY': 'llamaparse_api_key',
+    'GEMINI_API_KEY': 'gemini_api_key',
+    'GITHUB_TOKEN': 'github_token',
+    'LOG_LEVEL': 'log_level',
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_SETTINGS:
+        return getattr(settings, _LAZY_SETTINGS[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,342 @@
+"""
+Long-lived SmartDoc resources for one workspace.
+
+A ResourceContext owns the Registry, ChromaManager and QueryEngine and
+exposes the high-level operations (query, list, stats, ingest) that the
+CLI, the daemon and the MCP server share. Everything is constructed on
+first use and kept for the lifetime of the context.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class ResourceContext:
+    """Lazily constructed, reusable Registry/ChromaManager/QueryEngine."""
+
+    # Read-only operations that may be retried after reopening resources
+    RETRYABLE = ('query', 'query_many', 'list_sources', 'list_sources_page', 'stats')
+
+    def __init__(self, interactive: bool = True):
+        """
+        Args:
+            interactive: Whether ingestors may prompt on stdin; False in
+                servers, whose stdin is not a user's terminal
+        """
+        self.interactive = interactive
+        self._registry = None
+        self._chroma = None
+        self._engine = None
+        self._lock = threading.RLock()
+        self.warmup_seconds: Optional[float] = None
+
+    @property
+    def registry(self):
+        """Source registry (created on first use)."""
+        if self._registry is None:
+            with self._lock:
+                if self._registry is None:
+                    from .core.registry import Registry
+                    self._registry = Registry()
+        return self._registry
+
+    @property
+    def chroma(self):
+        """ChromaDB manager (created on first use)."""
+        if self._chroma is None:
+            with self._lock:
+                if self._chroma is None:
+                    from .core.chroma_client import ChromaManager
+                    self._chroma = ChromaManager(registry=self.registry)
+        return self._chroma
+
+    @property
+    def engine(self):
+        """Query engine (created on first use)."""
+        if self._engine is None:
+            with self._lock:
+                if self._engine is None:
+                    from .query.query_engine import QueryEngine
+                    self._engine = QueryEngine(self.registry, self.chroma)
+        return self._engine
+
+    def warm(self):
+        """
+        Open every resource up front.
+
+        Runs a throwaway query so the collection and its embedding model are
+        loaded before the first real request arrives.
+        """
+        start = time.perf_counter()
+        _ = self.registry
+        _ = self.chroma.collection
+        _ = self.engine
+        try:
+            self.chroma.query("warmup", n_results=1)
+        except Exception as e:
+            logger.debug(f"Warmup query failed (empty collection?): {e}")
+        self.warmup_seconds = time.perf_counter() - start
+
+    def reset(self):
+        """Drop every resource; the next access reopens them."""
+        with self._lock:
+            self._registry = None
+            self._chroma = None
+            self._engine = None
+
+    def with_reconnect(self, operation: Callable[["ResourceContext"], T]) -> T:
+        """
+        Run `operation(self)`, reopening all resources and retrying once if it fails.
+
+        Only use for idempotent reads: a long-lived process can outlive a
+        deleted or replaced workspace store, and a fresh client recovers.
+        """
+        try:
+            return operation(self)
+        except Exception as e:
+            logger.warning(f"Operation failed ({e}); reopening resources and retrying")
+            self.reset()
+            return operation(self)
+
+    def run(self, method: str, **params) -> Any:
+        """Run a named operation, with reconnect for the read-only ones."""
+        if method in self.RETRYABLE:
+            return self.with_reconnect(lambda ctx: getattr(ctx, method)(**params))
+        return getattr(self, method)(**params)
+
+    def ingestor(self, source_type: str, job=None):
+        """
+        Create an ingestor for 'pdf', 'github' or 'web' sharing this context's stores.
+
+        Args:
+            source_type: Kind of source
+            job: Optional smartdoc.jobs.Job; wires progress reporting and
+                cancellation, and disables stdin prompts
+        """
+        if source_type == 'pdf':
+            from .ingestion.pdf_ingestor import PDFIngestor
+            ingestor = PDFIngestor(self.registry, self.chroma)
+        elif source_type == 'github':
+            from .ingestion.github_ingestor import GitHubIngestor
+            ingestor = GitHubIngestor(self.registry, self.chroma)
+        elif source_type == 'web':
+            from .ingestion.web_ingestor import WebIngestor
+            ingestor = WebIngestor(self.registry, self.chroma)
+        else:
+            raise ValueError(f"Unknown source type: {source_type}")
+
+        ingestor.interactive = self.interactive
+        if job is not None:
+            ingestor.progress_callback = job.update
+            ingestor.cancel_event = job.cancel_event
+            ingestor.interactive = False
+        return ingestor
+
+    # Operations (all return JSON-serializable values)
+
+    def query(
+        self,
+        query_text: str,
+        source_filter: Optional[str] = None,
+        source_type_filter: Optional[str] = None,
+        reprocess: bool = False
+    ) -> Dict[str, Any]:
+        """Query the knowledge base, optionally with schematic reprocessing."""
+        if reprocess:
+            return self.engine.query_with_reprocess(query_text)
+        return self.engine.query(
+            query_text,
+            source_filter=source_filter,
+            source_type_filter=source_type_filter
+        )
+
+    def query_many(
+        self,
+        query_texts: List[str],
+        source_filter: Optional[str] = None,
+        source_type_filter: Optional[str] = None,
+        reprocess: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Query the knowledge base with several questions in one batched search."""
+        results = self.engine.query_many(
+            query_texts,
+            source_filter=source_filter,
+            source_type_filter=source_type_filter
+        )
+        if reprocess:
+            results = [
+                self.engine.query_with_reprocess(result['query'], initial_results=result)
+                for result in results
+            ]
+        return results
+    
+    def list_sources(self, source_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """List indexed sources, optionally filtered by type."""
+        return self.registry.list_sources(source_type=source_type)
+    
+    def list_sources_page(
+        self,
+        source_type: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        offset: int = 0
+    ) -> Dict[str, Any]:
+        """One page of indexed sources plus the total matching count."""
+        page = self.registry.list_sources_page(
+            source_type=source_type, limit=limit, cursor=cursor, offset=offset
+        )
+        page['total'] = self.registry.count_sources(source_type)
+        return page
+
+    def stats(self, recount: bool = False) -> Dict[str, Any]:
+        """
+        Source and document counts, vector storage figures and embedding
+        cache stats.
+        
+        Document counts come from the registry's chunk counters; `recount`
+        rebuilds them by paging through the collection first.
+        """
+        sources_by_type = self.registry.count_sources_by_type()
+        
+        if recount:
+            chunk_stats = self.chroma.recount()
+        else:
+            chunk_stats = self.registry.get_chunk_stats()
+        
+        try:
+            shards = self.chroma.shard_info()
+            doc_count = sum(shard['documents'] for shard in shards)
+        except Exception as e:
+            logger.warning(f"Could not count ChromaDB documents: {e}")
+            shards = None
+            doc_count = chunk_stats['total_documents']
+        
+        try:
+            index = self.chroma.index_info()
+        except Exception as e:
+            logger.warning(f"Could not read index settings: {e}")
+            index = None
+        
+        try:
+            storage = self.chroma.storage_info()
+        except Exception as e:
+            logger.warning(f"Could not read vector storage figures: {e}")
+            storage = None
+        
+        try:
+            cache = self.chroma.embedding_cache
+            cache_stats = cache.stats() if cache is not None else None
+        except Exception as e:
+            logger.warning(f"Could not read embedding cache stats: {e}")
+            cache_stats = None
+        
+        return {
+            'total_sources': sum(sources_by_type.values()),
+            'sources_by_type': sources_by_type,
+            'total_documents': doc_count,
+            'documents_by_type': chunk_stats['documents_by_type'],
+            # Counters written before they existed (or by other tools) need a recount
+            'counts_stale': chunk_stats['total_documents'] != doc_count,
+            'shards': shards,
+            'index': index,
+            'storage': storage,
+            'embedding_cache': cache_stats
+        }
+    
+    def rebuild_index(self, profile: str) -> Dict[str, Any]:
+        """Rebuild the HNSW index with another profile (copies stored vectors)."""
+        return self.chroma.rebuild_index(profile)
+    
+    def compact_vectors(self, dims: Optional[int] = None, expand: bool = False) -> Dict[str, Any]:
+        """Switch the workspace to compact vector storage, or back to full vectors."""
+        from .core.compact import compact_workspace, expand_workspace
+        if expand:
+            return expand_workspace(self.chroma)
+        return compact_workspace(self.chroma, dims) if dims else compact_workspace(self.chroma)
+    
+    def schematic_cache_stats(self) -> Dict[str, Any]:
+        """Size and hit figures of the schematic vision cache."""
+        return self.registry.schematic_cache_stats()
+    
+    def prune_schematic_cache(
+        self,
+        max_entries: Optional[int] = None,
+        max_age_days: Optional[float] = None
+    ) -> Dict[str, int]:
+        """Evict schematic vision results beyond the size and age limits."""
+        return self.registry.prune_schematic_cache(max_entries=max_entries, max_age_days=max_age_days)
+    
+    def remove_source(self, source_path: str) -> Dict[str, Any]:
+        """Remove a source's chunks and registry entries (resumable)."""
+        from .core.removal import purge_source
+        return purge_source(self.registry, self.chroma, source_path)
+    
+    def resume_removals(self) -> List[Dict[str, Any]]:
+        """Finish removals that were interrupted."""
+        from .core.removal import resume_purges
+        return resume_purges(self.registry, self.chroma)
+    
+    def index_pdf(
+        self,
+        pdf_path: str,
+        analyze_schematics: bool = True,
+        initial_query: Optional[str] = None,
+        resume: bool = False,
+        job=None
+    ) -> Dict[str, Any]:
+        """Index a PDF document (`resume` continues from an interrupted run's checkpoint)."""
+        return self.ingestor('pdf', job).ingest(
+            pdf_path,
+            analyze_schematics=analyze_schematics,
+            initial_query=initial_query,
+            resume=resume
+        )
+
+    def fetch_repo(self, repo_url: str, branch: Optional[str] = None, resume: bool = False, job=None) -> Dict[str, Any]:
+        """Clone and index a GitHub repository (`resume` reuses an interrupted run's checkpoint)."""
+        kwargs = {'resume': resume}
+        if branch:
+            kwargs['branch'] = branch
+        return self.ingestor('github', job).ingest(repo_url, **kwargs)
+
+    def index_web(self, url: str, job=None) -> Dict[str, Any]:
+        """Scrape and index a web page."""
+        return self.ingestor('web', job).ingest(url)
+
+    def ingest_batch(
+        self,
+        manifest_path: Optional[str] = None,
+        sources: Optional[List[Dict[str, Any]]] = None,
+        workers: Optional[int] = None,
+        resume: bool = False,
+        job=None
+    ) -> Dict[str, Any]:
+        """
+        Ingest many sources concurrently (see ingestion.batch).
+
+        Args:
+            manifest_path: YAML manifest file
+            sources: Manifest `sources` entries, instead of a file (relative
+                paths resolve against the current directory)
+            workers: Sources ingested at once (default: manifest's, then BATCH_WORKERS)
+            resume: Resume every PDF and repository without a `resume` option
+                from its checkpoint
+        """
+        from pathlib import Path
+        from .ingestion.batch import SOURCE_OPTIONS, load_manifest, parse_manifest, run_batch
+
+        if manifest_path:
+            manifest = load_manifest(manifest_path)
+        else:
+            manifest = parse_manifest({'sources': sources or []}, Path.cwd())
+        if resume:
+            for source in manifest['sources']:
+                if 'resume' in SOURCE_OPTIONS[source['type']]:
+                    source['options'].setdefault('resume', True)
+        return run_batch(self, manifest['sources'], workers=workers or manifest['workers'], job=job)
@@ -2,73 +2,884 @@
 ChromaDB persistent client manager.
 """
 
-import chromadb
-from chromadb.config import Settings
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Callable, Tuple
+import heapq
+import itertools
 import logging
+import re
+import threading
+import time
+from pathlib import Path
 
-from ..config import CHROMA_PERSIST_DIR, COLLECTION_NAME, EMBEDDING_MODEL
+from ..config import (
+    CHROMA_PERSIST_DIR, COLLECTION_NAME, EMBEDDING_MODEL,
+    CHROMA_SHARDING, CHROMA_SHARD_MAX_CHUNKS, SHARD_QUERY_WORKERS, COMPACT_RESCORE_FACTOR,
+    ADD_BATCH_SIZE, BULK_BATCH_SIZE, BULK_THRESHOLD, EMBEDDING_CACHE_ENABLED,
+    STATS_PAGE_SIZE, DELETE_PAGE_SIZE, INDEX_PROFILES, INDEX_PROFILE, REBUILD_PAGE_SIZE,
+    workspace
+)
+from .client_pool import get_client, get_pool
 
 logger = logging.getLogger(__name__)
 
+SHARDING_MODES = ('source_type', 'size', 'none')
+
+# Shards are named "<COLLECTION_NAME>__<key>_<n>": key is the source type
+# ("source_type" mode) or SIZE_SHARD_KEY ("size" mode), n counts roll-overs
+SHARD_PREFIX = f"{COLLECTION_NAME}__"
+SIZE_SHARD_KEY = "part"
+
+# Suffix of the temporary collection built by `rebuild_index`
+REBUILD_SUFFIX = "__rebuild"
+REBUILD_COLLECTION_NAME = f"{COLLECTION_NAME}{REBUILD_SUFFIX}"
+
+# Per-query result fields merged across shards
+QUERY_FIELDS = ('ids', 'documents', 'metadatas', 'distances', 'embeddings')
+
+
+def shard_key(source_type: str) -> str:
+    """Shard key of a source type (a valid, short collection-name fragment)."""
+    return re.sub(r'[^A-Za-z0-9_-]', '-', str(source_type))[:24] or 'unknown'
+
+
+def shard_name(key: str, number: int) -> str:
+    """Collection name of shard `number` of a key."""
+    return f"{SHARD_PREFIX}{key}_{number}"
+
+
+def parse_shard_name(name: str) -> Optional[Tuple[str, int]]:
+    """(key, number) of a shard collection name, or None for other collections."""
+    if not name.startswith(SHARD_PREFIX) or name.endswith(REBUILD_SUFFIX):
+        return None
+    key, _, number = name[len(SHARD_PREFIX):].rpartition('_')
+    if not key or not number.isdigit():
+        return None
+    return key, int(number)
+
+
+def count_documents(persist_dir: str) -> int:
+    """
+    Chunks stored in a ChromaDB directory, base collection and shards.
+    
+    Read-only: unlike ChromaManager it creates no collection, loads no
+    embedding model and takes no hold on the pooled client. A missing
+    directory or collection counts as 0.
+    """
+    if not Path(persist_dir).is_dir():
+        return 0
+    client = get_client(persist_dir)
+    names = [getattr(c, 'name', c) for c in client.list_collections()]
+    return sum(
+        client.get_collection(name=name).count()
+        for name in names
+        if name == COLLECTION_NAME or parse_shard_name(name)
+    )
+
 
 class ChromaManager:
-    """Manages persistent ChromaDB client and operations."""
+    """
+    Manages persistent ChromaDB client and operations.
+    
+    The client is opened on first use of `client` or `collection`, so
+    constructing a ChromaManager is free until something touches the store.
+    Clients come from the process-wide pool, so managers for the same
+    directory share one.
+    
+    Chunks are spread over shard collections (by source type, or in
+    fixed-size parts) next to the base collection, which keeps the chunks
+    written before sharding. Every read covers all of them: queries filtered
+    on a source type only search the shards that can hold it, other queries
+    fan out across shards in a thread pool and merge the top k by distance.
+    """
+    
+    def __init__(
+        self,
+        embedding_function: Optional[Callable[[List[str]], List[List[float]]]] = None,
+        registry=None,
+        persist_dir: Optional[str] = None,
+        sharding: Optional[str] = None,
+        shard_max_chunks: Optional[int] = None
+    ):
+        """
+        Args:
+            embedding_function: Optional Chroma-compatible embedding function
+                (defaults to the local EMBEDDING_MODEL engine)
+            registry: Optional Registry whose chunk counters are kept in step
+                with adds and deletes (required for O(1) `get_stats`)
+            persist_dir: ChromaDB directory (default: the current workspace's)
+            sharding: Where new chunks go, one of SHARDING_MODES
+                (default CHROMA_SHARDING)
+            shard_max_chunks: Chunks per shard before it rolls over
+                (default CHROMA_SHARD_MAX_CHUNKS)
+        """
+        sharding = sharding or CHROMA_SHARDING
+        if sharding not in SHARDING_MODES:
+            raise ValueError(f"Unknown sharding mode: {sharding} (choose from {', '.join(SHARDING_MODES)})")
+        
+        self.registry = registry
+        self.persist_dir = persist_dir or CHROMA_PERSIST_DIR
+        self.sharding = sharding
+        self.shard_max_chunks = shard_max_chunks or CHROMA_SHARD_MAX_CHUNKS
+        self._client = None
+        self._collection = None
+        self._shards: Dict[str, Any] = {}
+        self._embedding_function = embedding_function
+        self._embedding_cache = None
+        self._compact_store = None
+        self._init_lock = threading.Lock()
+        self._shard_lock = threading.Lock()
+        # One writer at a time: concurrent ingestions (ingest-batch, server
+        # jobs) share this manager, and a batch's existence check, shard
+        # choice and add must not interleave with another's. Rebuilds hold
+        # it throughout, so no write lands in a collection being replaced.
+        self._write_lock = threading.RLock()
+        self._query_pool = None
+    
+    @property
+    def client(self):
+        """Persistent ChromaDB client (opened lazily, shared through the client pool)."""
+        if self._client is None or not get_pool().is_open(self._client):
+            self._init_client()
+        return self._client
+    
+    @property
+    def collection(self):
+        """Workspace collection (opened lazily; reopened if the pool closed its client)."""
+        if self._collection is None or not get_pool().is_open(self._client):
+            self._init_client()
+        return self._collection
     
-    def __init__(self):
-        self.client = None
-        self.collection = None
-        self._init_client()
+    @property
+    def embedding_function(self):
+        """Embedding function shared by the collection and batched inserts."""
+        if self._embedding_function is None:
+            from .embeddings import get_embedding_engine
+            self._embedding_function = get_embedding_engine()
+        return self._embedding_function
+    
+    @property
+    def embedding_cache(self):
+        """
+        Workspace embedding cache, or None if disabled or the embedding
+        function has no `cache_key` to scope its vectors by.
+        """
+        if self._embedding_cache is None:
+            if not EMBEDDING_CACHE_ENABLED or not getattr(self.embedding_function, 'cache_key', None):
+                return None
+            with self._init_lock:
+                if self._embedding_cache is None:
+                    from .embedding_cache import EmbeddingCache
+                    if self.persist_dir == CHROMA_PERSIST_DIR:
+                        self._embedding_cache = EmbeddingCache()
+                    else:
+                        # Another workspace: its cache sits next to its chroma_db
+                        self._embedding_cache = EmbeddingCache(
+                            str(Path(self.persist_dir).parent / "embedding_cache.db")
+                        )
+        return self._embedding_cache
+    
+    def embed_documents(self, documents: List[str]) -> List[List[float]]:
+        """Embed documents, reusing cached vectors for content seen before."""
+        cache = self.embedding_cache
+        if cache is None:
+            return self.embedding_function(documents)
+        return cache.embed(documents, self.embedding_function.cache_key, self.embedding_function)
     
     def _init_client(self):
-        """Initialize persistent ChromaDB client."""
+        """Initialize persistent ChromaDB client (once, even across threads)."""
+        with self._init_lock:
+            if self._collection is None or not get_pool().is_open(self._client):
+                self._open()
+    
+    def _open(self):
+        """Open the client and collection (caller holds the init lock)."""
         try:
-            # Create persistent client
-            self.client = chromadb.PersistentClient(
-                path=CHROMA_PERSIST_DIR,
-                settings=Settings(
-                    anonymized_telemetry=False,
-                    allow_reset=True
-                )
-            )
+            if self.persist_dir == CHROMA_PERSIST_DIR:
+                workspace.bootstrap()
+            
+            # Held, so scanning other workspaces never closes it under us
+            self._client = get_client(self.persist_dir, holder=self)
             
             # Get or create collection
-            self.collection = self.client.get_or_create_collection(
-                name=COLLECTION_NAME,
-                metadata={"description": "SmartDoc workspace knowledge base"}
-            )
+            self._collection = self._get_or_create_collection()
+            self._shards = self._open_shards()
             
-            logger.info(f"ChromaDB initialized at {CHROMA_PERSIST_DIR}")
-            logger.info(f"Collection '{COLLECTION_NAME}' ready with {self.collection.count()} documents")
+            logger.info(f"ChromaDB initialized at {self.persist_dir}")
+            logger.info(
+                f"Collection '{COLLECTION_NAME}' ready with {self._collection.count()} documents"
+                + (f" and {len(self._shards)} shards" if self._shards else "")
+            )
             
         except Exception as e:
             logger.error(f"Failed to initialize ChromaDB: {e}")
             raise
     
+    def _get_or_create_collection(self):
+        """
+        Open the workspace collection, creating it tagged with EMBEDDING_MODEL.
+        
+        Vectors from different models are not comparable, so an existing
+        collection built with another model (or before the model was
+        recorded) is flagged for re-indexing.
+        """
+        try:
+            collection = self._client.get_collection(
+                name=COLLECTION_NAME,
+                embedding_function=self.embedding_function
+            )
+        except ValueError:
+            collection = self._recover_rebuild(COLLECTION_NAME)
+            if collection is None:
+                return self._create_collection()
+        
+        model = (collection.metadata or {}).get('embedding_model')
+        if model != EMBEDDING_MODEL and collection.count() > 0:
+            logger.warning(
+                f"Collection '{COLLECTION_NAME}' was embedded with {model or 'an unrecorded model'}, "
+                f"not {EMBEDDING_MODEL}; results will be poor until you run `smartdoc reset` and re-index"
+            )
+        return collection
+    
+    def _create_collection(
+        self,
+        name: str = COLLECTION_NAME,
+        profile: str = INDEX_PROFILE,
+        embedding_model: Optional[str] = EMBEDDING_MODEL,
+        compact_dims: int = 0
+    ):
+        """Create a collection with the HNSW parameters of an index profile."""
+        return self._client.create_collection(
+            name=name,
+            metadata=self._collection_metadata(profile, embedding_model, compact_dims),
+            embedding_function=self.embedding_function
+        )
+    
+    @staticmethod
+    def _collection_metadata(
+        profile: str,
+        embedding_model: Optional[str] = EMBEDDING_MODEL,
+        compact_dims: int = 0
+    ) -> Dict[str, Any]:
+        """Collection metadata: description, embedding model, compact mode and HNSW settings."""
+        if profile not in INDEX_PROFILES:
+            raise ValueError(f"Unknown index profile: {profile} (choose from {', '.join(INDEX_PROFILES)})")
+        
+        metadata = {
+            "description": "SmartDoc workspace knowledge base",
+            "index_profile": profile
+        }
+        if embedding_model:
+            metadata["embedding_model"] = embedding_model
+        if compact_dims:
+            metadata["compact_dims"] = compact_dims
+        metadata.update({f"hnsw:{key}": value for key, value in INDEX_PROFILES[profile].items()})
+        return metadata
+    
+    def index_info(self) -> Dict[str, Any]:
+        """Index profile and HNSW parameters of the collection (defaults for untagged ones)."""
+        metadata = self.collection.metadata or {}
+        return {
+            'profile': metadata.get('index_profile', 'default'),
+            **{key[len('hnsw:'):]: value for key, value in metadata.items() if key.startswith('hnsw:')}
+        }
+    
+    def _open_shards(self) -> Dict[str, Any]:
+        """
+        Open every shard collection (caller holds the init lock).
+        
+        A shard whose rebuild dropped it but did not rename the new copy is
+        completed here, like the base collection in `_get_or_create_collection`.
+        """
+        names = [getattr(c, 'name', c) for c in self._client.list_collections()]
+        for name in names:
+            if name.endswith(REBUILD_SUFFIX):
+                target = name[:-len(REBUILD_SUFFIX)]
+                if parse_shard_name(target) and target not in names:
+                    self._recover_rebuild(target)
+                    names.append(target)
+        
+        return {
+            name: self._client.get_collection(name=name, embedding_function=self.embedding_function)
+            for name in sorted(set(names), key=lambda n: parse_shard_name(n) or ('', 0))
+            if parse_shard_name(name)
+        }
+    
+    def collections(self) -> List[Any]:
+        """Every collection holding workspace chunks: the base one, then the shards."""
+        base = self.collection
+        return [base] + [collection for _, collection in self._shard_items()]
+    
+    def _shard_items(self, key: Optional[str] = None) -> List[Tuple[str, Any]]:
+        """(name, collection) of the open shards, of one key if given, in roll-over order."""
+        items = [
+            (name, collection) for name, collection in list(self._shards.items())
+            if key is None or parse_shard_name(name)[0] == key
+        ]
+        return sorted(items, key=lambda item: parse_shard_name(item[0]))
+    
+    def shard_info(self) -> List[Dict[str, Any]]:
+        """Name and document count of every collection, base first."""
+        base = self.collection
+        return [{'name': COLLECTION_NAME, 'documents': base.count()}] + [
+            {'name': name, 'documents': collection.count()}
+            for name, collection in self._shard_items()
+        ]
+    
+    def count(self) -> int:
+        """Documents across the base collection and every shard."""
+        return sum(collection.count() for collection in self.collections())
+    
+    def _shard_key(self, metadata: Optional[Dict[str, Any]]) -> Optional[str]:
+        """Shard key a chunk is written under, or None for the base collection."""
+        if self.sharding == 'source_type':
+            return shard_key((metadata or {}).get('source_type', 'unknown'))
+        if self.sharding == 'size':
+            return SIZE_SHARD_KEY
+        return None
+    
+    def _writable_shard(self, key: Optional[str], incoming: int):
+        """
+        Collection that takes `incoming` new chunks of a shard key.
+        
+        That is the key's last shard unless it would exceed
+        `shard_max_chunks`, in which case the next shard is created. New
+        shards copy the base collection's metadata, so every collection
+        shares one embedding model, distance space and index profile and
+        their distances can be merged.
+        """
+        if key is None:
+            return self.collection
+        
+        with self._shard_lock:
+            series = self._shard_items(key)
+            number = 0
+            if series:
+                name, collection = series[-1]
+                count = collection.count()
+                if count == 0 or count + incoming <= self.shard_max_chunks:
+                    return collection
+                number = parse_shard_name(name)[1] + 1
+            
+            name = shard_name(key, number)
+            collection = self.client.get_or_create_collection(
+                name=name,
+                metadata=dict(self.collection.metadata) if self.collection.metadata else None,
+                embedding_function=self.embedding_function
+            )
+            self._shards[name] = collection
+            logger.info(f"Created shard '{name}'")
+            return collection
+    
+    def _query_collections(self, where: Optional[Dict[str, Any]]) -> List[Any]:
+        """
+        Collections a query has to search.
+        
+        A source type filter rules out the other types' shards; the base
+        collection and size shards hold every type. Empty collections are
+        skipped.
+        """
+        source_type = self._filtered_source_type(where)
+        if source_type is None:
+            candidates = self.collections()
+        else:
+            key = shard_key(source_type)
+            candidates = [self.collection] + [
+                collection for name, collection in self._shard_items()
+                if parse_shard_name(name)[0] in (key, SIZE_SHARD_KEY)
+            ]
+        return [c for c in candidates if c.count()] or candidates[:1]
+    
+    @staticmethod
+    def _filtered_source_type(where: Optional[Dict[str, Any]]) -> Optional[str]:
+        """Source type a metadata filter requires, if any (top level or inside $and)."""
+        if not where:
+            return None
+        value = where.get('source_type')
+        if isinstance(value, dict):
+            value = value.get('$eq')
+        if isinstance(value, str):
+            return value
+        for clause in where.get('$and', []):
+            value = ChromaManager._filtered_source_type(clause)
+            if value is not None:
+                return value
+        return None
+    
+    @property
+    def query_pool(self) -> ThreadPoolExecutor:
+        """Threads searching shards concurrently (created on first fan-out)."""
+        if self._query_pool is None:
+            with self._shard_lock:
+                if self._query_pool is None:
+                    self._query_pool = ThreadPoolExecutor(
+                        max_workers=SHARD_QUERY_WORKERS,
+                        thread_name_prefix="smartdoc-shard-query"
+                    )
+        return self._query_pool
+    
+    @staticmethod
+    def compact_dims(collection) -> int:
+        """Reduced dimensions of a compact collection, 0 for full vectors."""
+        return (collection.metadata or {}).get('compact_dims', 0)
+    
+    @property
+    def compact_store(self):
+        """
+        Side store of full vectors (see core.compact), or None if this
+        workspace was never compacted.
+        """
+        if self._compact_store is None:
+            from .compact import store_path
+            if Path(store_path(self.persist_dir)).exists():
+                return self.open_compact_store()
+        return self._compact_store
+    
+    def open_compact_store(self):
+        """Side store of this workspace, created if missing."""
+        with self._shard_lock:
+            if self._compact_store is None:
+                from .compact import CompactStore, store_path
+                self._compact_store = CompactStore(store_path(self.persist_dir))
+        return self._compact_store
+    
+    def _require_compact_store(self):
+        store = self.compact_store
+        if store is None or store.projection is None:
+            raise RuntimeError(
+                "Collections are compact but the side store is missing; "
+                "run `smartdoc reset` and re-index"
+            )
+        return store
+    
+    def drop_compact_store(self):
+        """Delete the side store (once no collection is compact)."""
+        from .compact import store_path
+        with self._shard_lock:
+            if self._compact_store is not None:
+                self._compact_store.close()
+                self._compact_store = None
+            for suffix in ("", "-wal", "-shm"):
+                path = Path(store_path(self.persist_dir) + suffix)
+                if path.exists():
+                    path.unlink()
+    
+    def full_vectors(self, collection, limit: int, page_size: int = REBUILD_PAGE_SIZE) -> Tuple[List[str], List[Any]]:
+        """(ids, full-precision vectors) of up to `limit` chunks of a collection."""
+        store = self._require_compact_store() if self.compact_dims(collection) else None
+        ids, vectors = [], []
+        while len(ids) < limit:
+            page = collection.get(include=["embeddings"], limit=min(page_size, limit - len(ids)), offset=len(ids))
+            if not page['ids']:
+                break
+            if store is None:
+                vectors.extend(page['embeddings'])
+            else:
+                full = store.get_many(page['ids'])
+                vectors.extend(full[chunk_id] for chunk_id in page['ids'])
+            ids.extend(page['ids'])
+        return ids, vectors
+    
+    def storage_info(self) -> Dict[str, Any]:
+        """
+        Disk size, estimated index RAM and (for compact workspaces) the
+        recall measured at conversion, to compare storage modes.
+        
+        RAM is hnswlib's per-element footprint: the float32 vector, the
+        2*M level-0 links and the label, for every loaded chunk.
+        """
+        collections = self.collections()
+        documents = sum(c.count() for c in collections)
+        index_dims = full_dims = None
+        for collection in collections:
+            page = collection.get(include=["embeddings"], limit=1)
+            if page['ids']:
+                index_dims = len(page['embeddings'][0])
+                break
+        
+        store = self.compact_store
+        info = store.info if store is not None else {}
+        compact = any(self.compact_dims(c) for c in collections)
+        full_dims = info.get('full_dims') if compact else index_dims
+        
+        def ram_mb(dims):
+            if not dims:
+                return None
+            links = 2 * int(self.index_info().get('M', 16))
+            return round(documents * (dims * 4 + links * 4 + 12) / (1024 * 1024), 1)
+        
+        chroma_bytes = sum(f.stat().st_size for f in Path(self.persist_dir).rglob('*') if f.is_file())
+        store_bytes = store.size_bytes() if store is not None else 0
+        return {
+            'mode': 'compact' if compact else 'full',
+            'documents': documents,
+            'index_dims': index_dims,
+            'full_dims': full_dims,
+            'chroma_mb': round(chroma_bytes / (1024 * 1024), 1),
+            'side_store_mb': round(store_bytes / (1024 * 1024), 1),
+            'disk_mb': round((chroma_bytes + store_bytes) / (1024 * 1024), 1),
+            'index_ram_mb': ram_mb(index_dims),
+            'full_index_ram_mb': ram_mb(full_dims),
+            'recall': info.get('recall') if compact else None,
+            'recall_without_rescore': info.get('recall_without_rescore') if compact else None,
+            'recall_k': info.get('recall_k') if compact else None
+        }
+    
+    def rebuild_index(
+        self,
+        profile: str,
+        page_size: int = REBUILD_PAGE_SIZE,
+        on_progress: Optional[Callable[[int, int], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Rebuild the HNSW index of every collection with another profile.
+        
+        HNSW parameters are fixed at creation, so the stored vectors,
+        documents and metadata are copied page by page into a new collection
+        which then replaces the old one, one collection (base, then each
+        shard) at a time. Nothing is re-embedded. If the process dies after
+        an old collection is dropped, the next open finishes the swap.
+        
+        Args:
+            profile: Name from INDEX_PROFILES
+            page_size: Chunks copied per round trip
+            on_progress: Optional callback(copied, total) across all collections
+        
+        Returns:
+            {'profile', 'previous_profile', 'documents', 'collections', 'seconds'}
+        """
+        if profile not in INDEX_PROFILES:
+            raise ValueError(f"Unknown index profile: {profile} (choose from {', '.join(INDEX_PROFILES)})")
+        
+        start = time.perf_counter()
+        previous = self.index_info()['profile']
+        rebuilt = self.rebuild_collections(profile=profile, page_size=page_size, on_progress=on_progress)
+        
+        seconds = time.perf_counter() - start
+        logger.info(
+            f"Rebuilt index ({previous} -> {profile}) over {rebuilt['documents']} documents "
+            f"in {rebuilt['collections']} collections in {seconds:.1f}s"
+        )
+        return {'profile': profile, 'previous_profile': previous, **rebuilt, 'seconds': seconds}
+    
+    @contextmanager
+    def exclusive_writes(self):
+        """Hold off every write through this manager for the duration of the block (re-entrant)."""
+        with self._write_lock:
+            yield
+    
+    def rebuild_collections(
+        self,
+        profile: Optional[str] = None,
+        compact_dims: Optional[int] = None,
+        transform: Optional[Callable[[Dict[str, Any]], List[List[float]]]] = None,
+        page_size: int = REBUILD_PAGE_SIZE,
+        on_progress: Optional[Callable[[int, int], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Copy collections into new ones and swap them in (see `rebuild_index`).
+        
+        Args:
+            profile: Index profile of the new collections (default: keep each one's)
+            compact_dims: Compact mode of the new collections (0 = full vectors);
+                collections already in that mode are skipped. Default: keep
+                each collection's mode and rebuild them all.
+            transform: Optional function mapping a copied page (ids, embeddings,
+                documents, metadatas) to the vectors to store
+            page_size: Chunks copied per round trip
+            on_progress: Optional callback(copied, total) across all collections
+        
+        Returns:
+            {'documents', 'collections'} that were rebuilt
+        """
+        # Writers wait: a chunk added after its collection's last page was
+        # copied would be lost in the swap, and one added mid-copy would
+        # shift the offset paging
+        with self._write_lock:
+            targets = [(COLLECTION_NAME, self.collection)] + self._shard_items()
+            if compact_dims is not None:
+                targets = [(name, c) for name, c in targets if self.compact_dims(c) != compact_dims]
+            total = sum(collection.count() for _, collection in targets)
+            
+            done = 0
+            for name, old in targets:
+                def progress(copied, _, offset=done):
+                    if on_progress:
+                        on_progress(offset + copied, total)
+                
+                new = self._rebuild_collection(
+                    name, old,
+                    profile=profile or self._profile_of(old),
+                    compact_dims=self.compact_dims(old) if compact_dims is None else compact_dims,
+                    transform=transform,
+                    page_size=page_size,
+                    on_progress=progress
+                )
+                done += new.count()
+                with self._init_lock:
+                    if name == COLLECTION_NAME:
+                        self._collection = new
+                    else:
+                        self._shards[name] = new
+            
+            return {'documents': total, 'collections': len(targets)}
+    
+    @staticmethod
+    def _profile_of(collection) -> str:
+        """Index profile of a collection (INDEX_PROFILE for untagged ones)."""
+        profile = (collection.metadata or {}).get('index_profile')
+        return profile if profile in INDEX_PROFILES else INDEX_PROFILE
+    
+    def _rebuild_collection(
+        self,
+        name: str,
+        old,
+        profile: str,
+        compact_dims: int,
+        transform: Optional[Callable[[Dict[str, Any]], List[List[float]]]],
+        page_size: int,
+        on_progress: Callable[[int, int], None]
+    ):
+        """Copy one collection into a new one with `profile` and swap it in; returns the new one."""
+        total = old.count()
+        rebuild_name = f"{name}{REBUILD_SUFFIX}"
+        
+        # Leftover from an interrupted rebuild that never reached the swap
+        try:
+            self.client.delete_collection(name=rebuild_name)
+        except ValueError:
+            pass
+        
+        new = self._create_collection(
+            name=rebuild_name,
+            profile=profile,
+            embedding_model=(old.metadata or {}).get('embedding_model'),
+            compact_dims=compact_dims
+        )
+        
+        copied = 0
+        while True:
+            page = old.get(
+                include=["embeddings", "documents", "metadatas"],
+                limit=page_size,
+                offset=copied
+            )
+            if not page['ids']:
+                break
+            new.add(
+                ids=page['ids'],
+                embeddings=transform(page) if transform else page['embeddings'],
+                documents=page['documents'],
+                metadatas=page['metadatas']
+            )
+            copied += len(page['ids'])
+            on_progress(copied, total)
+        
+        if new.count() != total:
+            self.client.delete_collection(name=rebuild_name)
+            raise RuntimeError(f"Rebuild of '{name}' copied {new.count()} of {total} documents; collection left unchanged")
+        
+        client = self.client
+        with self._init_lock:
+            client.delete_collection(name=name)
+            new.modify(name=name)
+        return new
+    
+    def _recover_rebuild(self, name: str):
+        """Finish a rebuild that dropped collection `name` but did not rename the new one."""
+        try:
+            collection = self._client.get_collection(
+                name=f"{name}{REBUILD_SUFFIX}",
+                embedding_function=self.embedding_function
+            )
+        except ValueError:
+            return None
+        collection.modify(name=name)
+        logger.warning(f"Completed an interrupted index rebuild of '{name}'")
+        return collection
+    
     def add_documents(
         self,
         documents: List[str],
         metadatas: List[Dict[str, Any]],
-        ids: List[str]
-    ):
+        ids: List[str],
+        batch_size: Optional[int] = None,
+        bulk: Optional[bool] = None,
+        on_batch: Optional[Callable[[int, int], None]] = None
+    ) -> Dict[str, Any]:
         """
-        Add documents to the collection.
+        Add documents to the collection in batches.
+        
+        Embedding and persistence are pipelined: batch N+1 is embedded while a
+        single writer thread persists batch N, so at most two batches of
+        vectors are in memory and no call exceeds Chroma's max batch size.
+        Chunks whose content was embedded before come from the embedding cache.
         
         Args:
             documents: List of text content
             metadatas: List of metadata dicts
             ids: List of unique IDs
+            batch_size: Chunks per batch (default ADD_BATCH_SIZE, or
+                BULK_BATCH_SIZE in bulk mode)
+            bulk: Bulk-load mode for large ingests (bigger batches, per-batch
+                logging at debug level); default: on from BULK_THRESHOLD chunks
+            on_batch: Optional callback(done, total) after each persisted batch
+        
+        Returns:
+            Throughput stats: added, batches, batch_size, seconds,
+            embed_seconds, write_seconds, chunks_per_second
         """
+        total = len(documents)
+        if bulk is None:
+            bulk = total >= BULK_THRESHOLD
+        batch_size = batch_size or (BULK_BATCH_SIZE if bulk else ADD_BATCH_SIZE)
+        
+        max_batch_size = getattr(self.client, 'max_batch_size', None)
+        if max_batch_size and batch_size > max_batch_size:
+            batch_size = max_batch_size
+        
+        stats = {
+            'added': 0,
+            'batches': 0,
+            'batch_size': batch_size,
+            'bulk': bulk,
+            'seconds': 0.0,
+            'embed_seconds': 0.0,
+            'write_seconds': 0.0,
+            'chunks_per_second': 0.0
+        }
+        if not total:
+            return stats
+        
+        start = time.perf_counter()
+        
+        def persisted(future, count):
+            # Wait for the previous write; report from the calling thread
+            stats['write_seconds'] += future.result()
+            stats['added'] += count
+            stats['batches'] += 1
+            log = logger.debug if bulk else logger.info
+            log(f"Persisted batch {stats['batches']} ({stats['added']}/{total} documents)")
+            if on_batch:
+                on_batch(stats['added'], total)
+        
         try:
-            self.collection.add(
-                documents=documents,
-                metadatas=metadatas,
-                ids=ids
-            )
-            logger.info(f"Added {len(documents)} documents to collection")
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix="smartdoc-chroma-writer") as writer:
+                pending = None
+                for offset in range(0, total, batch_size):
+                    end = min(offset + batch_size, total)
+                    
+                    embed_start = time.perf_counter()
+                    embeddings = self.embed_documents(documents[offset:end])
+                    stats['embed_seconds'] += time.perf_counter() - embed_start
+                    
+                    if pending is not None:
+                        persisted(*pending)
+                    
+                    future = writer.submit(
+                        self._write_batch,
+                        documents[offset:end],
+                        embeddings,
+                        metadatas[offset:end],
+                        ids[offset:end]
+                    )
+                    pending = (future, end - offset)
+                
+                if pending is not None:
+                    persisted(*pending)
         except Exception as e:
-            logger.error(f"Failed to add documents: {e}")
+            logger.error(f"Failed to add documents after {stats['added']}/{total}: {e}")
             raise
+        
+        stats['seconds'] = time.perf_counter() - start
+        stats['chunks_per_second'] = stats['added'] / stats['seconds'] if stats['seconds'] else 0.0
+        logger.info(
+            f"Added {stats['added']} documents to collection in {stats['batches']} batches "
+            f"({stats['chunks_per_second']:.0f} chunks/s, embed {stats['embed_seconds']:.1f}s, "
+            f"write {stats['write_seconds']:.1f}s)"
+        )
+        return stats
+    
+    def add_embedded(
+        self,
+        documents: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict[str, Any]],
+        ids: List[str],
+        batch_size: int = ADD_BATCH_SIZE
+    ) -> int:
+        """
+        Add chunks whose vectors are already computed (e.g. copied from
+        another workspace), routed to shards like `add_documents`.
+        
+        Returns:
+            Number of chunks submitted
+        """
+        max_batch_size = getattr(self.client, 'max_batch_size', None)
+        if max_batch_size and batch_size > max_batch_size:
+            batch_size = max_batch_size
+        
+        for offset in range(0, len(ids), batch_size):
+            end = offset + batch_size
+            self._write_batch(documents[offset:end], embeddings[offset:end], metadatas[offset:end], ids[offset:end])
+        return len(ids)
+    
+    def _write_batch(
+        self,
+        documents: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict[str, Any]],
+        ids: List[str]
+    ) -> float:
+        """Persist one embedded batch into its shards and count its new chunks; returns the seconds spent."""
+        start = time.perf_counter()
+        with self._write_lock:
+            # Chroma ignores IDs a collection already holds, but a chunk written
+            # before may sit in another shard: skip every ID stored anywhere
+            collections = self.collections()
+            existing = set()
+            if self.registry is not None or len(collections) > 1:
+                for collection in collections:
+                    existing.update(collection.get(ids=ids, include=[])['ids'])
+            
+            groups: Dict[Optional[str], List[int]] = {}
+            for i, (chunk_id, metadata) in enumerate(zip(ids, metadatas)):
+                if chunk_id not in existing:
+                    groups.setdefault(self._shard_key(metadata), []).append(i)
+            
+            for key, indices in groups.items():
+                target = self._writable_shard(key, len(indices))
+                batch_ids = [ids[i] for i in indices]
+                batch_embeddings = [embeddings[i] for i in indices]
+                if self.compact_dims(target):
+                    # Full vector to the side store first: a crash leaves at most an orphan row
+                    store = self._require_compact_store()
+                    store.put_many(batch_ids, batch_embeddings)
+                    batch_embeddings = store.project(batch_embeddings)
+            
+                target.add(
+                    documents=[documents[i] for i in indices],
+                    embeddings=batch_embeddings,
+                    metadatas=[metadatas[i] for i in indices],
+                    ids=batch_ids
+                )
+            
+            if self.registry is not None:
+                deltas: Dict[Tuple[str, str], int] = {}
+                for indices in groups.values():
+                    for i in indices:
+                        key = self._count_key(metadatas[i])
+                        deltas[key] = deltas.get(key, 0) + 1
+                self.registry.adjust_chunk_counts(deltas)
+        
+        return time.perf_counter() - start
+    
+    @staticmethod
+    def _count_key(metadata: Optional[Dict[str, Any]]) -> Tuple[str, str]:
+        """Counter key (source, source_type) of a chunk."""
+        metadata = metadata or {}
+        return metadata.get('source', 'unknown'), metadata.get('source_type', 'unknown')
     
     def query(
         self,
@@ -89,84 +900,340 @@ class ChromaManager:
         Returns:
             Query results with documents, metadatas, distances
         """
+        return self.query_many([query_text], n_results, where, where_document)
+    
+    def query_many(
+        self,
+        query_texts: List[str],
+        n_results: int = 5,
+        where: Optional[Dict[str, Any]] = None,
+        where_document: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Query the collection with several strings in one search.
+        
+        The queries are embedded in one batch and sent as a single vectorized
+        HNSW query per collection; the filters apply to every query. With
+        several collections to search, they are queried concurrently and the
+        per-collection top `n_results` are merged by distance.
+        
+        Args:
+            query_texts: Query strings
+            n_results: Number of results per query
+            where: Metadata filter
+            where_document: Document content filter
+        
+        Returns:
+            Query results with one list of documents, metadatas, distances
+            per query, in input order
+        """
         try:
-            results = self.collection.query(
-                query_texts=[query_text],
-                n_results=n_results,
+            return self.query_vectors(self.embedding_function(query_texts), n_results, where, where_document)
+        except Exception as e:
+            logger.error(f"Query failed: {e}")
+            raise
+    
+    def query_vectors(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int = 5,
+        where: Optional[Dict[str, Any]] = None,
+        where_document: Optional[Dict[str, Any]] = None,
+        rescore: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Search with already embedded (full-dimension) queries.
+        
+        Compact collections are searched with the projected queries for
+        COMPACT_RESCORE_FACTOR times more candidates, which are then
+        re-scored at full precision from the side store (unless `rescore`
+        is False, which ranks by the reduced distance alone).
+        """
+        targets = self._query_collections(where)
+        store = self._require_compact_store() if any(self.compact_dims(c) for c in targets) else None
+        
+        candidates = n_results
+        projected = None
+        if store is not None:
+            candidates = n_results * COMPACT_RESCORE_FACTOR
+            projected = store.project(query_embeddings)
+        
+        def search(collection):
+            return collection.query(
+                query_embeddings=projected if self.compact_dims(collection) else query_embeddings,
+                n_results=candidates,
                 where=where,
                 where_document=where_document
             )
+        
+        if len(targets) == 1:
+            results = search(targets[0])
+        else:
+            # Reduced and full distances are not comparable: keep every
+            # candidate for re-scoring when any collection is compact
+            keep = candidates * len(targets) if store is not None else n_results
+            results = self._merge_results(list(self.query_pool.map(search, targets)), keep)
+        
+        if store is None:
             return results
-        except Exception as e:
-            logger.error(f"Query failed: {e}")
-            raise
+        if rescore:
+            from .compact import rescore as rescore_results
+            return rescore_results(results, query_embeddings, store, self.index_info().get('space', 'l2'), n_results)
+        return self._merge_results([results], n_results)
+    
+    @staticmethod
+    def _merge_results(results: List[Dict[str, Any]], n_results: int) -> Dict[str, Any]:
+        """
+        Merge per-collection query results into the overall top `n_results`.
+        
+        Each collection's hits are already sorted by distance, so a k-way
+        heap merge yields the global ranking without sorting everything.
+        """
+        fields = [key for key in QUERY_FIELDS if results[0].get(key) is not None]
+        merged = {key: ([] if key in fields else value) for key, value in results[0].items()}
+        
+        for q in range(len(results[0]['ids'])):
+            ranked = heapq.merge(*[
+                [(distance, r, i) for i, distance in enumerate(result['distances'][q])]
+                for r, result in enumerate(results)
+            ])
+            top = list(itertools.islice(ranked, n_results))
+            for key in fields:
+                merged[key].append([results[r][key][q][i] for _, r, i in top])
+        return merged
     
-    def get_by_source(self, source_path: str) -> Dict[str, Any]:
-        """Get all documents from a specific source."""
+    def get_by_source(self, source_path: str, include: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Get all documents from a specific source, across shards.
+        
+        Args:
+            source_path: Source to fetch
+            include: Fields to return (default: Chroma's documents and metadatas)
+        """
         try:
-            results = self.collection.get(
-                where={"source": source_path}
-            )
+            kwargs: Dict[str, Any] = {'where': {"source": source_path}}
+            if include is not None:
+                kwargs['include'] = include
+            
+            results = None
+            for collection in self.collections():
+                page = collection.get(**kwargs)
+                if page.get('embeddings') is not None and self.compact_dims(collection):
+                    # Callers get the full vectors, not the reduced index copies
+                    full = self._require_compact_store().get_many(page['ids'])
+                    page['embeddings'] = [full[chunk_id].tolist() for chunk_id in page['ids']]
+                if results is None:
+                    results = page
+                    continue
+                for key, value in page.items():
+                    if isinstance(results.get(key), list) and value is not None:
+                        results[key].extend(value)
             return results
         except Exception as e:
             logger.error(f"Failed to get documents by source: {e}")
             raise
     
-    def delete_source(self, source_path: str):
-        """Delete all documents from a specific source."""
+    def source_chunks(self, source_path: str) -> Dict[str, Dict[str, Any]]:
+        """Metadata of every stored chunk of a source, by chunk ID (no documents or vectors)."""
+        page = self.get_by_source(source_path, include=["metadatas"]) or {'ids': [], 'metadatas': []}
+        return dict(zip(page['ids'], page['metadatas'] or [{}] * len(page['ids'])))
+    
+    def delete_chunks(self, ids: List[str], source_path: str, page_size: int = DELETE_PAGE_SIZE) -> int:
+        """
+        Delete chunks of one source by ID, in whichever shards hold them.
+        
+        Returns:
+            Number of chunks deleted
+        """
+        deleted = 0
+        for offset in range(0, len(ids), page_size):
+            batch = ids[offset:offset + page_size]
+            with self._write_lock:
+                for collection in self.collections():
+                    present = collection.get(ids=batch, include=[])['ids']
+                    if not present:
+                        continue
+                    collection.delete(ids=present)
+                    if self.compact_dims(collection):
+                        self._require_compact_store().delete_many(present)
+                    deleted += len(present)
+                    if self.registry is not None:
+                        self.registry.subtract_chunk_count(source_path, len(present))
+        return deleted
+    
+    def update_metadatas(self, ids: List[str], metadatas: List[Dict[str, Any]], batch_size: int = ADD_BATCH_SIZE) -> int:
+        """
+        Replace the metadata of stored chunks (documents and vectors are kept).
+        
+        Returns:
+            Number of chunks updated
+        """
+        updated = 0
+        for offset in range(0, len(ids), batch_size):
+            batch = dict(zip(ids[offset:offset + batch_size], metadatas[offset:offset + batch_size]))
+            with self._write_lock:
+                for collection in self.collections():
+                    present = collection.get(ids=list(batch), include=[])['ids']
+                    if present:
+                        collection.update(ids=present, metadatas=[batch[chunk_id] for chunk_id in present])
+                        updated += len(present)
+        return updated
+    
+    def delete_source(
+        self,
+        source_path: str,
+        page_size: int = DELETE_PAGE_SIZE,
+        on_page: Optional[Callable[[int], None]] = None
+    ) -> int:
+        """
+        Delete all documents from a specific source, in every shard.
+        
+        Pages through matching IDs only (no documents or metadata) and
+        deletes them `page_size` at a time, so memory stays bounded and an
+        interrupted delete can simply be run again.
+        
+        Args:
+            source_path: Source whose chunks to delete
+            page_size: IDs fetched and deleted per round trip
+            on_page: Optional callback(deleted_so_far) after each page
+        
+        Returns:
+            Number of documents deleted
+        """
+        deleted = 0
         try:
-            # Get all IDs for this source
-            results = self.collection.get(
-                where={"source": source_path}
-            )
+            for collection in self.collections():
+                store = self._require_compact_store() if self.compact_dims(collection) else None
+                while True:
+                    with self._write_lock:
+                        page = collection.get(
+                            where={"source": source_path},
+                            include=[],
+                            limit=page_size
+                        )
+                        ids = page['ids']
+                        if not ids:
+                            break
+                        
+                        collection.delete(ids=ids)
+                        if store is not None:
+                            store.delete_many(ids)
+                        deleted += len(ids)
+                        if self.registry is not None:
+                            self.registry.subtract_chunk_count(source_path, len(ids))
+                    if on_page:
+                        on_page(deleted)
             
-            if results['ids']:
-                self.collection.delete(ids=results['ids'])
-                logger.info(f"Deleted {len(results['ids'])} documents from source: {source_path}")
+            if deleted:
+                logger.info(f"Deleted {deleted} documents from source: {source_path}")
             else:
                 logger.info(f"No documents found for source: {source_path}")
+            
+            if self.registry is not None:
+                self.registry.clear_chunk_count(source_path)
+            return deleted
                 
         except Exception as e:
-            logger.error(f"Failed to delete source documents: {e}")
+            logger.error(f"Failed to delete source documents after {deleted}: {e}")
             raise
     
     def get_stats(self) -> Dict[str, Any]:
-        """Get collection statistics."""
+        """
+        Get collection statistics.
+        
+        Reads the registry's chunk counters when a registry is attached;
+        otherwise counts by streaming metadata in pages.
+        """
         try:
-            total_docs = self.collection.count()
-            
-            # Get all metadata to calculate stats
-            all_data = self.collection.get()
-            
-            # Count by source type
-            source_types = {}
-            sources = set()
-            
-            for metadata in all_data['metadatas']:
-                source_type = metadata.get('source_type', 'unknown')
-                source_types[source_type] = source_types.get(source_type, 0) + 1
-                sources.add(metadata.get('source', 'unknown'))
+            if self.registry is not None:
+                counts = self.registry.get_chunk_stats()
+            else:
+                counts = self._summarize(self.count_documents())
             
             return {
-                'total_documents': total_docs,
-                'total_sources': len(sources),
-                'documents_by_type': source_types,
+                'total_documents': self.count(),
+                'total_sources': counts['total_sources'],
+                'documents_by_type': counts['documents_by_type'],
                 'collection_name': COLLECTION_NAME,
-                'persist_directory': CHROMA_PERSIST_DIR
+                'sharding': self.sharding,
+                'shards': self.shard_info(),
+                'index': self.index_info(),
+                'storage': self.storage_info(),
+                'persist_directory': self.persist_dir
             }
         except Exception as e:
             logger.error(f"Failed to get stats: {e}")
             return {'error': str(e)}
     
+    def count_documents(self, page_size: int = STATS_PAGE_SIZE) -> Dict[Tuple[str, str], int]:
+        """
+        Count chunks per (source, source_type) by paging through metadata.
+        
+        Memory stays bounded by `page_size` however large the collection is.
+        """
+        counts: Dict[Tuple[str, str], int] = {}
+        for collection in self.collections():
+            offset = 0
+            while True:
+                page = collection.get(include=["metadatas"], limit=page_size, offset=offset)
+                metadatas = page['metadatas'] or []
+                for metadata in metadatas:
+                    key = self._count_key(metadata)
+                    counts[key] = counts.get(key, 0) + 1
+                if len(metadatas) < page_size:
+                    break
+                offset += page_size
+        return counts
+    
+    def recount(self, page_size: int = STATS_PAGE_SIZE) -> Dict[str, Any]:
+        """
+        Rebuild the registry's chunk counters from the collection.
+        
+        Returns:
+            The recounted totals (same shape as Registry.get_chunk_stats)
+        """
+        if self.registry is None:
+            raise ValueError("recount needs a ChromaManager with a registry")
+        
+        start = time.perf_counter()
+        counts = self.count_documents(page_size)
+        self.registry.replace_chunk_counts(counts)
+        summary = self._summarize(counts)
+        logger.info(
+            f"Recounted {summary['total_documents']} documents from "
+            f"{summary['total_sources']} sources in {time.perf_counter() - start:.1f}s"
+        )
+        return summary
+    
+    @staticmethod
+    def _summarize(counts: Dict[Tuple[str, str], int]) -> Dict[str, Any]:
+        by_type: Dict[str, int] = {}
+        for (_, source_type), count in counts.items():
+            by_type[source_type] = by_type.get(source_type, 0) + count
+        return {
+            'total_documents': sum(counts.values()),
+            'total_sources': len(counts),
+            'documents_by_type': by_type
+        }
+    
     def reset_collection(self):
-        """Delete all documents from the collection (use with caution!)."""
+        """Delete all documents and shards (use with caution!)."""
         try:
-            self.client.delete_collection(name=COLLECTION_NAME)
-            self.collection = self.client.create_collection(
-                name=COLLECTION_NAME,
-                metadata={"description": "SmartDoc workspace knowledge base"}
-            )
-            logger.warning(f"Collection '{COLLECTION_NAME}' has been reset")
+            with self._write_lock:
+                # Keep the workspace's index profile
+                profile = self.index_info()['profile']
+                if profile not in INDEX_PROFILES:
+                    profile = INDEX_PROFILE
+                
+                for name, _ in self._shard_items():
+                    self.client.delete_collection(name=name)
+                self._shards = {}
+                self.client.delete_collection(name=COLLECTION_NAME)
+                self._collection = self._create_collection(profile=profile)
+                self.drop_compact_store()
+                if self.registry is not None:
+                    self.registry.replace_chunk_counts({})
+                logger.warning(f"Collection '{COLLECTION_NAME}' has been reset")
         except Exception as e:
             logger.error(f"Failed to reset collection: {e}")
             raise
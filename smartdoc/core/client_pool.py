@@ -0,0 +1,148 @@
+"""
+Process-wide pool of ChromaDB persistent clients.
+
+Opening a PersistentClient loads the workspace's SQLite metadata and HNSW
+segments, so every ChromaManager and the web manager get their clients
+from here: one client per persist directory per process, with the least
+recently used closed once more than CHROMA_MAX_CLIENTS are open.
+
+A ChromaManager registers itself as a holder of its client, and a client
+with a live holder is never evicted: scanning many workspaces (the web
+manager) must not stop the active workspace's client mid-operation.
+Holders are weak references, so a manager that goes away releases its
+client without an explicit call.
+"""
+
+import logging
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from ..config import CHROMA_MAX_CLIENTS
+
+logger = logging.getLogger(__name__)
+
+
+class ClientPool:
+    """LRU of open ChromaDB clients keyed by persist directory."""
+
+    def __init__(self, max_clients: int = CHROMA_MAX_CLIENTS):
+        self.max_clients = max_clients
+        self._clients: "OrderedDict[str, Any]" = OrderedDict()
+        self._holders: Dict[str, "weakref.WeakSet"] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(persist_dir: str) -> str:
+        return os.path.realpath(persist_dir)
+
+    def get(self, persist_dir: str, holder: Optional[Any] = None):
+        """
+        Open client for `persist_dir`, creating it (and evicting the LRU
+        unheld one) if needed.
+
+        Args:
+            holder: Object using the client for its lifetime (a
+                ChromaManager); the client stays open while it is alive
+        """
+        key = self._key(persist_dir)
+        with self._lock:
+            if holder is not None:
+                self._holders.setdefault(key, weakref.WeakSet()).add(holder)
+            client = self._clients.get(key)
+            if client is not None:
+                self._clients.move_to_end(key)
+                return client
+
+            import chromadb
+            from chromadb.config import Settings
+
+            client = chromadb.PersistentClient(
+                path=key,
+                settings=Settings(
+                    anonymized_telemetry=False,
+                    allow_reset=True
+                )
+            )
+            self._clients[key] = client
+            self._evict(keep=key)
+            return client
+
+    def _evict(self, keep: str):
+        """Close least recently used clients beyond the limit, skipping held ones (caller holds the lock)."""
+        for key in list(self._clients):
+            if len(self._clients) <= self.max_clients:
+                return
+            if key == keep or self._holders.get(key):
+                continue
+            self._holders.pop(key, None)
+            self._close(key, self._clients.pop(key))
+        if len(self._clients) > self.max_clients:
+            logger.debug(f"{len(self._clients)} ChromaDB clients open, all in use (limit {self.max_clients})")
+
+    def release(self, persist_dir: str, holder: Any):
+        """Stop holding a client; it becomes evictable once no holder is left."""
+        with self._lock:
+            holders = self._holders.get(self._key(persist_dir))
+            if holders is not None:
+                holders.discard(holder)
+
+    def is_open(self, client) -> bool:
+        """True if `client` is still held by the pool (not evicted or closed)."""
+        with self._lock:
+            return any(c is client for c in self._clients.values())
+
+    def open_paths(self) -> List[str]:
+        """Persist directories with an open client, least recently used first."""
+        with self._lock:
+            return list(self._clients.keys())
+
+    def close(self, persist_dir: str):
+        """Close the client of one persist directory, if open."""
+        key = self._key(persist_dir)
+        with self._lock:
+            client = self._clients.pop(key, None)
+            self._holders.pop(key, None)
+            if client is not None:
+                self._close(key, client)
+
+    def close_all(self):
+        with self._lock:
+            self._holders.clear()
+            while self._clients:
+                key, client = self._clients.popitem(last=False)
+                self._close(key, client)
+
+    @staticmethod
+    def _close(key: str, client):
+        """
+        Stop a client's system so its files and segments are released.
+
+        Chroma shares one System per path across PersistentClient instances
+        and has no public close, so drop it from that cache and stop it.
+        """
+        try:
+            from chromadb.api.client import SharedSystemClient
+
+            systems = getattr(SharedSystemClient, '_identifer_to_system', {})
+            system = systems.pop(getattr(client, '_identifier', key), None)
+            if system is not None:
+                system.stop()
+            logger.debug(f"Closed ChromaDB client for {key}")
+        except Exception as e:
+            logger.debug(f"Could not close ChromaDB client for {key}: {e}")
+
+
+_pool = ClientPool()
+
+
+def get_client(persist_dir: str, holder: Optional[Any] = None):
+    """Shared client for a ChromaDB directory (see ClientPool.get)."""
+    return _pool.get(persist_dir, holder=holder)
+
+
+def get_pool() -> ClientPool:
+    """The process-wide pool."""
+    return _pool
@@ -0,0 +1,423 @@
+"""
+Compact vector storage for large workspaces.
+
+ChromaDB keeps every vector as float32 in both its HNSW index and its
+SQLite store. In compact mode a workspace's collections instead hold
+vectors reduced to COMPACT_DIMENSIONS by a PCA projection fitted on the
+workspace's own embeddings, and the full-dimension vectors move to a
+float16 side store next to chroma_db. Queries search the reduced index for
+COMPACT_RESCORE_FACTOR times more candidates than requested, then re-score
+those candidates against their full vectors and keep the best.
+
+`compact_workspace` and `expand_workspace` convert a workspace in either
+direction. Compact mode is tagged per collection (`compact_dims` in its
+metadata), so an interrupted conversion leaves every collection usable and
+running it again finishes the job.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..config import (
+    COMPACT_DIMENSIONS, COMPACT_FIT_SAMPLE, COMPACT_EVAL_QUERIES,
+    REBUILD_PAGE_SIZE
+)
+
+logger = logging.getLogger(__name__)
+
+STORE_FILENAME = "compact_vectors.db"
+
+
+def store_path(persist_dir: str) -> str:
+    """Side store of the workspace whose ChromaDB lives in `persist_dir`."""
+    return str(Path(persist_dir).parent / STORE_FILENAME)
+
+
+def fit_projection(vectors: np.ndarray, dims: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fit a PCA projection.
+
+    Returns:
+        (mean, components): the sample mean and the top `dims` principal
+        axes as a (dims, full_dims) matrix
+    """
+    if dims >= vectors.shape[1]:
+        raise ValueError(f"Compact dimensions ({dims}) must be below the embedding size ({vectors.shape[1]})")
+    if len(vectors) < dims:
+        raise ValueError(f"Need at least {dims} stored chunks to fit a {dims}-dimension projection")
+
+    mean = vectors.mean(axis=0)
+    _, _, vt = np.linalg.svd(vectors - mean, full_matrices=False)
+    return mean.astype(np.float32), vt[:dims].astype(np.float32)
+
+
+def distances(space: str, queries: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+    """Chroma-compatible distances between each query row and each vector row."""
+    if space == 'l2':
+        return (
+            (queries ** 2).sum(axis=1)[:, None]
+            + (vectors ** 2).sum(axis=1)[None, :]
+            - 2 * queries @ vectors.T
+        )
+    if space == 'ip':
+        return 1 - queries @ vectors.T
+
+    queries = queries / np.clip(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12, None)
+    vectors = vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+    return 1 - queries @ vectors.T
+
+
+class CompactStore:
+    """
+    SQLite side store of a compact workspace: the PCA projection, float16
+    full vectors by chunk ID, and the figures recorded by the last conversion.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._projection: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS vectors (
+                    chunk_id TEXT PRIMARY KEY,
+                    vector BLOB NOT NULL
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL
+                )
+            """)
+
+    def _get_meta(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, items: Dict[str, bytes]):
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                    list(items.items())
+                )
+
+    @property
+    def projection(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """(mean, components) of the fitted projection, or None before fitting."""
+        if self._projection is None:
+            shape = self._get_meta('shape')
+            if shape is None:
+                return None
+            dims, full_dims = json.loads(shape)
+            mean = np.frombuffer(self._get_meta('mean'), dtype=np.float32)
+            components = np.frombuffer(self._get_meta('components'), dtype=np.float32).reshape(dims, full_dims)
+            self._projection = (mean, components)
+        return self._projection
+
+    def set_projection(self, mean: np.ndarray, components: np.ndarray):
+        self._set_meta({
+            'shape': json.dumps(list(components.shape)).encode(),
+            'mean': mean.astype(np.float32).tobytes(),
+            'components': components.astype(np.float32).tobytes()
+        })
+        self._projection = (mean.astype(np.float32), components.astype(np.float32))
+
+    @property
+    def dims(self) -> Optional[int]:
+        projection = self.projection
+        return projection[1].shape[0] if projection is not None else None
+
+    def project(self, vectors: Sequence[Sequence[float]]) -> List[List[float]]:
+        """Reduce full vectors with the fitted projection (L2-normalized)."""
+        projection = self.projection
+        if projection is None:
+            raise RuntimeError(f"Compact store {self.db_path} has no fitted projection")
+        mean, components = projection
+        reduced = (np.asarray(vectors, dtype=np.float32) - mean) @ components.T
+        reduced /= np.clip(np.linalg.norm(reduced, axis=1, keepdims=True), 1e-12, None)
+        return reduced.tolist()
+
+    @property
+    def info(self) -> Dict[str, Any]:
+        """Figures recorded by the last conversion (dims, recall, ...)."""
+        value = self._get_meta('info')
+        return json.loads(value) if value else {}
+
+    def set_info(self, info: Dict[str, Any]):
+        self._set_meta({'info': json.dumps(info).encode()})
+
+    def put_many(self, ids: Sequence[str], vectors: Sequence[Sequence[float]]):
+        """Store full vectors as float16."""
+        if not len(ids):
+            return
+        packed = np.asarray(vectors, dtype=np.float16)
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO vectors (chunk_id, vector) VALUES (?, ?)",
+                    [(chunk_id, row.tobytes()) for chunk_id, row in zip(ids, packed)]
+                )
+
+    def get_many(self, ids: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Full vectors (as float32) of the stored IDs among `ids`."""
+        found: Dict[str, np.ndarray] = {}
+        unique = list(dict.fromkeys(ids))
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(unique), 500):
+                chunk = unique[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT chunk_id, vector FROM vectors WHERE chunk_id IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                for chunk_id, blob in rows:
+                    found[chunk_id] = np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+        return found
+
+    def missing(self, ids: Sequence[str]) -> List[str]:
+        """IDs among `ids` without a stored full vector (vectors are not read)."""
+        unique = list(dict.fromkeys(ids))
+        present = set()
+        with self._lock:
+            for start in range(0, len(unique), 500):
+                chunk = unique[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                present.update(row[0] for row in self._conn.execute(
+                    f"SELECT chunk_id FROM vectors WHERE chunk_id IN ({placeholders})",
+                    chunk
+                ))
+        return [chunk_id for chunk_id in unique if chunk_id not in present]
+
+    def delete_many(self, ids: Sequence[str]):
+        if not len(ids):
+            return
+        with self._lock:
+            with self._conn:
+                self._conn.executemany("DELETE FROM vectors WHERE chunk_id = ?", [(i,) for i in ids])
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+
+    def size_bytes(self) -> int:
+        """On-disk size, WAL included."""
+        return sum(
+            path.stat().st_size
+            for path in (Path(self.db_path), Path(f"{self.db_path}-wal"))
+            if path.exists()
+        )
+
+    def close(self):
+        self._conn.close()
+
+
+def rescore(
+    results: Dict[str, Any],
+    query_embeddings: Sequence[Sequence[float]],
+    store: CompactStore,
+    space: str,
+    n_results: int
+) -> Dict[str, Any]:
+    """
+    Re-rank query candidates by their full-precision distance and keep the
+    top `n_results` per query.
+
+    Candidates without a stored full vector (chunks of collections that are
+    not compact) keep the distance Chroma computed, which is already exact.
+    """
+    fields = [key for key in ('ids', 'documents', 'metadatas', 'distances', 'embeddings')
+              if results.get(key) is not None]
+    rescored = {key: ([] if key in fields else value) for key, value in results.items()}
+    queries = np.asarray(query_embeddings, dtype=np.float32)
+
+    for q, ids in enumerate(results['ids']):
+        full = store.get_many(ids)
+        exact = list(results['distances'][q])
+        stored = [i for i, chunk_id in enumerate(ids) if chunk_id in full]
+        if stored:
+            computed = distances(space, queries[q:q + 1], np.stack([full[ids[i]] for i in stored]))[0]
+            for i, distance in zip(stored, computed.tolist()):
+                exact[i] = distance
+
+        order = sorted(range(len(ids)), key=lambda i: exact[i])[:n_results]
+        for key in fields:
+            values = exact if key == 'distances' else results[key][q]
+            rescored[key].append([values[i] for i in order])
+    return rescored
+
+
+def _sample_vectors(chroma, limit: int, page_size: int = REBUILD_PAGE_SIZE) -> Tuple[List[str], np.ndarray]:
+    """(ids, full vectors) of up to `limit` chunks spread over every collection."""
+    ids, vectors = [], []
+    collections = chroma.collections()
+    per_collection = max(1, limit // len(collections))
+    for collection in collections:
+        page_ids, page_vectors = chroma.full_vectors(collection, per_collection, page_size)
+        ids.extend(page_ids)
+        vectors.extend(page_vectors)
+    return ids, np.asarray(vectors, dtype=np.float32)
+
+
+def evaluate_recall(
+    chroma,
+    k: int = 5,
+    queries: int = COMPACT_EVAL_QUERIES,
+    noise: float = 0.05
+) -> Dict[str, Any]:
+    """
+    Recall@k of the workspace's search against brute force at full precision.
+
+    Query vectors are sampled chunk vectors plus a little Gaussian noise.
+    Both the compact path (reduced search + re-scoring) and the reduced
+    search alone are measured, so the figures show what re-scoring buys.
+    """
+    ids, vectors = _sample_vectors(chroma, COMPACT_FIT_SAMPLE)
+    if len(ids) < k:
+        return {}
+
+    rng = np.random.default_rng(0)
+    sample = rng.choice(len(ids), size=min(queries, len(ids)), replace=False)
+    probes = vectors[sample] + rng.normal(0, noise, (len(sample), vectors.shape[1])).astype(np.float32)
+    probes /= np.linalg.norm(probes, axis=1, keepdims=True)
+
+    space = chroma.index_info().get('space', 'l2')
+    truth = np.argsort(distances(space, probes, vectors), axis=1)[:, :k]
+
+    # Ground truth covers the sampled chunks only (all of them below
+    # COMPACT_FIT_SAMPLE), so hits outside the sample are skipped
+    sampled = set(ids)
+    rescored_hits, reduced_hits = [], []
+    for probe, expected in zip(probes, truth):
+        expected_ids = {ids[i] for i in expected}
+        rescored = chroma.query_vectors([probe.tolist()], n_results=k * 4)
+        reduced = chroma.query_vectors([probe.tolist()], n_results=k * 4, rescore=False)
+        rescored_hits.append(len(expected_ids & set([i for i in rescored['ids'][0] if i in sampled][:k])) / k)
+        reduced_hits.append(len(expected_ids & set([i for i in reduced['ids'][0] if i in sampled][:k])) / k)
+
+    return {
+        'k': k,
+        'queries': len(probes),
+        'recall': float(np.mean(rescored_hits)),
+        'recall_without_rescore': float(np.mean(reduced_hits))
+    }
+
+
+def _missing_full_vectors(chroma, store, page_size: int = REBUILD_PAGE_SIZE) -> int:
+    """Chunks of compact collections whose full vector is not in the side store."""
+    missing = 0
+    for collection in chroma.collections():
+        if not chroma.compact_dims(collection):
+            continue
+        offset = 0
+        while True:
+            ids = collection.get(include=[], limit=page_size, offset=offset)['ids']
+            if not ids:
+                break
+            missing += len(store.missing(ids))
+            offset += len(ids)
+    return missing
+
+
+def compact_workspace(
+    chroma,
+    dims: int = COMPACT_DIMENSIONS,
+    on_progress: Optional[Callable[[int, int], None]] = None
+) -> Dict[str, Any]:
+    """
+    Switch a workspace to compact storage.
+
+    Fits the projection on a sample of the stored vectors (or reuses the
+    one an interrupted run already fitted), then rebuilds each collection
+    with reduced vectors while copying the full ones to the side store.
+    Writes to the workspace wait until the collections are converted.
+
+    Returns:
+        {'dims', 'full_dims', 'documents', 'collections', 'seconds', 'recall', ...}
+    """
+    start = time.perf_counter()
+    store = chroma.open_compact_store()
+
+    def transform(page):
+        store.put_many(page['ids'], page['embeddings'])
+        missing = store.missing(page['ids'])
+        if missing:
+            raise RuntimeError(f"{len(missing)} full vectors were not written to {store.db_path}")
+        return store.project(page['embeddings'])
+
+    with chroma.exclusive_writes():
+        if store.dims != dims:
+            if any(chroma.compact_dims(c) for c in chroma.collections()):
+                raise ValueError("Workspace is already compact with other dimensions; run `smartdoc compact --expand` first")
+            _, sample = _sample_vectors(chroma, COMPACT_FIT_SAMPLE)
+            if not len(sample):
+                raise ValueError("Workspace has no chunks to fit a projection on; index something first")
+            logger.info(f"Fitting a {dims}-dimension projection on {len(sample)} vectors...")
+            store.set_projection(*fit_projection(sample, dims))
+
+        rebuilt = chroma.rebuild_collections(
+            compact_dims=dims,
+            transform=transform,
+            on_progress=on_progress
+        )
+    recall = evaluate_recall(chroma)
+    info = {
+        'dims': dims,
+        'full_dims': int(store.projection[1].shape[1]),
+        'compacted_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        **{f"recall_{key}" if key in ('k', 'queries') else key: value for key, value in recall.items()}
+    }
+    store.set_info(info)
+
+    seconds = time.perf_counter() - start
+    logger.info(f"Compacted {rebuilt['documents']} documents to {dims} dimensions in {seconds:.1f}s")
+    return {**info, 'documents': rebuilt['documents'], 'collections': rebuilt['collections'], 'seconds': seconds}
+
+
+def expand_workspace(
+    chroma,
+    on_progress: Optional[Callable[[int, int], None]] = None
+) -> Dict[str, Any]:
+    """
+    Switch a compact workspace back to full vectors from the side store.
+
+    The restored vectors went through float16, which changes rankings only
+    in the last decimals. The side store is deleted once every collection
+    is converted. Writes to the workspace wait until then, and nothing is
+    converted unless the side store holds every compact chunk's vector.
+    """
+    start = time.perf_counter()
+    store = chroma.open_compact_store()
+
+    def transform(page):
+        full = store.get_many(page['ids'])
+        missing = [chunk_id for chunk_id in page['ids'] if chunk_id not in full]
+        if missing:
+            raise RuntimeError(f"{len(missing)} chunks have no full vector in {store.db_path}")
+        return [full[chunk_id].tolist() for chunk_id in page['ids']]
+
+    with chroma.exclusive_writes():
+        missing = _missing_full_vectors(chroma, store)
+        if missing:
+            raise RuntimeError(
+                f"{missing} compact chunks have no full vector in {store.db_path}; "
+                f"nothing was converted (re-index their sources, then expand again)"
+            )
+        rebuilt = chroma.rebuild_collections(compact_dims=0, transform=transform, on_progress=on_progress)
+        chroma.drop_compact_store()
+
+    seconds = time.perf_counter() - start
+    logger.info(f"Expanded {rebuilt['documents']} documents to full vectors in {seconds:.1f}s")
+    return {'documents': rebuilt['documents'], 'collections': rebuilt['collections'], 'seconds': seconds}
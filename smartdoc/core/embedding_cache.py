@@ -0,0 +1,233 @@
+"""
+Persistent embedding cache keyed by (content hash, embedding model).
+
+Chunks are identified by the same MD5 content hash the ingestors compute,
+so re-indexing an unchanged document, or indexing a chunk another source
+already contains, reuses the stored vector instead of running the model.
+The cache lives in the workspace, is bounded by EMBEDDING_CACHE_MAX_ENTRIES
+and evicts least-recently-used vectors first.
+
+The CLI and the daemon may write to the same cache, so the entry count is
+a row of the database, updated in the same transaction as the inserts and
+evictions, rather than a per-process counter.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Any, Callable, Dict, List, Optional
+
+from ..config import EMBEDDING_CACHE_MAX_ENTRIES, workspace
+
+logger = logging.getLogger(__name__)
+
+# Rows evicted beyond the limit at once, so eviction is not paid on every insert
+EVICTION_SLACK = 0.05
+
+
+def content_hash(text: str) -> str:
+    """MD5 of the chunk text (same as BaseIngestor.hash_content)."""
+    return hashlib.md5(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """SQLite-backed LRU cache of float32 embedding vectors."""
+
+    def __init__(self, db_path: Optional[str] = None, max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES):
+        """
+        Args:
+            db_path: Cache database (default: the workspace's embedding_cache.db)
+            max_entries: Vectors kept before least-recently-used ones are evicted
+        """
+        if db_path is None:
+            db_path = workspace.bootstrap().embedding_cache_db
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._init_database()
+
+    def _init_database(self):
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    content_hash TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (content_hash, model)
+                )
+            """)
+            self._conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_embeddings_last_used
+                ON embeddings(last_used)
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_stats (
+                    model TEXT PRIMARY KEY,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    misses INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_meta (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                )
+            """)
+            # Caches created before the counter existed are counted once
+            if self._conn.execute("SELECT 1 FROM cache_meta WHERE key = 'entries'").fetchone() is None:
+                self._conn.execute(
+                    "INSERT INTO cache_meta (key, value) SELECT 'entries', COUNT(*) FROM embeddings"
+                )
+
+    def _entry_count(self) -> int:
+        row = self._conn.execute("SELECT value FROM cache_meta WHERE key = 'entries'").fetchone()
+        return row[0] if row else 0
+
+    def get_many(self, hashes: List[str], model: str) -> Dict[str, List[float]]:
+        """
+        Look up vectors and mark them as recently used.
+
+        Returns:
+            Mapping of content hash to vector for the hashes that were cached
+        """
+        if not hashes:
+            return {}
+
+        unique = list(dict.fromkeys(hashes))
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(unique), 500):
+                chunk = unique[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT content_hash, vector FROM embeddings "
+                    f"WHERE model = ? AND content_hash IN ({placeholders})",
+                    [model, *chunk]
+                ).fetchall()
+                for digest, blob in rows:
+                    vector = array('f')
+                    vector.frombytes(blob)
+                    found[digest] = vector.tolist()
+
+            now = time.time()
+            with self._conn:
+                if found:
+                    self._conn.executemany(
+                        "UPDATE embeddings SET last_used = ? WHERE content_hash = ? AND model = ?",
+                        [(now, digest, model) for digest in found]
+                    )
+                hits = sum(1 for digest in hashes if digest in found)
+                self._conn.execute(
+                    """
+                    INSERT INTO cache_stats (model, hits, misses) VALUES (?, ?, ?)
+                    ON CONFLICT(model) DO UPDATE SET
+                        hits = hits + excluded.hits,
+                        misses = misses + excluded.misses
+                    """,
+                    (model, hits, len(hashes) - hits)
+                )
+        return found
+
+    def put_many(self, items: Dict[str, List[float]], model: str):
+        """Store vectors by content hash, evicting the least recently used beyond the limit."""
+        if not items:
+            return
+
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                before = self._conn.total_changes
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO embeddings (content_hash, model, vector, last_used) VALUES (?, ?, ?, ?)",
+                    [(digest, model, array('f', vector).tobytes(), now) for digest, vector in items.items()]
+                )
+                added = self._conn.total_changes - before
+                if not added:
+                    return
+                self._conn.execute(
+                    "UPDATE cache_meta SET value = value + ? WHERE key = 'entries'", (added,)
+                )
+
+                if self._entry_count() > self.max_entries:
+                    # Recount while holding the write lock, and resync the counter
+                    entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+                    excess = entries - self.max_entries + int(self.max_entries * EVICTION_SLACK)
+                    if entries > self.max_entries:
+                        entries -= self._conn.execute(
+                            """
+                            DELETE FROM embeddings WHERE rowid IN (
+                                SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?
+                            )
+                            """,
+                            (excess,)
+                        ).rowcount
+                        logger.debug(f"Evicted {excess} cached embeddings")
+                    self._conn.execute(
+                        "UPDATE cache_meta SET value = ? WHERE key = 'entries'", (entries,)
+                    )
+
+    def embed(
+        self,
+        texts: List[str],
+        model: str,
+        embed_fn: Callable[[List[str]], List[List[float]]]
+    ) -> List[List[float]]:
+        """
+        Embed texts, running `embed_fn` only on the ones not cached for `model`.
+
+        Returns:
+            Vectors in input order
+        """
+        hashes = [content_hash(text) for text in texts]
+        vectors = self.get_many(hashes, model)
+
+        missing: Dict[str, str] = {}
+        for digest, text in zip(hashes, texts):
+            if digest not in vectors and digest not in missing:
+                missing[digest] = text
+
+        if missing:
+            fresh = dict(zip(missing.keys(), embed_fn(list(missing.values()))))
+            self.put_many(fresh, model)
+            vectors.update(fresh)
+
+        return [vectors[digest] for digest in hashes]
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count, size on disk and lifetime hit rate (no table scan)."""
+        with self._lock:
+            hits, misses = self._conn.execute(
+                "SELECT COALESCE(SUM(hits), 0), COALESCE(SUM(misses), 0) FROM cache_stats"
+            ).fetchone()
+            entries = self._entry_count()
+            page_count = self._conn.execute("PRAGMA page_count").fetchone()[0]
+            page_size = self._conn.execute("PRAGMA page_size").fetchone()[0]
+            size = page_count * page_size
+
+        lookups = hits + misses
+        return {
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'size_mb': round(size / (1024 * 1024), 2),
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / lookups if lookups else 0.0
+        }
+
+    def clear(self):
+        """Drop every cached vector and reset the counters."""
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM embeddings")
+                self._conn.execute("DELETE FROM cache_stats")
+                self._conn.execute("UPDATE cache_meta SET value = 0 WHERE key = 'entries'")
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,229 @@
+"""
+Local embedding engine for EMBEDDING_MODEL.
+
+Runs the model's ONNX export on CPU with ONNX Runtime: weights are fetched
+once from the Hugging Face Hub, optionally quantized to int8, and inference
+uses every core through intra-op threads. An EmbeddingEngine is a valid
+Chroma embedding function, so the collection and the batched writer share it.
+"""
+
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from ..config import (
+    EMBEDDING_MODEL, EMBEDDING_QUANTIZE, EMBEDDING_BATCH_SIZE,
+    EMBEDDING_THREADS, EMBEDDING_MAX_LENGTH, MODELS_CACHE_DIR
+)
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingEngine:
+    """
+    Batched CPU inference for a sentence-embedding model.
+
+    The tokenizer and ONNX session are loaded on first use. Embeddings are
+    CLS-pooled and L2-normalized (the BGE family's recipe), so cosine and
+    inner-product distances agree.
+    """
+
+    def __init__(
+        self,
+        model_name: str = EMBEDDING_MODEL,
+        quantize: bool = EMBEDDING_QUANTIZE,
+        threads: int = EMBEDDING_THREADS,
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+        max_length: int = EMBEDDING_MAX_LENGTH
+    ):
+        """
+        Args:
+            model_name: Hugging Face model id with an ONNX export (onnx/model.onnx)
+            quantize: Run a dynamically int8-quantized copy of the model
+            threads: Intra-op threads (0 = all cores)
+            batch_size: Texts per inference call
+            max_length: Token limit per text (longer texts are truncated)
+        """
+        self.model_name = model_name
+        self.quantize = quantize
+        self.threads = threads or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self._session = None
+        self._tokenizer = None
+        self._length_tokenizer = None
+        self._input_names: List[str] = []
+        self._load_lock = threading.Lock()
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        """Chroma embedding function interface."""
+        return self.embed(input)
+
+    @property
+    def session(self):
+        """ONNX Runtime inference session (loaded on first use)."""
+        if self._session is None:
+            self._load()
+        return self._session
+
+    @property
+    def tokenizer(self):
+        """Fast tokenizer (loaded on first use)."""
+        if self._tokenizer is None:
+            self._load()
+        return self._tokenizer
+
+    def length_tokenizer(self):
+        """
+        The model's tokenizer without truncation or padding, for measuring
+        text (loads only tokenizer.json, not the model).
+        """
+        if self._length_tokenizer is None:
+            from huggingface_hub import hf_hub_download
+            from tokenizers import Tokenizer
+
+            tokenizer = Tokenizer.from_file(hf_hub_download(self.model_name, "tokenizer.json"))
+            tokenizer.no_truncation()
+            tokenizer.no_padding()
+            self._length_tokenizer = tokenizer
+        return self._length_tokenizer
+
+    def _load(self):
+        """Download (once), optionally quantize, and open the model."""
+        with self._load_lock:
+            if self._session is not None:
+                return
+
+            import onnxruntime as ort
+            from tokenizers import Tokenizer
+
+            model_path, tokenizer_path = self._fetch_model()
+            if self.quantize:
+                model_path = self._quantized(model_path)
+
+            tokenizer = Tokenizer.from_file(str(tokenizer_path))
+            tokenizer.enable_truncation(max_length=self.max_length)
+            tokenizer.enable_padding()
+
+            options = ort.SessionOptions()
+            options.intra_op_num_threads = self.threads
+            options.inter_op_num_threads = 1
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+            session = ort.InferenceSession(
+                str(model_path),
+                sess_options=options,
+                providers=["CPUExecutionProvider"]
+            )
+
+            self._input_names = [i.name for i in session.get_inputs()]
+            self._tokenizer = tokenizer
+            self._session = session
+            logger.info(
+                f"Embedding model {self.model_name} loaded "
+                f"({'int8' if self.quantize else 'fp32'}, {self.threads} threads)"
+            )
+
+    def _fetch_model(self) -> Tuple[Path, Path]:
+        """Local paths of the ONNX model and tokenizer, downloading them if needed."""
+        from huggingface_hub import hf_hub_download
+
+        try:
+            model_path = hf_hub_download(self.model_name, "onnx/model.onnx")
+            tokenizer_path = hf_hub_download(self.model_name, "tokenizer.json")
+        except Exception as e:
+            raise RuntimeError(
+                f"Could not fetch the ONNX export of {self.model_name}: {e}"
+            ) from e
+        return Path(model_path), Path(tokenizer_path)
+
+    def _quantized(self, model_path: Path) -> Path:
+        """Path of the int8 copy of the model, quantizing it on first use."""
+        target_dir = Path(MODELS_CACHE_DIR) / self.model_name.replace('/', '__')
+        target = target_dir / "model_int8.onnx"
+        if target.exists():
+            return target
+
+        try:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+        except ImportError as e:
+            raise RuntimeError("EMBEDDING_QUANTIZE requires the 'onnx' package (pip install onnx)") from e
+
+        target_dir.mkdir(parents=True, exist_ok=True)
+        partial = target.with_suffix(".partial")
+        logger.info(f"Quantizing {self.model_name} to int8 (one-time)...")
+        quantize_dynamic(str(model_path), str(partial), weight_type=QuantType.QInt8)
+        partial.replace(target)
+        return target
+
+    @property
+    def cache_key(self) -> str:
+        """Identifies this engine's vectors in the embedding cache."""
+        return f"{self.model_name}:int8" if self.quantize else self.model_name
+
+    @property
+    def dimensions(self) -> int:
+        """Embedding size."""
+        return len(self.embed(["dimension probe"])[0])
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts in batches of `batch_size`.
+
+        Texts are sorted by length before batching so each batch pads to a
+        similar length; results are returned in input order.
+        """
+        if not texts:
+            return []
+
+        import numpy as np
+
+        session = self.session
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+
+        for start in range(0, len(order), self.batch_size):
+            batch_idx = order[start:start + self.batch_size]
+            encodings = self.tokenizer.encode_batch([texts[i] for i in batch_idx])
+
+            feeds = {}
+            if 'input_ids' in self._input_names:
+                feeds['input_ids'] = np.array([e.ids for e in encodings], dtype=np.int64)
+            if 'attention_mask' in self._input_names:
+                feeds['attention_mask'] = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+            if 'token_type_ids' in self._input_names:
+                feeds['token_type_ids'] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+
+            last_hidden_state = session.run(None, feeds)[0]
+            cls = last_hidden_state[:, 0]
+            cls = cls / np.clip(np.linalg.norm(cls, axis=1, keepdims=True), 1e-12, None)
+
+            for i, vector in zip(batch_idx, cls.tolist()):
+                vectors[i] = vector
+
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query string."""
+        return self.embed([text])[0]
+
+
+_engines: Dict[Tuple[str, bool, int], EmbeddingEngine] = {}
+_engines_lock = threading.Lock()
+
+
+def get_embedding_engine(
+    model_name: str = EMBEDDING_MODEL,
+    quantize: bool = EMBEDDING_QUANTIZE,
+    threads: int = EMBEDDING_THREADS
+) -> EmbeddingEngine:
+    """Process-wide engine for a model configuration (the model is loaded once)."""
+    key = (model_name, quantize, threads)
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = EmbeddingEngine(model_name, quantize=quantize, threads=threads)
+            _engines[key] = engine
+        return engine
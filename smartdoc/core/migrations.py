@@ -0,0 +1,162 @@
+"""
+Versioned schema of the registry database.
+
+The schema version lives in SQLite's `PRAGMA user_version`. Each entry of
+MIGRATIONS upgrades the database by one version; `migrate` applies the
+missing ones in a single transaction and refreshes the planner statistics
+with ANALYZE. A registry that is already current costs one pragma read.
+
+Databases created before versioning report version 0; the baseline
+migration is written to bring any of them (and empty files) to the same
+schema, so it only creates what is missing.
+"""
+
+import logging
+import sqlite3
+from typing import Callable, List
+
+logger = logging.getLogger(__name__)
+
+
+def _add_missing_columns(conn: sqlite3.Connection, table: str, columns: List[str]):
+    """ALTER TABLE ADD COLUMN for each `name type` definition the table lacks."""
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    for column in columns:
+        if column.split()[0] not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column}")
+
+
+def _baseline(conn: sqlite3.Connection):
+    """v1: the tables and columns of every release before versioning."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sources (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source_type TEXT NOT NULL,
+            source_path TEXT NOT NULL UNIQUE,
+            indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            file_size INTEGER,
+            status TEXT DEFAULT 'pending',
+            metadata TEXT,
+            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schematic_cache (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source_id INTEGER NOT NULL,
+            image_hash TEXT NOT NULL,
+            page_number INTEGER,
+            last_query TEXT,
+            vision_result TEXT,
+            analyzed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(source_id) REFERENCES sources(id) ON DELETE CASCADE,
+            UNIQUE(image_hash, last_query)
+        )
+    """)
+    _add_missing_columns(conn, 'schematic_cache', [
+        "hits INTEGER NOT NULL DEFAULT 0",
+        "last_hit TIMESTAMP"
+    ])
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS processing_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source_id INTEGER NOT NULL,
+            step TEXT NOT NULL,
+            status TEXT NOT NULL,
+            message TEXT,
+            details TEXT,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(source_id) REFERENCES sources(id) ON DELETE CASCADE
+        )
+    """)
+    _add_missing_columns(conn, 'processing_logs', [
+        "duration_ms REAL",
+        "cpu_ms REAL"
+    ])
+
+    # Chunk counters, maintained alongside every ChromaDB add/delete so
+    # statistics never have to scan the collection
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS chunk_counts (
+            source_path TEXT PRIMARY KEY,
+            source_type TEXT NOT NULL,
+            chunks INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_source_type ON sources(source_type)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_image_hash ON schematic_cache(image_hash)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_log_source ON processing_logs(source_id)")
+
+
+def _hot_path_indexes(conn: sqlite3.Connection):
+    """v2: indexes matching the registry's query shapes."""
+    # get_processing_logs: WHERE source_id = ? ORDER BY timestamp, id
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_log_source_time ON processing_logs(source_id, timestamp)")
+    # get_schematic_cache: WHERE image_hash = ? [AND last_query = ?] ORDER BY analyzed_at DESC
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_schematic_hash_time ON schematic_cache(image_hash, analyzed_at)")
+    # get_source_schematics and the delete_source cascade
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_schematic_source ON schematic_cache(source_id, page_number)")
+    # Eviction order of prune_schematic_cache
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_schematic_last_use ON schematic_cache(COALESCE(last_hit, analyzed_at))")
+    # list_sources: ORDER BY indexed_at DESC, optionally per type
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_source_type_indexed ON sources(source_type, indexed_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_source_indexed ON sources(indexed_at)")
+
+    # Prefixes of the indexes above, or of UNIQUE(source_path)
+    for index in ('idx_log_source', 'idx_image_hash', 'idx_source_type', 'idx_source_path'):
+        conn.execute(f"DROP INDEX IF EXISTS {index}")
+
+
+# Position + 1 is the schema version a migration produces. Append only.
+MIGRATIONS: List[Callable[[sqlite3.Connection], None]] = [
+    _baseline,
+    _hot_path_indexes,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """
+    Bring a registry database to SCHEMA_VERSION.
+
+    Safe against concurrent openers: the version is re-read under a write
+    lock, so only one process applies a given migration.
+
+    Returns:
+        The schema version of the database afterwards
+    """
+    version = schema_version(conn)
+    if version >= SCHEMA_VERSION:
+        if version > SCHEMA_VERSION:
+            logger.warning(f"Registry schema v{version} is newer than this SmartDoc (v{SCHEMA_VERSION})")
+        return version
+
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Another process may have migrated since the first read
+        start = schema_version(conn)
+        for step in range(start, SCHEMA_VERSION):
+            MIGRATIONS[step](conn)
+        version = max(start, SCHEMA_VERSION)
+        conn.execute(f"PRAGMA user_version = {version}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    if version > start:
+        logger.info(f"Migrated registry schema v{start} → v{version}")
+        # Planner statistics for the new indexes
+        conn.execute("ANALYZE")
+        conn.commit()
+    return version
@@ -0,0 +1,135 @@
+"""
+Buffered processing-log sink for ingestion.
+
+Ingestors record each step of a source through a ProcessingLog instead of
+committing one `processing_logs` row per call. Entries are kept in memory
+and written with one `executemany` when a step ends, when
+LOG_BUFFER_SIZE entries are waiting, or LOG_FLUSH_INTERVAL seconds after
+the first unflushed entry. Closing the log (or leaving its `with` block,
+failures included) flushes whatever is left.
+
+`step()` times a block: wall-clock and CPU milliseconds are stored with the
+entry, so `smartdoc logs` doubles as a per-step profile.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ..config import LOG_BUFFER_SIZE, LOG_FLUSH_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+
+class StepRecord:
+    """Outcome of a timed step; the block may set status, message and details."""
+
+    def __init__(self, name: str, message: Optional[str] = None):
+        self.name = name
+        self.status = 'success'
+        self.message = message
+        self.details: Dict[str, Any] = {}
+
+
+class ProcessingLog:
+    """Per-source buffer of processing log entries."""
+
+    def __init__(
+        self,
+        registry,
+        source_id: int,
+        buffer_size: int = LOG_BUFFER_SIZE,
+        flush_interval: float = LOG_FLUSH_INTERVAL
+    ):
+        """
+        Args:
+            registry: Registry the entries are written to
+            source_id: Source the entries belong to
+            buffer_size: Entries buffered before a flush is forced
+            flush_interval: Seconds an entry may wait before a timed flush
+        """
+        self.registry = registry
+        self.source_id = source_id
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self._entries: List[Tuple] = []
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    def __enter__(self) -> "ProcessingLog":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def log(
+        self,
+        step: str,
+        status: str,
+        message: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None,
+        duration_ms: Optional[float] = None,
+        cpu_ms: Optional[float] = None
+    ):
+        """Buffer one entry (same fields as Registry.log_processing_step)."""
+        # Stamped now, not at flush time, so entries keep their order and time
+        timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+        with self._lock:
+            self._entries.append((self.source_id, step, status, message, details, duration_ms, cpu_ms, timestamp))
+            pending = len(self._entries)
+            if pending == 1 and self.flush_interval > 0:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if pending >= self.buffer_size:
+            self.flush()
+
+    @contextmanager
+    def step(self, name: str, message: Optional[str] = None) -> Iterator[StepRecord]:
+        """
+        Time a step and log it when the block ends, then flush.
+
+        CPU time is the calling thread's, so work the step hands to other
+        threads (the Chroma writer, ONNX Runtime) only shows in the wall time.
+        A block that raises is logged as 'failed' with the error.
+        """
+        record = StepRecord(name, message)
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield record
+        except Exception as e:
+            record.status = 'failed'
+            record.message = f"{record.message}: {e}" if record.message else str(e)
+            raise
+        finally:
+            self.log(
+                record.name,
+                record.status,
+                record.message,
+                record.details,
+                duration_ms=(time.perf_counter() - wall_start) * 1000,
+                cpu_ms=(time.thread_time() - cpu_start) * 1000
+            )
+            self.flush()
+
+    def flush(self):
+        """Write every buffered entry in one transaction."""
+        with self._lock:
+            entries, self._entries = self._entries, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not entries:
+            return
+        try:
+            self.registry.log_processing_steps(entries)
+        except Exception as e:
+            # Logs must never fail an ingestion
+            logger.warning(f"Could not write {len(entries)} processing log entries: {e}")
+
+    def close(self):
+        self.flush()
@@ -2,90 +2,162 @@
 SQLite-based registry for tracking indexed sources and schematic cache.
 """
 
+import base64
 import sqlite3
 import json
+import threading
+import weakref
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Iterator, List, Tuple
 from contextlib import contextmanager
 
-from ..config import REGISTRY_DB
+from ..config import (
+    REGISTRY_CACHE_KB, REGISTRY_BUSY_TIMEOUT, REGISTRY_STATEMENT_CACHE,
+    SCHEMATIC_CACHE_MAX_ENTRIES, SCHEMATIC_CACHE_MAX_AGE_DAYS, workspace
+)
+from .migrations import migrate
+from .schematic_cache import SchematicMemoryCache, HIT_FLUSH_THRESHOLD
+
+
+# Every column of `sources`, and the ones listings return by default
+SOURCE_COLUMNS = (
+    'id', 'source_type', 'source_path', 'indexed_at', 'file_size',
+    'status', 'metadata', 'last_updated'
+)
+LIST_COLUMNS = ('id', 'source_type', 'source_path', 'indexed_at', 'file_size', 'status')
+
+
+def _encode_cursor(indexed_at: str, source_id: int) -> str:
+    """Opaque page cursor for the (indexed_at, id) sort key."""
+    return base64.urlsafe_b64encode(json.dumps([indexed_at, source_id]).encode('utf-8')).decode('ascii')
+
+
+def _decode_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        indexed_at, source_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return indexed_at, int(source_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid page cursor: {cursor}") from e
+
+
+class _ThreadConnection:
+    """A thread's registry connection; closed when the thread exits or the registry closes."""
+    
+    __slots__ = ('conn', 'depth', '__weakref__')
+    
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.depth = 0  # Nesting of transaction() blocks
+    
+    def __del__(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
 
 
 class Registry:
-    """Manages the SQLite registry for tracking sources and schematic analysis cache."""
+    """
+    Manages the SQLite registry for tracking sources and schematic analysis cache.
+    
+    Each thread keeps one long-lived connection (WAL journal,
+    synchronous=NORMAL, a REGISTRY_CACHE_KB page cache), so calls reuse the
+    connection's page cache and prepared statements instead of reopening
+    the database. Every method commits on its own unless it runs inside
+    `transaction()`.
     
-    def __init__(self, db_path: str = REGISTRY_DB):
+    Schematic cache lookups go through an in-process LRU first
+    (core.schematic_cache); the table itself is capped by
+    SCHEMATIC_CACHE_MAX_ENTRIES and SCHEMATIC_CACHE_MAX_AGE_DAYS.
+    """
+    
+    def __init__(self, db_path: Optional[str] = None):
+        # Default to the current workspace, bootstrapping it on first use
+        if db_path is None:
+            db_path = workspace.bootstrap().registry_db
         self.db_path = db_path
+        self._local = threading.local()
+        self._open: "weakref.WeakSet[_ThreadConnection]" = weakref.WeakSet()
+        self._schematics = SchematicMemoryCache()
         self._init_database()
     
+    def _connect(self) -> sqlite3.Connection:
+        """Open and tune a connection."""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=REGISTRY_BUSY_TIMEOUT,
+            cached_statements=REGISTRY_STATEMENT_CACHE,
+            # Used by one thread only, but closed from whichever thread ends it
+            check_same_thread=False
+        )
+        conn.row_factory = sqlite3.Row  # Enable dict-like access
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA cache_size=-{int(REGISTRY_CACHE_KB)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+    
+    @property
+    def _thread(self) -> _ThreadConnection:
+        """This thread's connection (opened on first use)."""
+        current = getattr(self._local, 'current', None)
+        if current is None:
+            current = self._local.current = _ThreadConnection(self._connect())
+            self._open.add(current)
+        return current
+    
     @contextmanager
     def _get_connection(self):
-        """Context manager for database connections."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Enable dict-like access
+        """This thread's connection; commits on exit unless inside `transaction()`."""
+        current = self._thread
+        if current.depth:
+            yield current.conn
+            return
+        try:
+            yield current.conn
+            current.conn.commit()
+        except Exception:
+            current.conn.rollback()
+            raise
+    
+    @contextmanager
+    def transaction(self):
+        """
+        Group several registry writes into one commit.
+        
+        Calls made by this thread inside the block share one transaction,
+        which commits when the outermost block exits and rolls back if it
+        raises. Blocks may nest.
+        """
+        current = self._thread
+        current.depth += 1
         try:
-            yield conn
-            conn.commit()
+            yield self
         except Exception:
-            conn.rollback()
+            current.depth -= 1
+            if not current.depth:
+                current.conn.rollback()
             raise
-        finally:
-            conn.close()
+        current.depth -= 1
+        if not current.depth:
+            current.conn.commit()
+    
+    def close(self):
+        """Close every thread's connection (the registry reconnects on next use)."""
+        try:
+            self.flush_schematic_hits()
+        except sqlite3.Error:
+            pass
+        for current in list(self._open):
+            current.conn.close()
+        self._open = weakref.WeakSet()
+        self._local = threading.local()
     
     def _init_database(self):
-        """Initialize the database schema."""
+        """Create or upgrade the schema (see core.migrations)."""
         with self._get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Sources table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS sources (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    source_type TEXT NOT NULL,
-                    source_path TEXT NOT NULL UNIQUE,
-                    indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    file_size INTEGER,
-                    status TEXT DEFAULT 'pending',
-                    metadata TEXT,
-                    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Schematic cache table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS schematic_cache (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    source_id INTEGER NOT NULL,
-                    image_hash TEXT NOT NULL,
-                    page_number INTEGER,
-                    last_query TEXT,
-                    vision_result TEXT,
-                    analyzed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY(source_id) REFERENCES sources(id) ON DELETE CASCADE,
-                    UNIQUE(image_hash, last_query)
-                )
-            """)
-            
-            # Processing logs table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS processing_logs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    source_id INTEGER NOT NULL,
-                    step TEXT NOT NULL,
-                    status TEXT NOT NULL,
-                    message TEXT,
-                    details TEXT,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY(source_id) REFERENCES sources(id) ON DELETE CASCADE
-                )
-            """)
-            
-            # Create indexes
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_source_type ON sources(source_type)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_source_path ON sources(source_path)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_image_hash ON schematic_cache(image_hash)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_log_source ON processing_logs(source_id)")
+            migrate(conn)
     
     def add_source(
         self, 
@@ -102,12 +174,22 @@ class Registry:
         """
         with self._get_connection() as conn:
             cursor = conn.cursor()
+            # Upsert keeps the ID of a source being re-ingested, so its logs,
+            # schematic cache and stored chunk set stay attached to it
             cursor.execute("""
-                INSERT OR REPLACE INTO sources 
+                INSERT INTO sources 
                 (source_type, source_path, file_size, metadata, status, last_updated)
                 VALUES (?, ?, ?, ?, 'processing', CURRENT_TIMESTAMP)
+                ON CONFLICT(source_path) DO UPDATE SET
+                    source_type = excluded.source_type,
+                    file_size = excluded.file_size,
+                    metadata = excluded.metadata,
+                    status = excluded.status,
+                    indexed_at = CURRENT_TIMESTAMP,
+                    last_updated = CURRENT_TIMESTAMP
             """, (source_type, source_path, file_size, json.dumps(metadata or {})))
-            return cursor.lastrowid
+            cursor.execute("SELECT id FROM sources WHERE source_path = ?", (source_path,))
+            return cursor.fetchone()[0]
     
     def get_source(self, source_path: str) -> Optional[Dict[str, Any]]:
         """Get source information by path."""
@@ -156,26 +238,130 @@ class Registry:
                 """, (status, source_path))
     
     def list_sources(self, source_type: Optional[str] = None) -> List[Dict[str, Any]]:
-        """List all sources, optionally filtered by type."""
+        """
+        List all sources (every column), optionally filtered by type.
+        
+        Loads the whole table; prefer `list_sources_page` or `iter_sources`.
+        """
+        return list(self.iter_sources(source_type=source_type, columns=SOURCE_COLUMNS))
+    
+    def list_sources_page(
+        self,
+        source_type: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        offset: int = 0,
+        columns: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        One page of sources, newest first.
+        
+        Pages are keyset-paginated on (indexed_at, id), so fetching the page
+        after `cursor` costs the same however deep it is. `offset` skips rows
+        the slow way and is meant for small, interactive jumps.
+        
+        Args:
+            source_type: Only sources of this type
+            status: Only sources with this status
+            limit: Sources per page
+            cursor: `next_cursor` of the previous page
+            offset: Rows skipped after the cursor
+            columns: Columns returned (default: LIST_COLUMNS). `metadata`
+                is only read and JSON-decoded when listed here.
+        
+        Returns:
+            {'sources': [...], 'next_cursor': str or None}
+        """
+        columns = list(columns or LIST_COLUMNS)
+        unknown = set(columns) - set(SOURCE_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown source columns: {', '.join(sorted(unknown))}")
+        
+        # The sort key is always selected so the next cursor can be built
+        selected = list(dict.fromkeys(columns + ['indexed_at', 'id']))
+        where, params = [], []
+        if source_type:
+            where.append("source_type = ?")
+            params.append(source_type)
+        if status:
+            where.append("status = ?")
+            params.append(status)
+        if cursor:
+            where.append("(indexed_at, id) < (?, ?)")
+            params.extend(_decode_cursor(cursor))
+        
+        sql = f"SELECT {', '.join(selected)} FROM sources"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY indexed_at DESC, id DESC LIMIT ? OFFSET ?"
+        params.extend([limit + 1, offset])
+        
+        with self._get_connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_cursor(rows[-1]['indexed_at'], rows[-1]['id'])
+        
+        sources = []
+        for row in rows:
+            source = {column: row[column] for column in columns}
+            if 'metadata' in source:
+                source['metadata'] = json.loads(source['metadata']) if source['metadata'] else {}
+            sources.append(source)
+        return {'sources': sources, 'next_cursor': next_cursor}
+    
+    def iter_sources(
+        self,
+        source_type: Optional[str] = None,
+        status: Optional[str] = None,
+        columns: Optional[List[str]] = None,
+        page_size: int = 500
+    ) -> Iterator[Dict[str, Any]]:
+        """Every matching source, newest first, read one page at a time."""
+        cursor = None
+        while True:
+            page = self.list_sources_page(
+                source_type=source_type, status=status, limit=page_size, cursor=cursor, columns=columns
+            )
+            yield from page['sources']
+            cursor = page['next_cursor']
+            if cursor is None:
+                return
+    
+    def count_sources(self, source_type: Optional[str] = None) -> int:
+        """Number of sources, optionally of one type."""
         with self._get_connection() as conn:
-            cursor = conn.cursor()
             if source_type:
-                cursor.execute("SELECT * FROM sources WHERE source_type = ? ORDER BY indexed_at DESC", (source_type,))
+                row = conn.execute("SELECT COUNT(*) FROM sources WHERE source_type = ?", (source_type,)).fetchone()
             else:
-                cursor.execute("SELECT * FROM sources ORDER BY indexed_at DESC")
-            
-            results = []
-            for row in cursor.fetchall():
-                result = dict(row)
-                result['metadata'] = json.loads(result['metadata']) if result['metadata'] else {}
-                results.append(result)
-            return results
+                row = conn.execute("SELECT COUNT(*) FROM sources").fetchone()
+            return row[0]
+    
+    def count_sources_by_type(self) -> Dict[str, int]:
+        """Number of sources per source type."""
+        with self._get_connection() as conn:
+            rows = conn.execute("SELECT source_type, COUNT(*) FROM sources GROUP BY source_type").fetchall()
+            return {row[0]: row[1] for row in rows}
     
     def delete_source(self, source_path: str):
-        """Delete a source from the registry."""
+        """Delete a source and its schematic cache, logs and chunk counter in one transaction."""
         with self._get_connection() as conn:
             cursor = conn.cursor()
+            # Foreign keys are not enforced, so cascade by hand
+            cursor.execute("""
+                DELETE FROM schematic_cache
+                WHERE source_id IN (SELECT id FROM sources WHERE source_path = ?)
+            """, (source_path,))
+            cursor.execute("""
+                DELETE FROM processing_logs
+                WHERE source_id IN (SELECT id FROM sources WHERE source_path = ?)
+            """, (source_path,))
+            cursor.execute("DELETE FROM chunk_counts WHERE source_path = ?", (source_path,))
             cursor.execute("DELETE FROM sources WHERE source_path = ?", (source_path,))
+        self._schematics.clear()
     
     # Schematic cache methods
     
@@ -187,14 +373,25 @@ class Registry:
         vision_result: str,
         page_number: Optional[int] = None
     ):
-        """Cache a vision analysis result."""
+        """Cache a vision analysis result, evicting beyond the cache limits."""
         with self._get_connection() as conn:
             cursor = conn.cursor()
+            # Upsert rather than REPLACE so a refreshed result keeps its hit count
             cursor.execute("""
-                INSERT OR REPLACE INTO schematic_cache
+                INSERT INTO schematic_cache
                 (source_id, image_hash, page_number, last_query, vision_result, analyzed_at)
                 VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(image_hash, last_query) DO UPDATE SET
+                    source_id = excluded.source_id,
+                    page_number = excluded.page_number,
+                    vision_result = excluded.vision_result,
+                    analyzed_at = excluded.analyzed_at
             """, (source_id, image_hash, page_number, query_context, vision_result))
+            
+            cursor.execute("SELECT COUNT(*) FROM schematic_cache")
+            if cursor.fetchone()[0] > SCHEMATIC_CACHE_MAX_ENTRIES:
+                self._evict_schematics(cursor, SCHEMATIC_CACHE_MAX_ENTRIES, SCHEMATIC_CACHE_MAX_AGE_DAYS)
+        self._schematics.invalidate(image_hash)
     
     def get_schematic_cache(
         self, 
@@ -204,7 +401,24 @@ class Registry:
         """
         Get cached vision result for a schematic.
         If query_context is provided, tries to find exact match first, then any result.
+        Repeated lookups are answered from memory.
         """
+        row = self._schematics.get(image_hash, query_context)
+        if row is not None:
+            pending = self._schematics.record_hit(row['id'])
+        else:
+            row = self._lookup_schematic(image_hash, query_context)
+            if row is None:
+                self._schematics.record_miss()
+                return None
+            self._schematics.put(image_hash, query_context, row)
+            pending = self._schematics.record_hit(row['id'], from_disk=True)
+        
+        if pending >= HIT_FLUSH_THRESHOLD:
+            self.flush_schematic_hits()
+        return row
+    
+    def _lookup_schematic(self, image_hash: str, query_context: Optional[str]) -> Optional[Dict[str, Any]]:
         with self._get_connection() as conn:
             cursor = conn.cursor()
             
@@ -228,6 +442,104 @@ class Registry:
             row = cursor.fetchone()
             return dict(row) if row else None
     
+    def flush_schematic_hits(self):
+        """Write the hit counts collected since the last flush."""
+        updates = self._schematics.take_hits()
+        if not updates:
+            return
+        try:
+            with self._get_connection() as conn:
+                conn.executemany("""
+                    UPDATE schematic_cache
+                    SET hits = hits + ?, last_hit = MAX(COALESCE(last_hit, ''), ?)
+                    WHERE id = ?
+                """, updates)
+        except sqlite3.Error:
+            self._schematics.restore_hits(updates)
+            raise
+    
+    def _evict_schematics(self, cursor, max_entries: int, max_age_days: float) -> Dict[str, int]:
+        """Delete results not hit within max_age_days, then the least recently hit beyond max_entries."""
+        expired = 0
+        if max_age_days and max_age_days > 0:
+            cursor.execute("""
+                DELETE FROM schematic_cache
+                WHERE COALESCE(last_hit, analyzed_at) < datetime('now', ?)
+            """, (f"-{max_age_days} days",))
+            expired = cursor.rowcount
+        
+        excess = 0
+        if max_entries is not None and max_entries >= 0:
+            cursor.execute("SELECT COUNT(*) FROM schematic_cache")
+            excess = max(0, cursor.fetchone()[0] - max_entries)
+            if excess:
+                cursor.execute("""
+                    DELETE FROM schematic_cache WHERE id IN (
+                        SELECT id FROM schematic_cache
+                        ORDER BY COALESCE(last_hit, analyzed_at) ASC, hits ASC
+                        LIMIT ?
+                    )
+                """, (excess,))
+        return {'expired': expired, 'evicted': excess}
+    
+    def prune_schematic_cache(
+        self,
+        max_entries: Optional[int] = None,
+        max_age_days: Optional[float] = None
+    ) -> Dict[str, int]:
+        """
+        Apply the schematic cache limits now.
+        
+        Args:
+            max_entries: Rows kept (default: SCHEMATIC_CACHE_MAX_ENTRIES)
+            max_age_days: Drop rows not hit for this long (default:
+                SCHEMATIC_CACHE_MAX_AGE_DAYS; 0 keeps every age)
+        
+        Returns:
+            Rows expired, rows evicted for size, and rows remaining
+        """
+        if max_entries is None:
+            max_entries = SCHEMATIC_CACHE_MAX_ENTRIES
+        if max_age_days is None:
+            max_age_days = SCHEMATIC_CACHE_MAX_AGE_DAYS
+        
+        # Unwritten hits would make recently used rows look stale
+        self.flush_schematic_hits()
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            removed = self._evict_schematics(cursor, max_entries, max_age_days)
+            cursor.execute("SELECT COUNT(*) FROM schematic_cache")
+            removed['remaining'] = cursor.fetchone()[0]
+        self._schematics.clear()
+        return removed
+    
+    def schematic_cache_stats(self) -> Dict[str, Any]:
+        """Size and hit figures of both schematic cache tiers."""
+        self.flush_schematic_hits()
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT COUNT(*) AS entries,
+                       COALESCE(SUM(hits), 0) AS total_hits,
+                       COALESCE(SUM(hits = 0), 0) AS never_hit,
+                       COALESCE(SUM(LENGTH(vision_result) + LENGTH(COALESCE(last_query, ''))), 0) AS size,
+                       MIN(COALESCE(last_hit, analyzed_at)) AS oldest
+                FROM schematic_cache
+            """)
+            row = dict(cursor.fetchone())
+        
+        stats = {
+            'entries': row['entries'],
+            'max_entries': SCHEMATIC_CACHE_MAX_ENTRIES,
+            'max_age_days': SCHEMATIC_CACHE_MAX_AGE_DAYS,
+            'size_mb': round(row['size'] / (1024 * 1024), 2),
+            'total_hits': row['total_hits'],
+            'never_hit': row['never_hit'],
+            'least_recent_use': row['oldest']
+        }
+        stats.update(self._schematics.stats())
+        return stats
+    
     def get_source_schematics(self, source_id: int) -> List[Dict[str, Any]]:
         """Get all schematic cache entries for a source."""
         with self._get_connection() as conn:
@@ -245,24 +557,49 @@ class Registry:
         step: str,
         status: str,
         message: Optional[str] = None,
-        details: Optional[Dict[str, Any]] = None
+        details: Optional[Dict[str, Any]] = None,
+        duration_ms: Optional[float] = None,
+        cpu_ms: Optional[float] = None
     ):
         """
         Log a processing step for a source.
         
+        Ingestors buffer their entries through core.processing_log.ProcessingLog
+        instead; this writes a single row immediately.
+        
         Args:
             source_id: Source ID
             step: Step name (e.g., "text_extraction", "schematic_analysis")
             status: Status (e.g., "success", "failed", "warning", "skipped")
             message: Human-readable message
             details: Additional details as dict
+            duration_ms: Wall-clock time of the step
+            cpu_ms: CPU time of the step
         """
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                INSERT INTO processing_logs (source_id, step, status, message, details)
-                VALUES (?, ?, ?, ?, ?)
-            """, (source_id, step, status, message, json.dumps(details or {})))
+                INSERT INTO processing_logs (source_id, step, status, message, details, duration_ms, cpu_ms)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (source_id, step, status, message, json.dumps(details or {}), duration_ms, cpu_ms))
+    
+    def log_processing_steps(self, entries: List[Tuple]):
+        """
+        Write buffered log entries in one statement.
+        
+        Args:
+            entries: (source_id, step, status, message, details, duration_ms,
+                cpu_ms, timestamp) tuples
+        """
+        with self._get_connection() as conn:
+            conn.executemany("""
+                INSERT INTO processing_logs
+                (source_id, step, status, message, details, duration_ms, cpu_ms, timestamp)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, [
+                (source_id, step, status, message, json.dumps(details or {}), duration_ms, cpu_ms, timestamp)
+                for source_id, step, status, message, details, duration_ms, cpu_ms, timestamp in entries
+            ])
     
     def get_processing_logs(self, source_path: str) -> List[Dict[str, Any]]:
         """Get all processing logs for a source."""
@@ -273,10 +610,10 @@ class Registry:
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                SELECT step, status, message, details, timestamp
+                SELECT step, status, message, details, timestamp, duration_ms, cpu_ms
                 FROM processing_logs
                 WHERE source_id = ?
-                ORDER BY timestamp ASC
+                ORDER BY timestamp ASC, id ASC
             """, (source['id'],))
             
             logs = []
@@ -287,6 +624,68 @@ class Registry:
                 logs.append(log)
             return logs
     
+    # Chunk count methods
+    
+    def adjust_chunk_counts(self, deltas: Dict[Tuple[str, str], int]):
+        """
+        Add to the per-source chunk counters.
+        
+        Args:
+            deltas: Change per (source_path, source_type); negative for deletes
+        """
+        if not deltas:
+            return
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany("""
+                INSERT INTO chunk_counts (source_path, source_type, chunks)
+                VALUES (?, ?, MAX(?, 0))
+                ON CONFLICT(source_path) DO UPDATE SET
+                    chunks = MAX(chunks + excluded.chunks, 0),
+                    source_type = excluded.source_type
+            """, [(path, stype, delta) for (path, stype), delta in deltas.items()])
+            cursor.execute("DELETE FROM chunk_counts WHERE chunks = 0")
+    
+    def subtract_chunk_count(self, source_path: str, chunks: int):
+        """Lower a source's chunk counter (never below zero)."""
+        with self._get_connection() as conn:
+            conn.execute("""
+                UPDATE chunk_counts SET chunks = MAX(chunks - ?, 0)
+                WHERE source_path = ?
+            """, (chunks, source_path))
+    
+    def clear_chunk_count(self, source_path: str):
+        """Forget the chunk counter of a source (all its chunks are gone)."""
+        with self._get_connection() as conn:
+            conn.execute("DELETE FROM chunk_counts WHERE source_path = ?", (source_path,))
+    
+    def replace_chunk_counts(self, counts: Dict[Tuple[str, str], int]):
+        """Overwrite every chunk counter (after a full recount)."""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM chunk_counts")
+            cursor.executemany(
+                "INSERT INTO chunk_counts (source_path, source_type, chunks) VALUES (?, ?, ?)",
+                [(path, stype, count) for (path, stype), count in counts.items() if count > 0]
+            )
+    
+    def get_chunk_stats(self) -> Dict[str, Any]:
+        """Chunk totals from the counters: overall, by source type, and number of sources."""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT source_type, SUM(chunks) AS chunks, COUNT(*) AS sources
+                FROM chunk_counts
+                GROUP BY source_type
+            """)
+            rows = cursor.fetchall()
+        
+        return {
+            'total_documents': sum(row['chunks'] for row in rows),
+            'total_sources': sum(row['sources'] for row in rows),
+            'documents_by_type': {row['source_type']: row['chunks'] for row in rows}
+        }
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get registry statistics."""
         with self._get_connection() as conn:
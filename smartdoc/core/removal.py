@@ -0,0 +1,85 @@
+"""
+Removing a source from both stores as one resumable operation.
+
+A source's chunks live in ChromaDB, its row, schematic cache, logs and
+chunk counter in the registry, and an interrupted ingestion's checkpoint
+in the workspace. `purge_source` first marks the source
+'deleting', then deletes its chunks in bounded pages, and only then drops
+the registry rows in a single transaction. If it is interrupted, the
+source stays 'deleting' and running it again (or `resume_purges`)
+finishes the job.
+"""
+
+import logging
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional
+
+from ..config import CHECKPOINTS_DIR, DELETE_PAGE_SIZE
+from .registry import Registry
+from .chroma_client import ChromaManager
+
+logger = logging.getLogger(__name__)
+
+DELETING = 'deleting'
+
+
+def purge_source(
+    registry: Registry,
+    chroma: ChromaManager,
+    source_path: str,
+    page_size: int = DELETE_PAGE_SIZE,
+    on_page: Optional[Callable[[int], None]] = None
+) -> Dict[str, Any]:
+    """
+    Delete a source's chunks, registry row, schematic cache, logs and
+    ingestion checkpoint.
+
+    Also cleans up chunks left behind by a source that is no longer in the
+    registry.
+
+    Args:
+        registry: Registry of the workspace
+        chroma: ChromaManager of the same workspace
+        source_path: Source to remove
+        page_size: Chunk IDs deleted per round trip
+        on_page: Optional callback(deleted_so_far) after each page
+
+    Returns:
+        {'source_path', 'documents_deleted', 'registered'}
+    """
+    source = registry.get_source(source_path)
+    if source is not None and source['status'] != DELETING:
+        registry.update_status(source_path, DELETING)
+
+    deleted = chroma.delete_source(source_path, page_size=page_size, on_page=on_page)
+
+    if source is not None:
+        registry.delete_source(source_path)
+
+    # The checkpoints of the workspace being purged, not the active one's
+    from ..ingestion.checkpoint import discard_checkpoint
+    discard_checkpoint(source_path, root=Path(registry.db_path).parent / CHECKPOINTS_DIR.name)
+
+    logger.info(f"Removed source {source_path} ({deleted} documents)")
+    return {
+        'source_path': source_path,
+        'documents_deleted': deleted,
+        'registered': source is not None
+    }
+
+
+def interrupted_purges(registry: Registry) -> List[str]:
+    """Sources whose removal started but did not finish."""
+    return [s['source_path'] for s in registry.iter_sources(status=DELETING, columns=['source_path'])]
+
+
+def resume_purges(
+    registry: Registry,
+    chroma: ChromaManager,
+    page_size: int = DELETE_PAGE_SIZE
+) -> List[Dict[str, Any]]:
+    """Finish every interrupted removal."""
+    return [
+        purge_source(registry, chroma, source_path, page_size=page_size)
+        for source_path in interrupted_purges(registry)
+    ]
@@ -0,0 +1,109 @@
+"""
+In-process front tier of the schematic vision cache.
+
+Registry.get_schematic_cache answers repeated lookups (the same pin
+question about the same image within a session) from this LRU instead of
+SQLite. Hits are counted here too and written to the `schematic_cache`
+rows' `hits`/`last_hit` columns in batches, so a memory hit never costs a
+write; the on-disk tier evicts by `last_hit` (see Registry.prune_schematic_cache).
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import SCHEMATIC_MEMORY_ENTRIES
+
+# Pending hit counts written back at once
+HIT_FLUSH_THRESHOLD = 32
+
+
+def utc_timestamp() -> str:
+    """Current time in SQLite's CURRENT_TIMESTAMP format, so the two compare."""
+    return datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+
+
+class SchematicMemoryCache:
+    """LRU of schematic cache rows keyed by (image_hash, query_context)."""
+
+    def __init__(self, max_entries: int = SCHEMATIC_MEMORY_ENTRIES):
+        self.max_entries = max_entries
+        self._rows: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._pending: Dict[int, List[Any]] = {}  # row id -> [hits, last_hit]
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(image_hash: str, query_context: Optional[str]) -> Tuple[str, str]:
+        # Lookups without a query fall back to the image's latest result
+        return image_hash, query_context or ''
+
+    def get(self, image_hash: str, query_context: Optional[str]) -> Optional[Dict[str, Any]]:
+        key = self._key(image_hash, query_context)
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                return None
+            self._rows.move_to_end(key)
+            self.memory_hits += 1
+            return dict(row)
+
+    def put(self, image_hash: str, query_context: Optional[str], row: Dict[str, Any]):
+        key = self._key(image_hash, query_context)
+        with self._lock:
+            self._rows[key] = dict(row)
+            self._rows.move_to_end(key)
+            while len(self._rows) > self.max_entries:
+                self._rows.popitem(last=False)
+
+    def invalidate(self, image_hash: str):
+        """Forget every lookup of an image (a new result may change its fallback)."""
+        with self._lock:
+            for key in [key for key in self._rows if key[0] == image_hash]:
+                del self._rows[key]
+
+    def clear(self):
+        with self._lock:
+            self._rows.clear()
+
+    def record_hit(self, row_id: int, from_disk: bool = False) -> int:
+        """Count a hit on a row; returns the number of rows with pending counts."""
+        with self._lock:
+            pending = self._pending.setdefault(row_id, [0, None])
+            pending[0] += 1
+            pending[1] = utc_timestamp()
+            if from_disk:
+                self.disk_hits += 1
+            return len(self._pending)
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def take_hits(self) -> List[Tuple[int, str, int]]:
+        """Pending (hits, last_hit, row id) updates, clearing them."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return [(hits, last_hit, row_id) for row_id, (hits, last_hit) in pending.items()]
+
+    def restore_hits(self, updates: List[Tuple[int, str, int]]):
+        """Put back updates that could not be written."""
+        with self._lock:
+            for hits, last_hit, row_id in updates:
+                pending = self._pending.setdefault(row_id, [0, last_hit])
+                pending[0] += hits
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                'memory_entries': len(self._rows),
+                'memory_max_entries': self.max_entries,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+            }
@@ -0,0 +1,82 @@
+"""
+Process-wide concurrency limits for external services.
+
+Ingestion calls out to LlamaParse, Gemini Vision, GitHub and web hosts.
+When several sources are ingested at once (`smartdoc ingest-batch`,
+concurrent MCP jobs), each call first takes a slot of its service, so
+SERVICE_CONCURRENCY caps the requests in flight per service for the whole
+process, whatever the number of ingestion workers.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from ..config import SERVICE_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceLimiter:
+    """One semaphore per external service, with wait statistics."""
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            limits: Concurrent calls allowed per service (default
+                SERVICE_CONCURRENCY); services not listed are unlimited
+        """
+        self.limits = dict(SERVICE_CONCURRENCY if limits is None else limits)
+        self._semaphores = {
+            service: threading.BoundedSemaphore(limit)
+            for service, limit in self.limits.items() if limit > 0
+        }
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self, service: str) -> Iterator[None]:
+        """Hold one of `service`'s slots for the duration of the block."""
+        semaphore = self._semaphores.get(service)
+        start = time.perf_counter()
+        if semaphore is not None:
+            semaphore.acquire()
+        waited = time.perf_counter() - start
+        if waited > 1.0:
+            logger.debug(f"Waited {waited:.1f}s for a {service} slot")
+
+        with self._lock:
+            stats = self._stats.setdefault(service, {'calls': 0, 'in_flight': 0, 'wait_seconds': 0.0})
+            stats['calls'] += 1
+            stats['in_flight'] += 1
+            stats['wait_seconds'] += waited
+        try:
+            yield
+        finally:
+            with self._lock:
+                stats['in_flight'] -= 1
+            if semaphore is not None:
+                semaphore.release()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per service: limit, calls so far, calls in flight and total seconds spent waiting."""
+        with self._lock:
+            return {
+                service: dict(stats, limit=self.limits.get(service), wait_seconds=round(stats['wait_seconds'], 3))
+                for service, stats in self._stats.items()
+            }
+
+
+_limiter = ServiceLimiter()
+
+
+def service_slot(service: str):
+    """Context manager holding a slot of `service` (see ServiceLimiter.slot)."""
+    return _limiter.slot(service)
+
+
+def get_limiter() -> ServiceLimiter:
+    """The process-wide limiter."""
+    return _limiter
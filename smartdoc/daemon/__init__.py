@@ -0,0 +1 @@
+"""Persistent per-workspace daemon and its thin socket client."""
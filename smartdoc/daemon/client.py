@@ -0,0 +1,125 @@
+"""
+Thin client for the SmartDoc daemon.
+
+Kept dependency-free (socket + json only) so that forwarding a command to
+a running daemon costs nothing beyond interpreter startup.
+"""
+
+import hashlib
+import json
+import os
+import socket
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+from ..config import WORKSPACE_DIR
+
+# AF_UNIX paths are limited to ~104 bytes on macOS and 108 on Linux
+_MAX_SOCKET_PATH = 100
+
+# Set to "1" to bypass the daemon and always run commands in-process
+NO_DAEMON_ENV = "SMARTDOC_NO_DAEMON"
+
+
+class DaemonUnavailable(Exception):
+    """No daemon is listening for this workspace."""
+
+
+class DaemonError(Exception):
+    """The daemon received the request but the operation failed or no reply came back."""
+
+
+def socket_path(workspace_dir: Path = WORKSPACE_DIR) -> Path:
+    """
+    Socket path for a workspace.
+
+    Lives inside the workspace unless that path is too long for AF_UNIX,
+    in which case a stable name in the temp directory is used instead.
+    """
+    path = workspace_dir / "daemon.sock"
+    if len(str(path)) <= _MAX_SOCKET_PATH:
+        return path
+    digest = hashlib.md5(str(workspace_dir).encode('utf-8')).hexdigest()[:12]
+    return Path(tempfile.gettempdir()) / f"smartdoc-{digest}.sock"
+
+
+class DaemonClient:
+    """Send one JSON request per connection to the workspace daemon."""
+
+    def __init__(self, path: Optional[Path] = None, connect_timeout: float = 2.0):
+        self.path = path or socket_path()
+        self.connect_timeout = connect_timeout
+
+    def is_running(self) -> bool:
+        """True if a daemon accepts connections on the socket."""
+        try:
+            self.call('ping')
+            return True
+        except DaemonUnavailable:
+            return False
+        except DaemonError:
+            # Listening, even if it did not answer properly
+            return True
+
+    def call(self, method: str, timeout: Optional[float] = None, **params) -> Any:
+        """
+        Invoke `method` on the daemon.
+
+        Args:
+            method: Operation name (see DaemonServer.METHODS)
+            timeout: Seconds to wait for the reply (None waits indefinitely)
+            **params: Operation arguments (JSON-serializable)
+
+        Returns:
+            The operation result
+
+        Raises:
+            DaemonUnavailable: Nothing is listening on the socket (the
+                request was never sent, so running it elsewhere is safe)
+            DaemonError: The operation raised inside the daemon, or the
+                connection dropped once the request was sent (the daemon
+                may have done some or all of the work)
+        """
+        if not self.path.exists():
+            raise DaemonUnavailable(f"No daemon socket at {self.path}")
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.connect_timeout)
+            try:
+                sock.connect(str(self.path))
+            except (ConnectionRefusedError, FileNotFoundError, socket.timeout) as e:
+                raise DaemonUnavailable(f"Daemon not reachable at {self.path}: {e}")
+
+            sock.settimeout(timeout)
+            request = {'method': method, 'params': params}
+            try:
+                sock.sendall(json.dumps(request).encode('utf-8') + b"\n")
+                with sock.makefile('rb') as reader:
+                    line = reader.readline()
+            except OSError as e:
+                raise DaemonError(f"Lost the connection to the daemon during {method}: {e}")
+        finally:
+            sock.close()
+
+        if not line:
+            raise DaemonError(f"Daemon closed the connection without replying to {method}")
+
+        response = json.loads(line)
+        if not response.get('ok'):
+            raise DaemonError(response.get('error', 'Unknown daemon error'))
+        return response.get('result')
+
+
+def forward(method: str, timeout: Optional[float] = None, **params) -> Any:
+    """
+    Run `method` on the workspace daemon if one is running.
+
+    Raises:
+        DaemonUnavailable: Daemon disabled via SMARTDOC_NO_DAEMON or not running
+        DaemonError: The operation failed inside the daemon
+    """
+    if os.environ.get(NO_DAEMON_ENV) == "1":
+        raise DaemonUnavailable(f"Daemon disabled by {NO_DAEMON_ENV}")
+    return DaemonClient().call(method, timeout=timeout, **params)
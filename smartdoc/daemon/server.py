@@ -0,0 +1,145 @@
+"""
+Persistent SmartDoc daemon.
+
+Keeps one ResourceContext (Registry, ChromaManager, QueryEngine and the
+embedding model behind the collection) warm for a workspace and serves
+newline-delimited JSON requests over a Unix socket:
+
+    -> {"method": "query", "params": {"query_text": "SPI pins"}}
+    <- {"ok": true, "result": {...}, "elapsed_ms": 12.3}
+
+Each connection carries one request; requests run concurrently on threads.
+"""
+
+import json
+import logging
+import os
+import socketserver
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ..config import WORKSPACE_DIR, workspace
+from ..context import ResourceContext
+from .client import DaemonClient, socket_path
+
+logger = logging.getLogger(__name__)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Decode one request line, dispatch it, write one response line."""
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+
+        start = time.perf_counter()
+        try:
+            request = json.loads(line)
+            result = self.server.daemon.dispatch(
+                request.get('method'),
+                request.get('params') or {}
+            )
+            response = {'ok': True, 'result': result}
+        except Exception as e:
+            logger.exception("Daemon request failed")
+            response = {'ok': False, 'error': str(e)}
+        response['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 2)
+
+        self.wfile.write(json.dumps(response, default=str).encode('utf-8') + b"\n")
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, daemon: "DaemonServer"):
+        self.daemon = daemon
+        super().__init__(path, _RequestHandler)
+
+
+class DaemonServer:
+    """Serve SmartDoc operations for one workspace from warm resources."""
+
+    METHODS = (
+        'ping', 'shutdown',
+        'query', 'query_many', 'list_sources', 'list_sources_page', 'stats',
+        'index_pdf', 'fetch_repo', 'index_web', 'ingest_batch',
+        'remove_source', 'resume_removals', 'rebuild_index', 'compact_vectors',
+        'schematic_cache_stats', 'prune_schematic_cache',
+    )
+
+    def __init__(self, path: Optional[Path] = None, context: Optional[ResourceContext] = None):
+        self.path = path or socket_path()
+        # Forwarded ingests must never wait on the daemon's stdin
+        self.context = context or ResourceContext(interactive=False)
+        self.context.interactive = False
+        self.started_at = time.time()
+        self.requests_served = 0
+        self._server: Optional[_UnixServer] = None
+        self._counter_lock = threading.Lock()
+
+    def dispatch(self, method: str, params: Dict[str, Any]) -> Any:
+        """Route a request to the matching operation."""
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown method: {method}")
+
+        with self._counter_lock:
+            self.requests_served += 1
+
+        if method == 'ping':
+            return self.status()
+        if method == 'shutdown':
+            # Reply first; serve_forever() must not be stopped from its own thread
+            threading.Thread(target=self.stop, daemon=True).start()
+            return {'stopping': True}
+
+        return self.context.run(method, **params)
+
+    def status(self) -> Dict[str, Any]:
+        """Daemon identity and counters."""
+        return {
+            'pid': os.getpid(),
+            'workspace': str(WORKSPACE_DIR),
+            'socket': str(self.path),
+            'uptime_s': round(time.time() - self.started_at, 1),
+            'requests_served': self.requests_served
+        }
+
+    def serve_forever(self, warm: bool = True):
+        """
+        Bind the socket and serve until `stop()` or KeyboardInterrupt.
+
+        Raises:
+            RuntimeError: Another daemon is already serving this workspace
+        """
+        workspace.bootstrap()
+
+        if self.path.exists():
+            if DaemonClient(self.path).is_running():
+                raise RuntimeError(f"A SmartDoc daemon is already running on {self.path}")
+            # Stale socket from a daemon that did not shut down cleanly
+            self.path.unlink()
+
+        if warm:
+            start = time.perf_counter()
+            self.context.warm()
+            logger.info(f"Resources warmed in {time.perf_counter() - start:.2f}s")
+
+        self._server = _UnixServer(str(self.path), self)
+        os.chmod(self.path, 0o600)
+        logger.info(f"SmartDoc daemon listening on {self.path}")
+
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if self.path.exists():
+                self.path.unlink()
+            logger.info("SmartDoc daemon stopped")
+
+    def stop(self):
+        """Stop serving (safe to call from any thread but the serving one)."""
+        if self._server is not None:
+            self._server.shutdown()
@@ -3,23 +3,48 @@ Abstract base class for all data ingestors.
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Callable, Set, Tuple
 import hashlib
 import logging
+import threading
+import time
 from pathlib import Path
 
 from ..core.registry import Registry
 from ..core.chroma_client import ChromaManager
+from ..core.processing_log import ProcessingLog
+from ..config import ADD_BATCH_SIZE, CHUNK_SIZING
+from .chunker import ApproximateCounter, iter_chunks, load_counter
+from .pipeline import Pipeline, Stage
 
 logger = logging.getLogger(__name__)
 
 
+class IngestionCancelled(Exception):
+    """Raised at a progress checkpoint when the ingestion has been cancelled."""
+
+
 class BaseIngestor(ABC):
     """Abstract base class for data ingestion."""
     
+    # Chunk metadata that changes with edits elsewhere in the source rather
+    # than with the chunk: when only these differ the stored chunk is kept
+    # as is, so they record the ingestion that wrote it (the source's
+    # current commit is in the registry)
+    VOLATILE_METADATA = ('indexed_at', 'chunk_index', 'commit_sha')
+    
     def __init__(self, registry: Registry, chroma_manager: ChromaManager):
         self.registry = registry
         self.chroma = chroma_manager
+        
+        # Hooks for background jobs (see smartdoc.jobs)
+        self.progress_callback: Optional[Callable[[str, str, Optional[float]], None]] = None
+        self.cancel_event: Optional[threading.Event] = None
+        
+        # When False, never prompt on stdin (servers, background jobs)
+        self.interactive = True
+        
+        self._token_counter = None
     
     @abstractmethod
     def ingest(self, source: str, **kwargs) -> Dict[str, Any]:
@@ -64,6 +89,170 @@ class BaseIngestor(ABC):
             return f"{self._sanitize_source(source)}_chunk_{chunk_index}_{content_hash[:8]}"
         return f"{self._sanitize_source(source)}_chunk_{chunk_index}"
     
+    def chunk_id_assigner(self, source: str) -> Callable[[str], str]:
+        """
+        Content-based chunk IDs for a source, assigned in source order.
+        
+        The same text always gets the same ID, whatever its position, so
+        re-ingesting a source can diff chunk sets by ID. Repeated text within
+        a source is told apart by its occurrence number.
+        
+        Args:
+            source: Source identifier
+        
+        Returns:
+            Function mapping each chunk text, in order, to its ID
+        """
+        prefix = f"{self._sanitize_source(source)[:80]}_{self.hash_content(source)[:8]}"
+        seen: Dict[str, int] = {}
+        
+        def assign(content: str) -> str:
+            digest = self.hash_content(content)[:16]
+            occurrence = seen.get(digest, 0)
+            seen[digest] = occurrence + 1
+            return f"{prefix}_{digest}_{occurrence}" if occurrence else f"{prefix}_{digest}"
+        
+        return assign
+    
+    def sync_chunks(
+        self,
+        source: str,
+        units: Iterable[Any],
+        to_chunks: Callable[[Any], Iterable[Tuple[str, Dict[str, Any]]]],
+        chunk_workers: int = 1,
+        checkpoint=None
+    ) -> Dict[str, Any]:
+        """
+        Make the stored chunks of a source match a freshly extracted chunk set.
+        
+        Units stream through an ingestion Pipeline (see ingestion.pipeline):
+        
+            extract  iterate `units` (pages, files, documents)
+            chunk    `to_chunks(unit)` → (document, metadata) pairs
+            diff     assign content-based IDs, set aside chunks already stored
+            embed    vectors of the new chunks (embedding cache first)
+            write    persist them
+        
+        Only new chunks are embedded. Once the stream ends, chunks no longer
+        produced are deleted and kept ones whose metadata differs beyond
+        VOLATILE_METADATA are updated; adding first means the source is
+        never missing from search.
+        
+        Args:
+            source: Source path the chunks belong to
+            units: Extraction units, consumed lazily on the pipeline's own thread
+            to_chunks: Chunks of one unit, with their metadata
+            chunk_workers: Threads running `to_chunks` (units must be independent)
+            checkpoint: Optional ingestion.checkpoint.Checkpoint recording the
+                IDs of every batch written ('storage' stage)
+        
+        Returns:
+            chunks, added, unchanged, removed, updated counts, resumed (chunks
+            an interrupted ingestion had stored), seconds, the estimated
+            seconds_per_chunk / saved_seconds of skipped embedding, and
+            per-stage throughput under 'stages'
+        """
+        start = time.perf_counter()
+        stored = self.chroma.source_chunks(source)
+        assign_id = self.chunk_id_assigner(source)
+        produced: Set[str] = set()
+        changed: List[Tuple[str, Dict[str, Any]]] = []
+        added = [0]
+        resumed: Set[str] = set()
+        if checkpoint is not None:
+            for record in checkpoint.records("storage"):
+                resumed.update(record['ids'])
+        
+        def diff(batch):
+            documents, metadatas, ids = [], [], []
+            for document, metadata in batch:
+                chunk_id = assign_id(document)
+                produced.add(chunk_id)
+                if chunk_id not in stored:
+                    documents.append(document)
+                    metadatas.append(metadata)
+                    ids.append(chunk_id)
+                elif self._stable_metadata(stored[chunk_id]) != self._stable_metadata(metadata):
+                    changed.append((chunk_id, metadata))
+            return (documents, metadatas, ids) if ids else None
+        
+        def embed(batch):
+            documents, metadatas, ids = batch
+            return documents, self.chroma.embed_documents(documents), metadatas, ids
+        
+        def write(batch):
+            documents, embeddings, metadatas, ids = batch
+            self.chroma.add_embedded(documents, embeddings, metadatas, ids)
+            added[0] += len(ids)
+            if checkpoint is not None:
+                checkpoint.append("storage", {'ids': ids})
+            self.report_progress("storage", f"Stored {added[0]} new chunks")
+        
+        pipeline = Pipeline([
+            Stage("chunk", to_chunks, workers=chunk_workers, expand=True),
+            Stage("diff", diff, batch_size=ADD_BATCH_SIZE),
+            Stage("embed", embed),
+            Stage("write", write)
+        ], name="smartdoc-ingest")
+        stages = pipeline.run(units)
+        
+        removed = [chunk_id for chunk_id in stored if chunk_id not in produced]
+        if not produced and stored:
+            # An empty extraction is far more likely a failure than an empty source
+            logger.warning(f"No chunks produced for {source}; keeping its {len(stored)} stored chunks")
+            removed = []
+        if removed:
+            self.chroma.delete_chunks(removed, source)
+        if changed:
+            self.chroma.update_metadatas([chunk_id for chunk_id, _ in changed], [metadata for _, metadata in changed])
+        
+        unchanged = len(produced) - added[0]
+        seconds_per_chunk = None
+        if added[0]:
+            seconds_per_chunk = (stages['embed']['busy_seconds'] + stages['write']['busy_seconds']) / added[0]
+        elif unchanged:
+            seconds_per_chunk = self._previous_seconds_per_chunk(source)
+        
+        stats = {
+            'chunks': len(produced),
+            'added': added[0],
+            'unchanged': unchanged,
+            'removed': len(removed),
+            'updated': len(changed),
+            'resumed': len(resumed & produced),
+            'seconds': time.perf_counter() - start,
+            'seconds_per_chunk': seconds_per_chunk,
+            'saved_seconds': seconds_per_chunk * unchanged if seconds_per_chunk is not None else None,
+            'stages': stages
+        }
+        logger.info(
+            f"Synced {source}: {stats['added']} added, {stats['unchanged']} unchanged, "
+            f"{stats['removed']} removed, {stats['updated']} metadata updates"
+        )
+        return stats
+    
+    @staticmethod
+    def describe_sync(stats: Dict[str, Any]) -> str:
+        """One-line summary of `sync_chunks` stats."""
+        summary = f"{stats['added']} added, {stats['unchanged']} unchanged, {stats['removed']} removed"
+        if stats.get('saved_seconds'):
+            summary += f", ~{stats['saved_seconds']:.1f}s saved"
+        if stats.get('resumed'):
+            summary += f", {stats['resumed']} stored by the interrupted run"
+        return summary
+    
+    @classmethod
+    def _stable_metadata(cls, metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Metadata without the fields that do not warrant rewriting a stored chunk."""
+        return {key: value for key, value in (metadata or {}).items() if key not in cls.VOLATILE_METADATA}
+    
+    def _previous_seconds_per_chunk(self, source: str) -> Optional[float]:
+        """Storage cost per chunk measured by the latest ingestion of `source` that added chunks."""
+        for entry in reversed(self.registry.get_processing_logs(source)):
+            if entry.get('step') in ('pipeline', 'storage') and (entry.get('details') or {}).get('seconds_per_chunk'):
+                return entry['details']['seconds_per_chunk']
+        return None
+    
     def hash_content(self, content: str) -> str:
         """
         Generate MD5 hash of content.
@@ -113,6 +302,9 @@ class BaseIngestor(ABC):
         size_mb = size / (1024 * 1024)
         
         if size > max_size:
+            if not self.interactive:
+                logger.warning(f"⚠️  Skipping {file_path.name} ({size_mb:.1f}MB): over the size limit and cannot prompt")
+                return False
             response = input(f"⚠️  {file_path.name} is {size_mb:.1f}MB. Process anyway? (y/n): ")
             return response.lower() == 'y'
         elif size > warning_size:
@@ -120,42 +312,67 @@ class BaseIngestor(ABC):
         
         return True
     
-    def chunk_text(self, text: str, chunk_size: int, overlap: int) -> List[str]:
+    def open_processing_log(self, source_id: int) -> ProcessingLog:
+        """
+        Buffered, timed processing log for a source.
+        
+        Close it in a `finally` (or use it as a context manager) so entries
+        are written on failure paths too.
+        """
+        return ProcessingLog(self.registry, source_id)
+    
+    def report_progress(self, stage: str, message: str = "", fraction: Optional[float] = None):
         """
-        Chunk text with overlap.
+        Report progress to an attached listener and honor cancellation.
+        
+        Args:
+            stage: Current step (e.g. "text_extraction")
+            message: Human-readable detail
+            fraction: Completion of the current stage (0.0-1.0), if known
+        
+        Raises:
+            IngestionCancelled: The job driving this ingestor was cancelled
+        """
+        if self.progress_callback:
+            self.progress_callback(stage, message, fraction)
+        self.check_cancelled()
+    
+    def report_storage_progress(self, done: int, total: int):
+        """`on_batch` callback for ChromaManager.add_documents."""
+        self.report_progress("storage", f"Stored {done}/{total} chunks", done / total if total else None)
+    
+    def check_cancelled(self):
+        """Raise IngestionCancelled if cancellation has been requested."""
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise IngestionCancelled("Ingestion cancelled")
+    
+    @property
+    def token_counter(self):
+        """Measures chunk sizes (see ingestion.chunker; CHUNK_SIZING picks exact or approximate)."""
+        if self._token_counter is None:
+            if CHUNK_SIZING == "tokenizer":
+                self._token_counter = load_counter(self.chroma.embedding_function)
+            else:
+                self._token_counter = ApproximateCounter()
+        return self._token_counter
+    
+    def iter_chunks(self, text: str, chunk_size: int, overlap: int) -> Iterator[str]:
+        """
+        Chunk text lazily in one pass.
         
         Args:
             text: Text to chunk
-            chunk_size: Size of each chunk in characters
-            overlap: Overlap between chunks
+            chunk_size: Size of each chunk in tokens
+            overlap: Tokens shared by consecutive chunks
         
-        Returns:
-            List of text chunks
-        """
-        if len(text) <= chunk_size:
-            return [text]
-        
-        chunks = []
-        start = 0
-        
-        while start < len(text):
-            end = start + chunk_size
-            chunk = text[start:end]
-            
-            # Try to break at sentence boundary if possible
-            if end < len(text):
-                last_period = chunk.rfind('.')
-                last_newline = chunk.rfind('\n')
-                break_point = max(last_period, last_newline)
-                
-                if break_point > chunk_size * 0.7:  # Only break if we're past 70% of chunk
-                    chunk = chunk[:break_point + 1]
-                    end = start + break_point + 1
-            
-            chunks.append(chunk.strip())
-            start = end - overlap
-        
-        return chunks
+        Yields:
+            Text chunks
+        """
+        return iter_chunks(text, chunk_size, overlap, self.token_counter)
+    
+    def chunk_text(self, text: str, chunk_size: int, overlap: int) -> List[str]:
+        """List form of `iter_chunks`."""
+        return list(self.iter_chunks(text, chunk_size, overlap))
     
     def prepare_metadata(self, base_metadata: Dict[str, Any], chunk_index: int) -> Dict[str, Any]:
         """
@@ -0,0 +1,249 @@
+"""
+Manifest-driven bulk ingestion.
+
+A manifest (YAML) lists the sources of a project:
+
+    workers: 4                       # optional, default BATCH_WORKERS
+    defaults:                        # optional, merged into every source
+      analyze_schematics: false
+      resume: true                   # continue interrupted PDFs/repos (see ingestion.checkpoint)
+    sources:
+      - pdf: datasheets/*.pdf        # globs expand; paths are relative to the manifest
+        initial_query: SPI pinout
+      - repo: https://github.com/owner/repo
+        branch: develop
+      - web: https://docs.example.com/page
+
+`run_batch` ingests the sources on a pool of worker threads sharing one
+ResourceContext, so they all write through the same ChromaManager (one
+writer at a time, see ChromaManager._write_batch) and registry, and
+reuse one loaded embedding model. Calls to external services are capped
+process-wide by core.services (SERVICE_CONCURRENCY). A failed source is
+recorded and the batch goes on.
+"""
+
+import glob
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..config import BATCH_WORKERS
+
+logger = logging.getLogger(__name__)
+
+# Manifest key -> source type
+SOURCE_KEYS = {'pdf': 'pdf', 'repo': 'github', 'web': 'web'}
+
+# Options each source type accepts
+SOURCE_OPTIONS = {
+    'pdf': ('analyze_schematics', 'initial_query', 'resume'),
+    'github': ('branch', 'resume'),
+    'web': ()
+}
+
+
+def load_manifest(path: str) -> Dict[str, Any]:
+    """
+    Read and validate a manifest file.
+
+    Returns:
+        {'workers': int or None, 'sources': [{'type', 'source', 'options'}]}
+
+    Raises:
+        ValueError: Malformed manifest, unknown keys or missing files
+    """
+    import yaml
+
+    manifest_path = Path(path).expanduser()
+    try:
+        data = yaml.safe_load(manifest_path.read_text(encoding='utf-8'))
+    except yaml.YAMLError as e:
+        raise ValueError(f"Invalid manifest {manifest_path}: {e}")
+    return parse_manifest(data, manifest_path.resolve().parent)
+
+
+def parse_manifest(data: Any, base_dir: Path) -> Dict[str, Any]:
+    """
+    Validate manifest data (as loaded from YAML or JSON).
+
+    Args:
+        data: Mapping with 'sources' and optionally 'workers' and 'defaults'
+        base_dir: Directory relative PDF paths and globs are resolved against
+
+    Returns:
+        Same as `load_manifest`; duplicate sources are kept once
+    """
+    if not isinstance(data, dict) or not isinstance(data.get('sources'), list):
+        raise ValueError("A manifest needs a 'sources' list")
+    unknown = set(data) - {'workers', 'defaults', 'sources'}
+    if unknown:
+        raise ValueError(f"Unknown manifest keys: {', '.join(sorted(unknown))}")
+
+    workers = data.get('workers')
+    if workers is not None and (not isinstance(workers, int) or workers < 1):
+        raise ValueError("'workers' must be a positive integer")
+    defaults = data.get('defaults') or {}
+    if not isinstance(defaults, dict):
+        raise ValueError("'defaults' must be a mapping")
+
+    sources = []
+    seen = set()
+    for number, entry in enumerate(data['sources'], 1):
+        for source in _parse_entry(entry, number, defaults, base_dir):
+            key = (source['type'], source['source'])
+            if key not in seen:
+                seen.add(key)
+                sources.append(source)
+    return {'workers': workers, 'sources': sources}
+
+
+def _parse_entry(entry: Any, number: int, defaults: Dict[str, Any], base_dir: Path) -> List[Dict[str, Any]]:
+    """Sources of one manifest entry (several for a PDF glob)."""
+    if isinstance(entry, dict):
+        keys = [key for key in SOURCE_KEYS if key in entry]
+    else:
+        keys = []
+    if len(keys) != 1:
+        raise ValueError(f"Source #{number} needs exactly one of: {', '.join(SOURCE_KEYS)}")
+
+    key = keys[0]
+    source_type = SOURCE_KEYS[key]
+    target = entry[key]
+    if not isinstance(target, str) or not target.strip():
+        raise ValueError(f"Source #{number}: '{key}' must be a path or URL")
+
+    allowed = SOURCE_OPTIONS[source_type]
+    options = {name: value for name, value in defaults.items() if name in allowed}
+    for name, value in entry.items():
+        if name == key:
+            continue
+        if name not in allowed:
+            raise ValueError(f"Source #{number} ({key}): unknown option '{name}'")
+        options[name] = value
+
+    if source_type != 'pdf':
+        return [{'type': source_type, 'source': target.strip(), 'options': options}]
+
+    pattern = Path(target).expanduser()
+    if not pattern.is_absolute():
+        pattern = base_dir / pattern
+    if glob.has_magic(str(pattern)):
+        paths = sorted(Path(match) for match in glob.glob(str(pattern), recursive=True))
+        paths = [path for path in paths if path.suffix.lower() == '.pdf']
+        if not paths:
+            raise ValueError(f"Source #{number}: no PDF matches {target}")
+    else:
+        if not pattern.is_file():
+            raise ValueError(f"Source #{number}: PDF not found: {pattern}")
+        paths = [pattern]
+    return [{'type': 'pdf', 'source': str(path.resolve()), 'options': dict(options)} for path in paths]
+
+
+def _ingest(context, source: Dict[str, Any], job) -> Dict[str, Any]:
+    """Run one source's ingestion through the context."""
+    options = source['options']
+    if source['type'] == 'pdf':
+        return context.index_pdf(source['source'], job=job, **options)
+    if source['type'] == 'github':
+        return context.fetch_repo(source['source'], branch=options.get('branch'), resume=options.get('resume', False), job=job)
+    return context.index_web(source['source'], job=job)
+
+
+def _service_usage(before: Dict[str, Dict[str, Any]], after: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """External service calls and slot waits between two ServiceLimiter.stats() snapshots."""
+    usage = {}
+    for service, stats in after.items():
+        previous = before.get(service, {'calls': 0, 'wait_seconds': 0.0})
+        calls = stats['calls'] - previous['calls']
+        if calls:
+            usage[service] = {
+                'calls': calls,
+                'limit': stats['limit'],
+                'wait_seconds': round(stats['wait_seconds'] - previous['wait_seconds'], 3)
+            }
+    return usage
+
+
+def run_batch(
+    context,
+    sources: List[Dict[str, Any]],
+    workers: Optional[int] = None,
+    job=None
+) -> Dict[str, Any]:
+    """
+    Ingest sources concurrently.
+
+    Args:
+        context: ResourceContext shared by every worker
+        sources: Entries from `load_manifest` / `parse_manifest`
+        workers: Sources ingested at once (default BATCH_WORKERS)
+        job: Optional smartdoc.jobs.Job of the whole batch, for progress
+            and cancellation (sources not started yet are skipped)
+
+    Returns:
+        'sources' records in manifest order (type, source, status, chunks,
+        seconds, error), per-status counts, total chunks, seconds, workers
+        and the external service usage
+    """
+    from ..core.services import get_limiter
+    from ..jobs import Job
+
+    workers = max(1, min(workers or BATCH_WORKERS, len(sources) or 1))
+    cancel_event = job.cancel_event if job is not None else threading.Event()
+    records: List[Optional[Dict[str, Any]]] = [None] * len(sources)
+    done = [0]
+    lock = threading.Lock()
+
+    def run_one(index: int):
+        source = sources[index]
+        record = {'type': source['type'], 'source': source['source'], 'status': 'cancelled',
+                  'chunks': 0, 'seconds': 0.0, 'error': None}
+        if not cancel_event.is_set():
+            # Per-source job: non-interactive ingestor, shared cancellation
+            source_job = Job(f"batch-{index + 1}", source['type'], source['source'])
+            source_job.cancel_event = cancel_event
+            start = time.perf_counter()
+            try:
+                result = _ingest(context, source, source_job)
+                record['status'] = result.get('status', 'success')
+                record['chunks'] = result.get('chunks_added', 0)
+                record['error'] = result.get('reason')
+            except Exception as e:
+                record['status'] = 'cancelled' if cancel_event.is_set() else 'failed'
+                record['error'] = str(e)
+                if record['status'] == 'failed':
+                    logger.error(f"Batch: {source['type']} {source['source']} failed: {e}")
+            record['seconds'] = round(time.perf_counter() - start, 2)
+
+        records[index] = record
+        with lock:
+            done[0] += 1
+            finished = done[0]
+        if job is not None:
+            job.update("batch", f"{finished}/{len(sources)} sources done", finished / len(sources))
+
+    limiter = get_limiter()
+    services_before = limiter.stats()
+    start = time.perf_counter()
+    logger.info(f"Batch ingestion of {len(sources)} sources with {workers} workers")
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="smartdoc-batch") as pool:
+        list(pool.map(run_one, range(len(sources))))
+
+    summary: Dict[str, Any] = {
+        'sources': records,
+        'total': len(records),
+        'chunks': sum(record['chunks'] for record in records),
+        'seconds': round(time.perf_counter() - start, 2),
+        'workers': workers,
+        'services': _service_usage(services_before, limiter.stats())
+    }
+    for status in ('success', 'skipped', 'failed', 'cancelled'):
+        summary[status] = sum(1 for record in records if record['status'] == status)
+    logger.info(
+        f"Batch finished in {summary['seconds']:.1f}s: {summary['success']} indexed, "
+        f"{summary['skipped']} skipped, {summary['failed']} failed, {summary['cancelled']} cancelled"
+    )
+    return summary
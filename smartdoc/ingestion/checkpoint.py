@@ -0,0 +1,183 @@
+"""
+Resumable ingestion checkpoints.
+
+An ingestion that dies part way (a Gemini quota, a crash, a cancelled
+job) leaves its finished work in a per-source checkpoint under
+CHECKPOINTS_DIR, and a rerun with `--resume` skips it:
+
+    text        extracted PDF pages, replayed instead of parsing again
+    schematics  analyzed schematics by image hash; only the rest go to Gemini
+    clone       the repository checkout, reused instead of cloning again
+    storage     chunk IDs of the batches written to ChromaDB (content-based
+                IDs already keep them from being embedded again; the
+                record tells how many a resume saved)
+
+Each stage appends JSON Lines records, flushed one by one, and is marked
+complete in the checkpoint's state file once it finishes; a record cut
+short by a crash is ignored. A checkpoint only applies to the same
+source version and options (its fingerprint). Ingesting without
+`--resume` starts over, and a successful ingestion discards the
+checkpoint.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..config import CHECKPOINTS_DIR
+
+logger = logging.getLogger(__name__)
+
+STATE_FILE = "state.json"
+
+
+def checkpoint_dir(source: str, root: Optional[Path] = None) -> Path:
+    """Directory of a source's checkpoint: readable tail of the source plus a hash."""
+    name = re.sub(r'[^A-Za-z0-9]+', '_', source).strip('_')[-48:]
+    digest = hashlib.md5(source.encode('utf-8')).hexdigest()[:12]
+    return Path(root or CHECKPOINTS_DIR) / f"{name}_{digest}"
+
+
+def discard_checkpoint(source: str, root: Optional[Path] = None) -> bool:
+    """Delete a source's checkpoint. Returns True if there was one."""
+    directory = checkpoint_dir(source, root)
+    if not directory.exists():
+        return False
+    shutil.rmtree(directory, ignore_errors=True)
+    return True
+
+
+class Checkpoint:
+    """Per-stage progress of one source's ingestion."""
+
+    def __init__(self, source: str, fingerprint: Dict[str, Any], root: Optional[Path] = None):
+        """
+        Args:
+            source: Source path or URL, as registered
+            fingerprint: JSON-serializable version and options of the
+                source; a checkpoint with another fingerprint is stale
+            root: Checkpoints directory (default CHECKPOINTS_DIR)
+        """
+        self.source = source
+        self.fingerprint = fingerprint
+        self.dir = checkpoint_dir(source, root)
+        self.resumed = False
+        self._state: Dict[str, Any] = {'source': source, 'fingerprint': fingerprint, 'completed': {}}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(
+        cls,
+        source: str,
+        fingerprint: Dict[str, Any],
+        resume: bool = False,
+        root: Optional[Path] = None
+    ) -> "Checkpoint":
+        """
+        Checkpoint for a new ingestion of `source`.
+
+        Args:
+            resume: Keep the work of a previous, interrupted ingestion if
+                its fingerprint matches; otherwise any checkpoint is dropped
+
+        Returns:
+            The checkpoint; `resumed` tells whether earlier work was kept
+        """
+        checkpoint = cls(source, fingerprint, root)
+        state = checkpoint._read_state()
+        if resume and state is not None and state.get('fingerprint') == fingerprint:
+            checkpoint._state = state
+            checkpoint.resumed = True
+            done = ', '.join(state.get('completed', {})) or 'no stage'
+            logger.info(f"Resuming {source} from its checkpoint ({done} complete)")
+        else:
+            if resume and state is not None:
+                logger.info(f"{source} changed since its checkpoint; starting over")
+            elif resume:
+                logger.info(f"No checkpoint for {source}; starting from scratch")
+            shutil.rmtree(checkpoint.dir, ignore_errors=True)
+
+        checkpoint.dir.mkdir(parents=True, exist_ok=True)
+        checkpoint._write_state()
+        return checkpoint
+
+    def completed(self, stage: str) -> Optional[Dict[str, Any]]:
+        """Details recorded when `stage` completed, or None if it has not."""
+        with self._lock:
+            return self._state['completed'].get(stage)
+
+    def complete(self, stage: str, **details):
+        """Mark a stage complete; its records are final."""
+        with self._lock:
+            self._state['completed'][stage] = details
+            self._write_state()
+
+    def append(self, stage: str, record: Dict[str, Any]):
+        """Add one record to a stage, durably before returning."""
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            with open(self._stage_file(stage), 'a', encoding='utf-8') as file:
+                file.write(line + '\n')
+                file.flush()
+                os.fsync(file.fileno())
+
+    def records(self, stage: str) -> List[Dict[str, Any]]:
+        """A stage's records in the order they were appended."""
+        path = self._stage_file(stage)
+        if not path.exists():
+            return []
+        records = []
+        with self._lock:
+            with open(path, encoding='utf-8') as file:
+                for line in file:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        # Torn write at the moment of the crash
+                        logger.debug(f"Ignoring a partial {stage} checkpoint record for {self.source}")
+        return records
+
+    def reset(self, stage: str):
+        """Forget a stage's records and completion, to redo it."""
+        with self._lock:
+            self._state['completed'].pop(stage, None)
+            self._write_state()
+            self._stage_file(stage).unlink(missing_ok=True)
+
+    def directory(self, name: str, clear: bool = False) -> Path:
+        """A directory inside the checkpoint (e.g. a repository checkout)."""
+        path = self.dir / name
+        if clear:
+            shutil.rmtree(path, ignore_errors=True)
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def discard(self):
+        """Delete the checkpoint and everything in it."""
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def _stage_file(self, stage: str) -> Path:
+        return self.dir / f"{stage}.jsonl"
+
+    def _read_state(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.dir / STATE_FILE, encoding='utf-8') as file:
+                state = json.load(file)
+        except (OSError, ValueError):
+            return None
+        return state if isinstance(state, dict) and isinstance(state.get('completed'), dict) else None
+
+    def _write_state(self):
+        # Replace atomically so a crash leaves the previous state intact
+        temp_path = self.dir / f"{STATE_FILE}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(self._state, file, ensure_ascii=False)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.dir / STATE_FILE)
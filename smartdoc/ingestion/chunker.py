@@ -0,0 +1,207 @@
+"""
+Streaming, token-aware text chunker.
+
+`iter_chunks` walks the text once: a regex scan splits it into pieces at
+sentence ends and line breaks, the pieces are measured in tokens, and
+chunks are yielded as soon as the next piece would overflow the budget.
+Nothing proportional to the text is kept besides the text itself.
+
+Sizes are tokens, not characters, so chunks fit the embedding model's
+input (EMBEDDING_MAX_LENGTH) instead of being truncated silently:
+
+    TokenizerCounter    the model's own tokenizer (exact, batched)
+    ApproximateCounter  characters / CHUNK_CHARS_PER_TOKEN (no model files)
+
+Termination does not depend on the arguments: the overlap is clamped to
+half a chunk and every chunk contains at least one piece the previous
+chunk did not.
+"""
+
+import logging
+import math
+import re
+from collections import deque
+from typing import Deque, Iterator, List, Tuple
+
+from ..config import CHUNK_CHARS_PER_TOKEN, EMBEDDING_MAX_LENGTH
+
+logger = logging.getLogger(__name__)
+
+# Preferred cut points: after sentence punctuation followed by whitespace,
+# or after a run of line breaks. Written to start with a character class so
+# the regex engine can skip ahead between candidates.
+BOUNDARY = re.compile(r'[\n.!?](?:(?<=\n)\s*|[.!?]*\s+)')
+
+# Special tokens the model adds around every text ([CLS] ... [SEP])
+SPECIAL_TOKENS = 2
+
+# Characters scanned for boundaries (and measured) per batch
+SCAN_WINDOW = 64 * 1024
+
+
+class ApproximateCounter:
+    """Token counts estimated from character counts."""
+
+    def __init__(self, chars_per_token: float = CHUNK_CHARS_PER_TOKEN, limit: int = EMBEDDING_MAX_LENGTH):
+        self.chars_per_token = chars_per_token
+        # Largest chunk the model reads without truncating
+        self.limit = limit - SPECIAL_TOKENS
+
+    def count(self, pieces: List[str]) -> List[int]:
+        return [math.ceil(len(piece) / self.chars_per_token) for piece in pieces]
+
+    def split(self, piece: str, max_tokens: int) -> List[str]:
+        """Cut a piece into parts of at most `max_tokens`, at whitespace where possible."""
+        return _split_chars(piece, max(1, int(max_tokens * self.chars_per_token)))
+
+
+class TokenizerCounter:
+    """Exact token counts from a `tokenizers.Tokenizer` (no truncation or padding)."""
+
+    def __init__(self, tokenizer, limit: int = EMBEDDING_MAX_LENGTH):
+        self.tokenizer = tokenizer
+        self.limit = limit - SPECIAL_TOKENS
+
+    def count(self, pieces: List[str]) -> List[int]:
+        encodings = self.tokenizer.encode_batch(pieces, add_special_tokens=False)
+        return [len(encoding.ids) for encoding in encodings]
+
+    def split(self, piece: str, max_tokens: int) -> List[str]:
+        """Cut a piece at token boundaries into parts of at most `max_tokens`."""
+        offsets = self.tokenizer.encode(piece, add_special_tokens=False).offsets
+        cuts = [offsets[i][0] for i in range(max_tokens, len(offsets), max_tokens)]
+        bounds = [0] + cuts + [len(piece)]
+        return [piece[start:end] for start, end in zip(bounds, bounds[1:]) if start < end]
+
+
+def _split_chars(text: str, size: int) -> List[str]:
+    """Windows of at most `size` characters, ending at whitespace past the window's middle if any."""
+    parts = []
+    start = 0
+    while len(text) - start > size:
+        end = start + size
+        cut = text.rfind(' ', start + size // 2, end)
+        if cut == -1:
+            cut = text.rfind('\n', start + size // 2, end)
+        end = cut + 1 if cut != -1 else end
+        parts.append(text[start:end])
+        start = end
+    parts.append(text[start:])
+    return parts
+
+
+def _piece_batches(text: str, max_chars: int) -> Iterator[List[str]]:
+    """
+    Boundary-delimited pieces of `text`, none longer than `max_chars`, in
+    lists covering about SCAN_WINDOW characters each.
+    """
+    length = len(text)
+    start = 0
+    while start < length:
+        stop = min(length, start + SCAN_WINDOW)
+        ends = [match.end() for match in BOUNDARY.finditer(text, start, stop)]
+        if stop == length:
+            ends.append(length)
+        elif not ends:
+            # No boundary in a whole window: cut it by size
+            ends = [stop]
+        batch = []
+        for end in ends:
+            if end <= start:
+                continue
+            if end - start <= max_chars:
+                batch.append(text[start:end])
+            else:
+                batch.extend(_split_chars(text[start:end], max_chars))
+            start = end
+        yield batch
+
+
+def _measured(batch: List[str], max_tokens: int, counter) -> List[Tuple[str, int]]:
+    """(piece, tokens) pairs, splitting pieces larger than `max_tokens`."""
+    measured = []
+    for piece, tokens in zip(batch, counter.count(batch)):
+        if tokens <= max_tokens:
+            measured.append((piece, tokens))
+            continue
+        parts = counter.split(piece, max_tokens)
+        # An approximate split can still overshoot; clamp so the
+        # accumulator always makes progress
+        measured.extend(
+            (part, min(part_tokens, max_tokens))
+            for part, part_tokens in zip(parts, counter.count(parts))
+        )
+    return measured
+
+
+def iter_chunks(text: str, chunk_size: int, overlap: int, counter=None) -> Iterator[str]:
+    """
+    Yield overlapping chunks of `text`.
+
+    Args:
+        text: Text to chunk
+        chunk_size: Tokens per chunk (capped at the counter's model limit)
+        overlap: Tokens repeated at the start of the next chunk (at most
+            half of chunk_size)
+        counter: TokenizerCounter or ApproximateCounter (default: approximate)
+
+    Yields:
+        Stripped, non-empty chunks in text order
+    """
+    counter = counter or ApproximateCounter()
+    chunk_size = max(1, min(chunk_size, counter.limit))
+    overlap = max(0, min(overlap, chunk_size // 2))
+    # Bounds the work (and tokenizer input) per piece in boundary-free text
+    max_chars = max(64, int(chunk_size * CHUNK_CHARS_PER_TOKEN * 4))
+
+    window: Deque[Tuple[str, int]] = deque()
+    total = 0
+    fresh = False  # The window holds a piece no chunk has contained yet
+
+    for batch in _piece_batches(text, max_chars):
+        for piece, tokens in _measured(batch, chunk_size, counter):
+            if fresh and total + tokens > chunk_size:
+                chunk = ''.join([part for part, _ in window]).strip()
+                if chunk:
+                    yield chunk
+
+                # Carry the trailing pieces that fit in the overlap
+                carried: Deque[Tuple[str, int]] = deque()
+                carried_tokens = 0
+                for part, part_tokens in reversed(window):
+                    if carried_tokens + part_tokens > overlap:
+                        break
+                    carried.appendleft((part, part_tokens))
+                    carried_tokens += part_tokens
+                window, total, fresh = carried, carried_tokens, False
+
+            # Drop carried context that would not leave room for the new piece
+            while window and total + tokens > chunk_size:
+                total -= window.popleft()[1]
+
+            window.append((piece, tokens))
+            total += tokens
+            fresh = True
+
+    if fresh:
+        chunk = ''.join([part for part, _ in window]).strip()
+        if chunk:
+            yield chunk
+
+
+def load_counter(embedding_function=None):
+    """
+    Counter matching `embedding_function`'s tokenizer, or the approximate
+    counter if it has none (or its tokenizer cannot be loaded).
+    """
+    tokenizer_source = getattr(embedding_function, 'length_tokenizer', None)
+    if tokenizer_source is None:
+        return ApproximateCounter()
+    try:
+        return TokenizerCounter(
+            tokenizer_source(),
+            limit=getattr(embedding_function, 'max_length', EMBEDDING_MAX_LENGTH)
+        )
+    except Exception as e:
+        logger.warning(f"Tokenizer unavailable, sizing chunks approximately: {e}")
+        return ApproximateCounter()
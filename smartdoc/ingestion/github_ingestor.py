@@ -3,25 +3,29 @@ GitHub repository ingestor with code-aware chunking.
 """
 
 from pathlib import Path
-from typing import Dict, Any, List
+from functools import partial
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+import base64
 import logging
-import shutil
-import tempfile
 from datetime import datetime
 from urllib.parse import urlparse
 
 from git import Repo
 from git.exc import GitCommandError
 
-from .base_ingestor import BaseIngestor
+from .base_ingestor import BaseIngestor, IngestionCancelled
+from .checkpoint import Checkpoint
+from ..core.services import service_slot
 from ..config import (
     GITHUB_EXTENSIONS,
     GITHUB_EXCLUDE_DIRS,
+    CHUNK_SIZE,
     CODE_CHUNK_SIZE,
     CHUNK_OVERLAP,
     MAX_FILE_SIZE_WARNING,
     MAX_FILE_SIZE_HARD,
-    GITHUB_TOKEN
+    PIPELINE_CHUNK_WORKERS,
+    settings
 )
 
 logger = logging.getLogger(__name__)
@@ -48,6 +52,8 @@ class GitHubIngestor(BaseIngestor):
                 - branch: str (default: main/master)
                 - extensions: List[str] (override default extensions)
                 - max_depth: int (limit directory depth)
+                - resume: bool (default False) continue an interrupted
+                  ingestion from its checkpoint, reusing its clone
         
         Returns:
             Dict with ingestion results
@@ -67,33 +73,60 @@ class GitHubIngestor(BaseIngestor):
             metadata=repo_info
         )
         
-        temp_dir = None
+        # The clone lives in the checkpoint, so a failed ingestion keeps it
+        checkpoint = Checkpoint.open(source, {
+            'branch': kwargs.get('branch'),
+            'extensions': list(kwargs.get('extensions', GITHUB_EXTENSIONS)),
+            'max_depth': kwargs.get('max_depth')
+        }, resume=kwargs.get('resume', False))
+        steps = self.open_processing_log(source_id)
         
         try:
             # Clone repository
-            logger.info(f"Cloning {repo_info['owner']}/{repo_info['repo']}...")
-            temp_dir = tempfile.mkdtemp()
-            repo = self._clone_repo(source, temp_dir, kwargs.get('branch'))
-            
-            # Get commit info
-            commit_sha = repo.head.commit.hexsha
-            commit_date = datetime.fromtimestamp(repo.head.commit.committed_date).isoformat()
+            self.report_progress("clone", f"Cloning {repo_info['owner']}/{repo_info['repo']}")
+            with steps.step("clone") as step:
+                if checkpoint.completed("clone") is not None:
+                    clone_dir = checkpoint.directory("clone")
+                    repo = Repo(clone_dir)
+                    # Clones checkpointed by older versions kept the token in the remote
+                    repo.remote('origin').set_url(source)
+                    step.message = f"Reused the checkpointed clone of {repo_info['owner']}/{repo_info['repo']}"
+                else:
+                    logger.info(f"Cloning {repo_info['owner']}/{repo_info['repo']}...")
+                    clone_dir = checkpoint.directory("clone", clear=True)
+                    repo = self._clone_repo(source, str(clone_dir), kwargs.get('branch'))
+                    checkpoint.complete("clone", commit_sha=repo.head.commit.hexsha)
+                    step.message = f"Cloned {repo_info['owner']}/{repo_info['repo']}"
+                
+                # Get commit info
+                commit_sha = repo.head.commit.hexsha
+                commit_date = datetime.fromtimestamp(repo.head.commit.committed_date).isoformat()
+                step.message += f" at {commit_sha[:8]}"
             
             # Scan and process files
+            self.report_progress("scan", "Scanning repository files")
             logger.info("Scanning repository files...")
-            files = self._scan_repository(
-                Path(temp_dir),
-                extensions=kwargs.get('extensions', GITHUB_EXTENSIONS),
-                max_depth=kwargs.get('max_depth')
-            )
+            with steps.step("scan") as step:
+                files = self._scan_repository(
+                    clone_dir,
+                    extensions=kwargs.get('extensions', GITHUB_EXTENSIONS),
+                    max_depth=kwargs.get('max_depth')
+                )
+                step.message = f"Found {len(files)} files to process"
             
             logger.info(f"Found {len(files)} files to process")
             
-            # Process files
-            chunks = self._process_files(files, temp_dir, source)
-            
-            # Store in ChromaDB
-            self._store_chunks(chunks, source, commit_sha)
+            # Files are read and chunked while earlier chunks are embedded and stored
+            with steps.step("pipeline") as step:
+                stats = self.sync_chunks(
+                    source,
+                    self._iter_files(files),
+                    partial(self._file_chunks, clone_dir, source, commit_sha),
+                    chunk_workers=PIPELINE_CHUNK_WORKERS,
+                    checkpoint=checkpoint
+                )
+                step.details = stats
+                step.message = f"Stored {stats['chunks']} chunks from {len(files)} files ({self.describe_sync(stats)})"
             
             # Update registry
             metadata = {
@@ -102,17 +135,19 @@ class GitHubIngestor(BaseIngestor):
                 'commit_sha': commit_sha,
                 'commit_date': commit_date,
                 'files_processed': len(files),
-                'total_chunks': len(chunks),
+                'total_chunks': stats['chunks'],
                 'branch': kwargs.get('branch', 'main')
             }
             self.registry.update_status(source, 'success', metadata)
+            checkpoint.discard()
+            logger.info("Cleaned up the clone")
             
-            self.log_ingestion_complete(source, len(chunks))
+            self.log_ingestion_complete(source, stats['chunks'])
             
             return {
                 'status': 'success',
                 'source': source,
-                'chunks_added': len(chunks),
+                'chunks_added': stats['chunks'],
                 'files_processed': len(files),
                 'commit_sha': commit_sha,
                 'metadata': metadata
@@ -120,14 +155,13 @@ class GitHubIngestor(BaseIngestor):
             
         except Exception as e:
             self.log_ingestion_error(source, e)
-            self.registry.update_status(source, 'failed', {'error': str(e)})
+            status = 'cancelled' if isinstance(e, IngestionCancelled) else 'failed'
+            self.registry.update_status(source, status, {'error': str(e)})
+            logger.info(f"Finished stages are checkpointed; fetch {source} again with --resume to continue")
             raise
         
         finally:
-            # Cleanup temp directory
-            if temp_dir and Path(temp_dir).exists():
-                shutil.rmtree(temp_dir)
-                logger.info("Cleaned up temporary clone")
+            steps.close()
     
     def _parse_repo_url(self, url: str) -> Dict[str, str]:
         """Parse GitHub URL to extract owner and repo."""
@@ -161,19 +195,18 @@ class GitHubIngestor(BaseIngestor):
     
     def _clone_repo(self, url: str, target_dir: str, branch: str = None) -> Repo:
         """Clone GitHub repository."""
-        # Modify URL to include token if available
-        if GITHUB_TOKEN and url.startswith('https://github.com'):
-            url = url.replace('https://github.com', f'https://{GITHUB_TOKEN}@github.com')
+        env = self._auth_env(url)
         
         try:
-            if branch:
-                repo = Repo.clone_from(url, target_dir, branch=branch, depth=1)
-            else:
-                # Try main first, fallback to master
-                try:
-                    repo = Repo.clone_from(url, target_dir, branch='main', depth=1)
-                except GitCommandError:
-                    repo = Repo.clone_from(url, target_dir, branch='master', depth=1)
+            with service_slot("github"):
+                if branch:
+                    repo = Repo.clone_from(url, target_dir, branch=branch, depth=1, env=env)
+                else:
+                    # Try main first, fallback to master
+                    try:
+                        repo = Repo.clone_from(url, target_dir, branch='main', depth=1, env=env)
+                    except GitCommandError:
+                        repo = Repo.clone_from(url, target_dir, branch='master', depth=1, env=env)
             
             return repo
         
@@ -181,6 +214,25 @@ class GitHubIngestor(BaseIngestor):
             logger.error(f"Git clone failed: {e}")
             raise
     
+    @staticmethod
+    def _auth_env(url: str) -> Optional[Dict[str, str]]:
+        """
+        Git environment sending GITHUB_TOKEN as an HTTP header, if set.
+        
+        The token goes through git's environment config (git >= 2.31) rather
+        than the remote URL, so it is never written to the clone's
+        .git/config, which outlives a failed ingestion in its checkpoint.
+        """
+        github_token = settings.github_token
+        if not github_token or not url.startswith('https://github.com'):
+            return None
+        credentials = base64.b64encode(f"x-access-token:{github_token}".encode('utf-8')).decode('ascii')
+        return {
+            'GIT_CONFIG_COUNT': '1',
+            'GIT_CONFIG_KEY_0': 'http.https://github.com/.extraheader',
+            'GIT_CONFIG_VALUE_0': f"Authorization: Basic {credentials}"
+        }
+    
     def _scan_repository(
         self,
         repo_path: Path,
@@ -211,53 +263,66 @@ class GitHubIngestor(BaseIngestor):
         
         return files
     
-    def _process_files(
-        self,
-        files: List[Path],
-        repo_root: str,
-        source_url: str
-    ) -> List[Dict[str, Any]]:
-        """Process files and create chunks."""
-        chunks = []
-        repo_root_path = Path(repo_root)
-        
-        for file_path in files:
+    def _iter_files(self, files: List[Path]) -> Iterator[Path]:
+        """Files to chunk, after the size check (runs on the pipeline's extract thread)."""
+        for file_idx, file_path in enumerate(files):
+            self.report_progress(
+                "file_processing",
+                f"Processing {file_idx + 1}/{len(files)}: {file_path.name}",
+                file_idx / len(files)
+            )
             try:
-                # Check file size
                 if not self.check_file_size(file_path, MAX_FILE_SIZE_WARNING, MAX_FILE_SIZE_HARD):
                     logger.info(f"Skipping large file: {file_path.name}")
                     continue
-                
-                # Read file content
-                try:
-                    content = file_path.read_text(encoding='utf-8')
-                except UnicodeDecodeError:
-                    logger.warning(f"Skipping binary file: {file_path.name}")
-                    continue
-                
-                # Detect language
-                language = self._detect_language(file_path)
-                
-                # Chunk content
-                file_chunks = self._chunk_code(content, language)
-                
-                # Get relative path
-                relative_path = file_path.relative_to(repo_root_path)
-                
-                # Create chunks with metadata
-                for chunk_idx, chunk_text in enumerate(file_chunks):
-                    chunks.append({
-                        'content': chunk_text,
-                        'file_path': str(relative_path),
-                        'language': language,
-                        'chunk_index': chunk_idx,
-                        'source_url': source_url
-                    })
-                
-            except Exception as e:
+            except OSError as e:
                 logger.warning(f"Failed to process {file_path.name}: {e}")
-        
-        return chunks
+                continue
+            yield file_path
+    
+    def _file_chunks(
+        self,
+        repo_root: Path,
+        source_url: str,
+        commit_sha: str,
+        file_path: Path
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """(document, metadata) chunks of one file."""
+        try:
+            # Read file content
+            try:
+                content = file_path.read_text(encoding='utf-8')
+            except UnicodeDecodeError:
+                logger.warning(f"Skipping binary file: {file_path.name}")
+                return []
+            
+            # Detect language
+            language = self._detect_language(file_path)
+            
+            # Chunk content
+            file_chunks = self._chunk_code(content, language)
+            
+            # Get relative path
+            relative_path = str(file_path.relative_to(repo_root))
+            
+            # Create chunks with metadata
+            indexed_at = datetime.now().isoformat()
+            return [
+                (chunk_text, {
+                    'source': source_url,
+                    'source_type': 'github',
+                    'content_type': 'code',
+                    'file_path': relative_path,
+                    'language': language,
+                    'chunk_index': chunk_idx,
+                    'commit_sha': commit_sha,
+                    'indexed_at': indexed_at
+                })
+                for chunk_idx, chunk_text in enumerate(file_chunks)
+            ]
+        except Exception as e:
+            logger.warning(f"Failed to process {file_path.name}: {e}")
+            return []
     
     def _detect_language(self, file_path: Path) -> str:
         """Detect programming language from file extension."""
@@ -288,7 +353,7 @@ class GitHubIngestor(BaseIngestor):
         """Chunk code with language-aware splitting."""
         if language == 'markdown' or language == 'text':
             # For documentation, use regular text chunking
-            return self.chunk_text(code, CODE_CHUNK_SIZE * 2, CHUNK_OVERLAP)
+            return self.chunk_text(code, CHUNK_SIZE, CHUNK_OVERLAP)
         
         # For code, try to preserve function/class boundaries
         return self._chunk_code_smart(code)
@@ -333,37 +398,3 @@ class GitHubIngestor(BaseIngestor):
             chunks.append('\n'.join(current_chunk))
         
         return chunks if chunks else [code]
-    
-    def _store_chunks(self, chunks: List[Dict[str, Any]], source_url: str, commit_sha: str):
-        """Store chunks in ChromaDB."""
-        if not chunks:
-            return
-        
-        documents = []
-        metadatas = []
-        ids = []
-        
-        for idx, chunk in enumerate(chunks):
-            # Generate unique ID
-            content_hash = self.hash_content(chunk['content'])
-            chunk_id = self.generate_chunk_id(source_url, idx, content_hash)
-            
-            # Prepare metadata
-            metadata = {
-                'source': source_url,
-                'source_type': 'github',
-                'content_type': 'code',
-                'file_path': chunk['file_path'],
-                'language': chunk['language'],
-                'chunk_index': chunk['chunk_index'],
-                'commit_sha': commit_sha,
-                'indexed_at': datetime.now().isoformat()
-            }
-            
-            documents.append(chunk['content'])
-            metadatas.append(metadata)
-            ids.append(chunk_id)
-        
-        # Add to ChromaDB
-        self.chroma.add_documents(documents, metadatas, ids)
-
@@ -3,7 +3,8 @@ PDF ingestor using LlamaParse and Gemini Vision.
 """
 
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from functools import partial
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 import logging
 from datetime import datetime
 from rich.console import Console
@@ -15,15 +16,16 @@ try:
 except ImportError:
     LlamaParse = None
 
-from .base_ingestor import BaseIngestor
-from ..vision.gemini_analyzer import GeminiAnalyzer
-from ..vision.image_extractor import ImageExtractor
+from .base_ingestor import BaseIngestor, IngestionCancelled
+from .checkpoint import Checkpoint
+from ..core.services import service_slot
 from ..config import (
-    LLAMAPARSE_API_KEY,
+    settings,
     CHUNK_SIZE,
     CHUNK_OVERLAP,
     MAX_FILE_SIZE_WARNING,
-    MAX_FILE_SIZE_HARD
+    MAX_FILE_SIZE_HARD,
+    PIPELINE_CHUNK_WORKERS
 )
 
 logger = logging.getLogger(__name__)
@@ -38,15 +40,32 @@ class PDFIngestor(BaseIngestor):
         self.console = Console()
         
         # Initialize components
-        if LLAMAPARSE_API_KEY and LlamaParse:
-            self.parser = LlamaParse(api_key=LLAMAPARSE_API_KEY)
+        if settings.llamaparse_api_key and LlamaParse:
+            self.parser = LlamaParse(api_key=settings.llamaparse_api_key)
             logger.info("LlamaParse initialized")
         else:
             self.parser = None
             logger.warning("LlamaParse not available - text extraction will be limited")
         
-        self.vision_analyzer = GeminiAnalyzer()
-        self.image_extractor = ImageExtractor()
+        # Vision components are only needed for schematic analysis
+        self._vision_analyzer = None
+        self._image_extractor = None
+    
+    @property
+    def vision_analyzer(self):
+        """Gemini analyzer, created on first use (imports google.generativeai)."""
+        if self._vision_analyzer is None:
+            from ..vision.gemini_analyzer import GeminiAnalyzer
+            self._vision_analyzer = GeminiAnalyzer()
+        return self._vision_analyzer
+    
+    @property
+    def image_extractor(self):
+        """PDF image extractor, created on first use (imports pdf2image)."""
+        if self._image_extractor is None:
+            from ..vision.image_extractor import ImageExtractor
+            self._image_extractor = ImageExtractor()
+        return self._image_extractor
     
     def validate_source(self, source: str) -> bool:
         """Validate PDF file exists and is readable."""
@@ -62,6 +81,8 @@ class PDFIngestor(BaseIngestor):
             **kwargs:
                 - analyze_schematics: bool (default True)
                 - initial_query: str (optional context for schematic analysis)
+                - resume: bool (default False) continue an interrupted
+                  ingestion from its checkpoint (see ingestion.checkpoint)
         
         Returns:
             Dict with ingestion results
@@ -98,75 +119,161 @@ class PDFIngestor(BaseIngestor):
             file_size=file_size
         )
         
+        # Same file and options, or the interrupted work does not apply
+        file_stat = pdf_path.stat()
+        checkpoint = Checkpoint.open(str(pdf_path), {
+            'size': file_stat.st_size,
+            'mtime_ns': file_stat.st_mtime_ns,
+            'analyze_schematics': kwargs.get('analyze_schematics', True),
+            'initial_query': kwargs.get('initial_query')
+        }, resume=kwargs.get('resume', False))
+        
+        steps = self.open_processing_log(source_id)
         try:
-            # Step 1: Extract text and tables with LlamaParse
-            self.console.print("[bold blue]Step 1/3:[/bold blue] Extracting text and tables...")
-            text_chunks = self._extract_text(pdf_path, source_id)
-            self.console.print(f"[green]✓ Extracted {len(text_chunks)} text chunks[/green]\n")
-            self.registry.log_processing_step(
-                source_id, "text_extraction", "success",
-                f"Extracted {len(text_chunks)} text chunks",
-                {"chunk_count": len(text_chunks), "method": "llamaparse" if self.parser else "fallback"}
+            # Pages are chunked, embedded and stored while later pages are
+            # still being extracted and schematics analyzed
+            schematic_count = [0]
+            units = self._iter_units(
+                pdf_path,
+                source_id,
+                steps,
+                analyze_schematics=kwargs.get('analyze_schematics', True),
+                initial_query=kwargs.get('initial_query'),
+                schematic_count=schematic_count,
+                checkpoint=checkpoint
             )
-            
-            # Step 2: Extract and analyze images/schematics
-            schematic_chunks = []
-            if kwargs.get('analyze_schematics', True):
-                self.console.print("[bold blue]Step 2/3:[/bold blue] Analyzing schematics with Gemini Vision...")
-                schematic_chunks, schematic_stats = self._extract_and_analyze_schematics(
-                    pdf_path,
-                    source_id,
-                    initial_query=kwargs.get('initial_query')
+            self.report_progress("text_extraction", "Extracting text and tables")
+            with steps.step("pipeline") as step:
+                stats = self.sync_chunks(
+                    str(pdf_path),
+                    units,
+                    partial(self._unit_chunks, str(pdf_path)),
+                    chunk_workers=PIPELINE_CHUNK_WORKERS,
+                    checkpoint=checkpoint
                 )
-                self.console.print(f"[green]✓ Analyzed {len(schematic_chunks)} schematics[/green]\n")
-                
-                # Log schematic analysis results
-                status = "success" if schematic_chunks else ("warning" if schematic_stats.get('images_found') else "skipped")
-                self.registry.log_processing_step(
-                    source_id, "schematic_analysis", status,
-                    f"Analyzed {schematic_stats.get('schematics_found', 0)} schematics, {len(schematic_chunks)} successful",
-                    schematic_stats
-                )
-            else:
-                self.console.print("[dim]Step 2/3: Skipped (--no-schematics)[/dim]\n")
-                self.registry.log_processing_step(
-                    source_id, "schematic_analysis", "skipped",
-                    "Schematic analysis disabled by user"
-                )
-            
-            # Step 3: Store all chunks in ChromaDB
-            self.console.print("[bold blue]Step 3/3:[/bold blue] Storing in database...")
-            all_chunks = text_chunks + schematic_chunks
-            self._store_chunks(all_chunks, pdf_path)
-            self.console.print(f"[green]✓ Stored {len(all_chunks)} chunks in ChromaDB[/green]\n")
+                step.details = stats
+                step.message = f"Stored {stats['chunks']} chunks ({self.describe_sync(stats)})"
+            self.console.print(f"[green]✓ Stored {stats['chunks']} chunks in ChromaDB ({self.describe_sync(stats)})[/green]\n")
             
             # Update registry
             metadata = {
                 'pages': self._get_page_count(pdf_path),
-                'text_chunks': len(text_chunks),
-                'schematic_chunks': len(schematic_chunks),
-                'total_chunks': len(all_chunks)
+                'text_chunks': stats['chunks'] - schematic_count[0],
+                'schematic_chunks': schematic_count[0],
+                'total_chunks': stats['chunks']
             }
             self.registry.update_status(str(pdf_path), 'success', metadata)
+            checkpoint.discard()
             
-            self.log_ingestion_complete(source, len(all_chunks))
+            self.log_ingestion_complete(source, stats['chunks'])
             
             return {
                 'status': 'success',
                 'source': str(pdf_path),
-                'chunks_added': len(all_chunks),
+                'chunks_added': stats['chunks'],
                 'metadata': metadata
             }
             
         except Exception as e:
             self.log_ingestion_error(source, e)
-            self.registry.update_status(str(pdf_path), 'failed', {'error': str(e)})
+            status = 'cancelled' if isinstance(e, IngestionCancelled) else 'failed'
+            self.registry.update_status(str(pdf_path), status, {'error': str(e)})
+            logger.info(f"Finished stages are checkpointed; index {pdf_path} again with --resume to continue")
             raise
+        finally:
+            steps.close()
     
-    def _extract_text(self, pdf_path: Path, source_id: int = None) -> List[Dict[str, Any]]:
-        """Extract text and tables from PDF."""
-        chunks = []
+    def _iter_units(
+        self,
+        pdf_path: Path,
+        source_id: int,
+        steps,
+        analyze_schematics: bool,
+        initial_query: Optional[str],
+        schematic_count: List[int],
+        checkpoint: Checkpoint
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Pipeline units of a PDF: text pages, then analyzed schematics.
+        
+        Runs on the pipeline's extract thread; the extraction steps are
+        logged as they finish (their wall time includes waits on the
+        downstream stages). Stages the checkpoint holds complete are
+        replayed from it.
+        """
+        self.console.print("[bold blue]Step 1/2:[/bold blue] Extracting text and tables...")
+        with steps.step("text_extraction") as step:
+            pages = 0
+            extracted = checkpoint.completed("text")
+            if extracted is not None:
+                for record in checkpoint.records("text"):
+                    pages += 1
+                    yield {'type': 'text', 'page': record['page'], 'text': record['text']}
+                step.message = f"Reused {pages} extracted pages from the checkpoint"
+                step.details = dict(extracted, resumed=True)
+            else:
+                checkpoint.reset("text")
+                for page, text in self._extract_pages(pdf_path):
+                    pages += 1
+                    checkpoint.append("text", {'page': page, 'text': text})
+                    yield {'type': 'text', 'page': page, 'text': text}
+                step.message = f"Extracted {pages} pages"
+                step.details = {"pages": pages, "method": "llamaparse" if self.parser else "fallback"}
+                if pages:
+                    checkpoint.complete("text", **step.details)
+        self.console.print(f"[green]✓ Extracted {pages} pages[/green]\n")
+        
+        if not analyze_schematics:
+            self.console.print("[dim]Step 2/2: Skipped (--no-schematics)[/dim]\n")
+            steps.log("schematic_analysis", "skipped", "Schematic analysis disabled by user")
+            return
+        
+        self.console.print("[bold blue]Step 2/2:[/bold blue] Analyzing schematics with Gemini Vision...")
+        with steps.step("schematic_analysis") as step:
+            analyzed = checkpoint.completed("schematics")
+            if analyzed is not None:
+                schematic_chunks = [record['unit'] for record in checkpoint.records("schematics")]
+                schematic_stats = dict(analyzed, analysis_resumed=len(schematic_chunks))
+            else:
+                schematic_chunks, schematic_stats = self._extract_and_analyze_schematics(
+                    pdf_path,
+                    source_id,
+                    initial_query=initial_query,
+                    checkpoint=checkpoint
+                )
+                # Failed analyses are retried by the next resume
+                if not schematic_stats['errors']:
+                    checkpoint.complete("schematics", **schematic_stats)
+            step.status = "success" if schematic_chunks else ("warning" if schematic_stats.get('images_found') else "skipped")
+            step.message = f"Analyzed {schematic_stats.get('schematics_found', 0)} schematics, {len(schematic_chunks)} successful"
+            step.details = schematic_stats
+        self.console.print(f"[green]✓ Analyzed {len(schematic_chunks)} schematics[/green]\n")
+        
+        schematic_count[0] = len(schematic_chunks)
+        yield from schematic_chunks
+    
+    def _unit_chunks(self, source: str, unit: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """(document, metadata) chunks of one pipeline unit."""
+        base = {
+            'source': source,
+            'source_type': 'pdf',
+            'content_type': unit['type'],
+            'page': unit['page']
+        }
+        if unit['type'] == 'schematic':
+            metadata = dict(base, chunk_index=unit['chunk_index'], indexed_at=datetime.now().isoformat())
+            metadata['image_hash'] = unit['image_hash']
+            metadata['confidence'] = unit.get('confidence', 0.7)
+            if unit.get('pin_mappings'):
+                metadata['pin_mappings'] = str(unit['pin_mappings'])
+            yield unit['content'], metadata
+            return
         
+        for chunk_idx, chunk_text in enumerate(self.iter_chunks(unit['text'], CHUNK_SIZE, CHUNK_OVERLAP)):
+            yield chunk_text, dict(base, chunk_index=chunk_idx, indexed_at=datetime.now().isoformat())
+    
+    def _extract_pages(self, pdf_path: Path) -> Iterator[Tuple[int, str]]:
+        """Extract text and tables from PDF: (page number, text) per page."""
         if self.parser:
             try:
                 # Use LlamaParse for high-quality extraction
@@ -193,7 +300,8 @@ class PDFIngestor(BaseIngestor):
                     import threading
                     def parse_pdf():
                         nonlocal documents
-                        documents = self.parser.load_data(str(pdf_path))
+                        with service_slot("llamaparse"):
+                            documents = self.parser.load_data(str(pdf_path))
                     
                     parse_thread = threading.Thread(target=parse_pdf)
                     parse_thread.start()
@@ -210,39 +318,28 @@ class PDFIngestor(BaseIngestor):
                     progress.update(task, completed=100)
                 
                 elapsed_time = int(time.time() - start_time)
+                if documents is None:
+                    raise RuntimeError("LlamaParse returned no documents")
                 self.console.print(f"  [green]✓ LlamaParse completed in {elapsed_time}s[/green]")
                 
-                # Process documents
-                self.console.print(f"  [dim]Processing {len(documents)} pages...[/dim]")
-                for doc_idx, doc in enumerate(documents):
-                    # Chunk the text
-                    text_chunks = self.chunk_text(doc.text, CHUNK_SIZE, CHUNK_OVERLAP)
-                    
-                    for chunk_idx, chunk_text in enumerate(text_chunks):
-                        chunks.append({
-                            'content': chunk_text,
-                            'type': 'text',
-                            'page': doc_idx + 1,  # Approximate page number
-                            'chunk_index': chunk_idx
-                        })
-                
-                logger.info(f"Extracted {len(chunks)} text chunks")
-                
             except Exception as e:
                 logger.error(f"LlamaParse extraction failed: {e}")
                 # Fallback to basic extraction
-                chunks = self._extract_text_fallback(pdf_path)
+                yield from self._extract_pages_fallback(pdf_path)
+                return
+            
+            # Process documents
+            self.console.print(f"  [dim]Processing {len(documents)} pages...[/dim]")
+            for doc_idx, doc in enumerate(documents):
+                yield doc_idx + 1, doc.text  # Approximate page number
         else:
-            chunks = self._extract_text_fallback(pdf_path)
-        
-        return chunks
+            yield from self._extract_pages_fallback(pdf_path)
     
-    def _extract_text_fallback(self, pdf_path: Path) -> List[Dict[str, Any]]:
-        """Fallback text extraction using PyPDF2."""
+    def _extract_pages_fallback(self, pdf_path: Path) -> Iterator[Tuple[int, str]]:
+        """Fallback text extraction using PyPDF2, one page at a time."""
         import PyPDF2
         
-        chunks = []
-        
+        pages = 0
         try:
             with open(pdf_path, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
@@ -251,31 +348,27 @@ class PDFIngestor(BaseIngestor):
                     text = page.extract_text()
                     
                     if text.strip():
-                        # Chunk the page text
-                        text_chunks = self.chunk_text(text, CHUNK_SIZE, CHUNK_OVERLAP)
-                        
-                        for chunk_idx, chunk_text in enumerate(text_chunks):
-                            chunks.append({
-                                'content': chunk_text,
-                                'type': 'text',
-                                'page': page_num + 1,
-                                'chunk_index': chunk_idx
-                            })
+                        pages += 1
+                        yield page_num + 1, text
             
-            logger.info(f"Extracted {len(chunks)} text chunks (fallback)")
+            logger.info(f"Extracted {pages} pages of text (fallback)")
             
         except Exception as e:
             logger.error(f"Fallback text extraction failed: {e}")
-        
-        return chunks
     
     def _extract_and_analyze_schematics(
         self,
         pdf_path: Path,
         source_id: int,
-        initial_query: Optional[str] = None
+        initial_query: Optional[str] = None,
+        checkpoint: Optional[Checkpoint] = None
     ) -> tuple[List[Dict[str, Any]], Dict[str, Any]]:
-        """Extract images and analyze schematics. Returns (chunks, stats)."""
+        """
+        Extract images and analyze schematics. Returns (chunks, stats).
+        
+        Each analyzed schematic is appended to the checkpoint's
+        'schematics' stage; those it already holds are not analyzed again.
+        """
         chunks = []
         stats = {
             'images_found': 0,
@@ -283,8 +376,15 @@ class PDFIngestor(BaseIngestor):
             'analysis_successful': 0,
             'analysis_failed': 0,
             'analysis_cached': 0,
+            'analysis_resumed': 0,
             'errors': []
         }
+        analyzed = {}
+        if checkpoint is not None:
+            analyzed = {
+                (record['image_hash'], record['unit']['page']): record['unit']
+                for record in checkpoint.records("schematics")
+            }
         
         try:
             # Extract images
@@ -305,13 +405,24 @@ class PDFIngestor(BaseIngestor):
                 self.console.print(f"  [dim]Query context: \"{initial_query}\"[/dim]")
             
             # Analyze each schematic with progress bar
-            for img_data in track(schematics, description="  Analyzing with Gemini Vision", console=self.console):
+            for idx, img_data in enumerate(track(schematics, description="  Analyzing with Gemini Vision", console=self.console)):
+                self.report_progress(
+                    "schematic_analysis",
+                    f"Analyzing schematic {idx + 1}/{len(schematics)}",
+                    idx / len(schematics)
+                )
                 image_bytes = img_data['data']
                 page_num = img_data['page']
                 
                 # Generate image hash
                 img_hash = self.hash_image(image_bytes)
                 
+                # Analyzed before the previous run was interrupted
+                if (img_hash, page_num) in analyzed:
+                    chunks.append(analyzed[(img_hash, page_num)])
+                    stats['analysis_resumed'] += 1
+                    continue
+                
                 # Check cache first
                 cached = self.registry.get_schematic_cache(img_hash, initial_query)
                 
@@ -350,7 +461,7 @@ class PDFIngestor(BaseIngestor):
                 
                 # Create chunk for schematic
                 if analysis.get('description'):
-                    chunks.append({
+                    unit = {
                         'content': analysis['description'],
                         'type': 'schematic',
                         'page': page_num,
@@ -358,8 +469,13 @@ class PDFIngestor(BaseIngestor):
                         'confidence': analysis.get('confidence', 0.7),
                         'pin_mappings': analysis.get('pin_mappings', {}),
                         'chunk_index': 0
-                    })
+                    }
+                    chunks.append(unit)
+                    if checkpoint is not None:
+                        checkpoint.append("schematics", {'image_hash': img_hash, 'unit': unit})
             
+        except IngestionCancelled:
+            raise
         except Exception as e:
             error_msg = f"Critical error: {str(e)}"
             stats['errors'].append(error_msg)
@@ -367,44 +483,6 @@ class PDFIngestor(BaseIngestor):
         
         return chunks, stats
     
-    def _store_chunks(self, chunks: List[Dict[str, Any]], pdf_path: Path):
-        """Store chunks in ChromaDB."""
-        if not chunks:
-            return
-        
-        documents = []
-        metadatas = []
-        ids = []
-        
-        for idx, chunk in enumerate(chunks):
-            # Generate unique ID
-            content_hash = self.hash_content(chunk['content'])
-            chunk_id = self.generate_chunk_id(str(pdf_path), idx, content_hash)
-            
-            # Prepare metadata
-            metadata = {
-                'source': str(pdf_path),
-                'source_type': 'pdf',
-                'content_type': chunk['type'],
-                'page': chunk['page'],
-                'chunk_index': chunk['chunk_index'],
-                'indexed_at': datetime.now().isoformat()
-            }
-            
-            # Add schematic-specific metadata
-            if chunk['type'] == 'schematic':
-                metadata['image_hash'] = chunk['image_hash']
-                metadata['confidence'] = chunk.get('confidence', 0.7)
-                if chunk.get('pin_mappings'):
-                    metadata['pin_mappings'] = str(chunk['pin_mappings'])
-            
-            documents.append(chunk['content'])
-            metadatas.append(metadata)
-            ids.append(chunk_id)
-        
-        # Add to ChromaDB
-        self.chroma.add_documents(documents, metadatas, ids)
-    
     def _get_page_count(self, pdf_path: Path) -> int:
         """Get total page count of PDF."""
         import PyPDF2
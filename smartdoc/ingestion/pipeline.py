@@ -0,0 +1,309 @@
+"""
+Staged ingestion pipeline.
+
+A Pipeline runs a source iterator and a chain of stages on their own
+threads, connected by bounded queues:
+
+    extract ──▶ chunk ──▶ diff ──▶ embed ──▶ write
+           queue     queue    queue     queue
+
+Every stage works on the next item while its neighbours handle theirs, so
+an ingest takes about as long as its slowest stage instead of the sum of
+all of them. A full queue blocks its producer (backpressure), which keeps
+memory bounded by PIPELINE_QUEUE_SIZE items per link whatever the source
+size.
+
+Threads rather than processes: the expensive stages (ONNX Runtime,
+tokenizers, SQLite, network and file reads) release the GIL, and stage
+inputs would otherwise have to be pickled across processes. A stage with
+several workers runs them on a thread pool and still delivers its results
+in input order.
+
+The first exception raised anywhere (including IngestionCancelled from a
+progress checkpoint) stops every stage and is re-raised by `run`.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from ..config import PIPELINE_QUEUE_SIZE
+
+logger = logging.getLogger(__name__)
+
+# End-of-stream marker passed down the queues
+_DONE = object()
+
+# Seconds between checks for a stopped pipeline while waiting on a queue
+_POLL_INTERVAL = 0.1
+
+
+class _Stopped(Exception):
+    """Another stage failed; unwind this one quietly."""
+
+
+class Stage:
+    """One step of a Pipeline."""
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[Any], Any],
+        workers: int = 1,
+        batch_size: Optional[int] = None,
+        expand: bool = False
+    ):
+        """
+        Args:
+            name: Stage name in logs and stats
+            fn: Called with each input item (or list of items, see
+                batch_size); its return value goes to the next stage,
+                except None, which is dropped
+            workers: Threads calling `fn` concurrently (order is preserved)
+            batch_size: Group this many inputs into a list per call
+            expand: `fn` returns an iterable whose items are passed on one
+                by one (lazily, as a generator yields them, with one worker)
+        """
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.batch_size = batch_size
+        self.expand = expand
+
+
+class StageStats:
+    """Throughput counters of one stage."""
+
+    def __init__(self, name: str, workers: int = 1):
+        self.name = name
+        self.workers = workers
+        self.items_in = 0
+        self.items_out = 0
+        self.busy_seconds = 0.0     # Inside the stage function, summed over workers
+        self.blocked_seconds = 0.0  # Waiting for room downstream (backpressure)
+        self.starved_seconds = 0.0  # Waiting for input
+        self._lock = threading.Lock()
+
+    def add_busy(self, seconds: float):
+        with self._lock:
+            self.busy_seconds += seconds
+
+    def to_dict(self, wall_seconds: float) -> Dict[str, Any]:
+        capacity = wall_seconds * self.workers
+        return {
+            'workers': self.workers,
+            'items_in': self.items_in,
+            'items_out': self.items_out,
+            'busy_seconds': round(self.busy_seconds, 3),
+            'blocked_seconds': round(self.blocked_seconds, 3),
+            'starved_seconds': round(self.starved_seconds, 3),
+            'items_per_second': round(self.items_out / wall_seconds, 1) if wall_seconds else 0.0,
+            'utilization': round(min(1.0, self.busy_seconds / capacity), 3) if capacity else 0.0
+        }
+
+
+class Pipeline:
+    """A source iterator feeding a chain of stages over bounded queues."""
+
+    def __init__(self, stages: List[Stage], queue_size: int = PIPELINE_QUEUE_SIZE, name: str = "ingest"):
+        """
+        Args:
+            stages: Stages in order; the last one's results are discarded
+            queue_size: Items buffered between two stages
+            name: Prefix of the thread names
+        """
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+        self.name = name
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._error_lock = threading.Lock()
+
+    def run(self, source: Iterable[Any], source_name: str = "extract") -> Dict[str, Dict[str, Any]]:
+        """
+        Push every item of `source` through the stages.
+
+        Returns:
+            Per-stage stats, source first (see StageStats.to_dict), plus
+            'bottleneck': the stage with the highest utilization
+
+        Raises:
+            The first exception raised by the source or any stage
+        """
+        self._stop.clear()
+        self._error = None
+
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        stats = [StageStats(source_name)] + [StageStats(stage.name, stage.workers) for stage in self.stages]
+
+        threads = [threading.Thread(
+            target=self._guard, args=(self._feed, source, queues[0], stats[0]),
+            name=f"{self.name}-{source_name}", daemon=True
+        )]
+        for i, stage in enumerate(self.stages):
+            outbox = queues[i + 1] if i + 1 < len(queues) else None
+            threads.append(threading.Thread(
+                target=self._guard, args=(self._work, stage, queues[i], outbox, stats[i + 1]),
+                name=f"{self.name}-{stage.name}", daemon=True
+            ))
+
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - start
+
+        if self._error is not None:
+            raise self._error
+
+        report = {stage.name: stage.to_dict(wall) for stage in stats}
+        bottleneck = max(stats, key=lambda stage: report[stage.name]['utilization'])
+        logger.info(
+            f"Pipeline finished in {wall:.2f}s: "
+            + ", ".join(f"{stage.name} {report[stage.name]['utilization']:.0%}" for stage in stats)
+            + f" busy (bottleneck: {bottleneck.name})"
+        )
+        report['bottleneck'] = bottleneck.name
+        report['seconds'] = round(wall, 3)
+        return report
+
+    def _guard(self, target, *args):
+        """Run a stage loop; the first failure stops the whole pipeline."""
+        try:
+            target(*args)
+        except _Stopped:
+            pass
+        except BaseException as e:
+            with self._error_lock:
+                if self._error is None:
+                    self._error = e
+            self._stop.set()
+
+    def _put(self, outbox: Optional[queue.Queue], item: Any, stats: StageStats):
+        if outbox is None:
+            return
+        start = time.perf_counter()
+        while True:
+            if self._stop.is_set():
+                raise _Stopped()
+            try:
+                outbox.put(item, timeout=_POLL_INTERVAL)
+                break
+            except queue.Full:
+                continue
+        stats.blocked_seconds += time.perf_counter() - start
+
+    def _get(self, inbox: queue.Queue, stats: StageStats) -> Any:
+        start = time.perf_counter()
+        while True:
+            if self._stop.is_set():
+                raise _Stopped()
+            try:
+                item = inbox.get(timeout=_POLL_INTERVAL)
+                break
+            except queue.Empty:
+                continue
+        stats.starved_seconds += time.perf_counter() - start
+        return item
+
+    def _emit(self, result: Any, expand: bool, outbox: Optional[queue.Queue], stats: StageStats):
+        """
+        Pass a stage result downstream. For a lazy result, time spent
+        producing its items counts as busy and time spent waiting on the
+        queue as blocked.
+        """
+        if not expand:
+            if result is not None:
+                self._put(outbox, result, stats)
+                stats.items_out += 1
+            return
+        iterator = iter(result)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                stats.add_busy(time.perf_counter() - start)
+                return
+            stats.add_busy(time.perf_counter() - start)
+            if item is not None:
+                self._put(outbox, item, stats)
+                stats.items_out += 1
+
+    def _feed(self, source: Iterable[Any], outbox: queue.Queue, stats: StageStats):
+        """Source thread: iterate `source` (its work counts as the extract stage)."""
+        self._emit(source, True, outbox, stats)
+        stats.items_in = stats.items_out
+        self._put(outbox, _DONE, stats)
+
+    def _batches(self, stage: Stage, inbox: queue.Queue, stats: StageStats):
+        """Stage inputs until end of stream, grouped per `batch_size`."""
+        batch = []
+        while True:
+            item = self._get(inbox, stats)
+            if item is _DONE:
+                break
+            stats.items_in += 1
+            if not stage.batch_size:
+                yield item
+                continue
+            batch.append(item)
+            if len(batch) >= stage.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _work(self, stage: Stage, inbox: queue.Queue, outbox: Optional[queue.Queue], stats: StageStats):
+        if stage.workers == 1:
+            for item in self._batches(stage, inbox, stats):
+                start = time.perf_counter()
+                result = stage.fn(item)
+                stats.add_busy(time.perf_counter() - start)
+                self._emit(result, stage.expand, outbox, stats)
+        else:
+            self._work_pooled(stage, inbox, outbox, stats)
+        self._put(outbox, _DONE, stats)
+
+    def _work_pooled(self, stage: Stage, inbox: queue.Queue, outbox: Optional[queue.Queue], stats: StageStats):
+        """
+        Several workers: a dispatcher submits inputs to a thread pool and
+        queues the futures in input order; a collector passes results on in
+        that order. The futures queue bounds the work in flight.
+        """
+        def call(item):
+            start = time.perf_counter()
+            try:
+                result = stage.fn(item)
+                # Run generators on the worker, not on the collector
+                return list(result) if stage.expand else result
+            finally:
+                stats.add_busy(time.perf_counter() - start)
+
+        futures: queue.Queue = queue.Queue(maxsize=stage.workers * 2)
+        # Waits on the futures queue are internal to the stage, not throughput
+        internal = StageStats(stage.name)
+
+        def collect():
+            while True:
+                future = self._get(futures, internal)
+                if future is _DONE:
+                    return
+                self._emit(future.result(), stage.expand, outbox, stats)
+
+        collector = threading.Thread(
+            target=self._guard, args=(collect,),
+            name=f"{self.name}-{stage.name}-collect", daemon=True
+        )
+        with ThreadPoolExecutor(max_workers=stage.workers, thread_name_prefix=f"{self.name}-{stage.name}") as pool:
+            collector.start()
+            try:
+                for item in self._batches(stage, inbox, stats):
+                    self._put(futures, pool.submit(call, item), internal)
+                self._put(futures, _DONE, internal)
+            finally:
+                collector.join()
@@ -2,7 +2,8 @@
 Web page ingestor using Trafilatura for clean content extraction.
 """
 
-from typing import Dict, Any, List
+from functools import partial
+from typing import Dict, Any, Iterator, Tuple
 import logging
 from datetime import datetime
 from urllib.parse import urlparse
@@ -11,8 +12,9 @@ import requests
 import trafilatura
 from bs4 import BeautifulSoup
 
-from .base_ingestor import BaseIngestor
+from .base_ingestor import BaseIngestor, IngestionCancelled
 from ..config import CHUNK_SIZE, CHUNK_OVERLAP
+from ..core.services import service_slot
 
 logger = logging.getLogger(__name__)
 
@@ -52,44 +54,54 @@ class WebIngestor(BaseIngestor):
             source_path=source
         )
         
+        steps = self.open_processing_log(source_id)
         try:
             # Fetch content
+            self.report_progress("fetch", f"Fetching {source}")
             logger.info(f"Fetching {source}...")
-            html = self._fetch_url(source, **kwargs)
+            with steps.step("fetch") as step:
+                html = self._fetch_url(source, **kwargs)
+                step.message = f"Fetched {len(html)} characters"
             
             # Extract main content
+            self.report_progress("extraction", "Extracting content")
             logger.info("Extracting content...")
-            content, metadata = self._extract_content(html, source)
+            with steps.step("extraction") as step:
+                content, metadata = self._extract_content(html, source)
+                step.message = f"Extracted {len(content)} characters"
             
-            # Chunk content
-            chunks = self._create_chunks(content, source, metadata)
-            
-            # Store in ChromaDB
-            self._store_chunks(chunks, source, metadata)
+            # Chunks are embedded and stored while the rest of the page is chunked
+            with steps.step("pipeline") as step:
+                stats = self.sync_chunks(source, [content], partial(self._page_chunks, source, metadata))
+                step.details = stats
+                step.message = f"Stored {stats['chunks']} chunks ({self.describe_sync(stats)})"
             
             # Update registry
             registry_metadata = {
                 'title': metadata.get('title', ''),
                 'author': metadata.get('author', ''),
                 'date': metadata.get('date', ''),
-                'total_chunks': len(chunks),
+                'total_chunks': stats['chunks'],
                 'content_length': len(content)
             }
             self.registry.update_status(source, 'success', registry_metadata)
             
-            self.log_ingestion_complete(source, len(chunks))
+            self.log_ingestion_complete(source, stats['chunks'])
             
             return {
                 'status': 'success',
                 'source': source,
-                'chunks_added': len(chunks),
+                'chunks_added': stats['chunks'],
                 'metadata': registry_metadata
             }
             
         except Exception as e:
             self.log_ingestion_error(source, e)
-            self.registry.update_status(source, 'failed', {'error': str(e)})
+            status = 'cancelled' if isinstance(e, IngestionCancelled) else 'failed'
+            self.registry.update_status(source, status, {'error': str(e)})
             raise
+        finally:
+            steps.close()
     
     def _fetch_url(
         self,
@@ -106,7 +118,8 @@ class WebIngestor(BaseIngestor):
             default_headers.update(headers)
         
         try:
-            response = requests.get(url, headers=default_headers, timeout=timeout)
+            with service_slot("web"):
+                response = requests.get(url, headers=default_headers, timeout=timeout)
             response.raise_for_status()
             return response.text
         except requests.RequestException as e:
@@ -155,63 +168,21 @@ class WebIngestor(BaseIngestor):
         lines = [line.strip() for line in text.splitlines() if line.strip()]
         return '\n'.join(lines)
     
-    def _create_chunks(
-        self,
-        content: str,
-        source_url: str,
-        metadata: Dict[str, Any]
-    ) -> List[Dict[str, Any]]:
-        """Create chunks from extracted content."""
-        # Chunk the text
-        text_chunks = self.chunk_text(content, CHUNK_SIZE, CHUNK_OVERLAP)
-        
-        chunks = []
-        for chunk_idx, chunk_text in enumerate(text_chunks):
-            chunks.append({
-                'content': chunk_text,
-                'chunk_index': chunk_idx,
-                'url': source_url,
-                'title': metadata.get('title', ''),
-                'author': metadata.get('author', ''),
-                'date': metadata.get('date', '')
-            })
-        
-        return chunks
-    
-    def _store_chunks(
+    def _page_chunks(
         self,
-        chunks: List[Dict[str, Any]],
         source_url: str,
-        metadata: Dict[str, Any]
-    ):
-        """Store chunks in ChromaDB."""
-        if not chunks:
-            return
-        
-        documents = []
-        metadatas = []
-        ids = []
-        
-        for idx, chunk in enumerate(chunks):
-            # Generate unique ID
-            content_hash = self.hash_content(chunk['content'])
-            chunk_id = self.generate_chunk_id(source_url, idx, content_hash)
-            
-            # Prepare metadata
-            chunk_metadata = {
+        metadata: Dict[str, Any],
+        content: str
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """(document, metadata) chunks of the extracted page content."""
+        indexed_at = datetime.now().isoformat()
+        for chunk_idx, chunk_text in enumerate(self.iter_chunks(content, CHUNK_SIZE, CHUNK_OVERLAP)):
+            yield chunk_text, {
                 'source': source_url,
                 'source_type': 'web',
                 'content_type': 'web',
-                'chunk_index': chunk['chunk_index'],
-                'title': chunk.get('title', ''),
-                'author': chunk.get('author', ''),
-                'indexed_at': datetime.now().isoformat()
+                'chunk_index': chunk_idx,
+                'title': metadata.get('title', ''),
+                'author': metadata.get('author', ''),
+                'indexed_at': indexed_at
             }
-            
-            documents.append(chunk['content'])
-            metadatas.append(chunk_metadata)
-            ids.append(chunk_id)
-        
-        # Add to ChromaDB
-        self.chroma.add_documents(documents, metadatas, ids)
-
@@ -0,0 +1,181 @@
+"""
+Background jobs for long-running ingestion.
+
+A JobManager runs ingestion callables on a bounded worker pool and tracks
+their state, progress and result so that a server can return a job id
+immediately and answer status/cancel requests while the work continues.
+
+Cancellation is cooperative: a queued job is dropped before it starts,
+a running job has its `cancel_event` set and stops at the ingestor's next
+progress checkpoint.
+"""
+
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from .config import INGEST_WORKERS
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    """State of one background job."""
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    CANCELLING = 'cancelling'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+
+    FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+    def __init__(
+        self,
+        job_id: str,
+        kind: str,
+        description: str,
+        summarize: Optional[Callable[[Any], str]] = None
+    ):
+        self.id = job_id
+        self.kind = kind
+        self.description = description
+        self.summarize = summarize
+        self.state = self.QUEUED
+        self.stage: Optional[str] = None
+        self.message: Optional[str] = None
+        self.progress: Optional[float] = None
+        self.result: Any = None
+        self.summary: Optional[str] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.cancel_event = threading.Event()
+        self.future: Optional[Future] = None
+
+    def update(self, stage: str, message: str = "", fraction: Optional[float] = None):
+        """Progress callback for ingestors: current stage, message and stage-local fraction."""
+        self.stage = stage
+        self.message = message
+        self.progress = fraction
+
+    @property
+    def finished(self) -> bool:
+        return self.state in self.FINISHED_STATES
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds spent running (so far, if still running)."""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'description': self.description,
+            'state': self.state,
+            'stage': self.stage,
+            'message': self.message,
+            'progress': self.progress,
+            'elapsed_s': round(self.elapsed, 1),
+            'summary': self.summary,
+            'error': self.error
+        }
+
+
+class JobManager:
+    """Run jobs on a bounded thread pool and keep their state for status queries."""
+
+    def __init__(self, max_workers: int = INGEST_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="smartdoc-job")
+        self._jobs: Dict[str, Job] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        kind: str,
+        description: str,
+        fn: Callable[[Job], Any],
+        summarize: Optional[Callable[[Any], str]] = None
+    ) -> Job:
+        """
+        Queue `fn(job)` for execution.
+
+        Args:
+            kind: Job type (e.g. "index_pdf")
+            description: Human-readable target (path or URL)
+            fn: Work to run; receives the Job for progress and cancellation
+            summarize: Optional formatter turning the result into a summary line
+
+        Returns:
+            The queued Job
+        """
+        with self._lock:
+            job = Job(f"job-{next(self._ids)}", kind, description, summarize)
+            self._jobs[job.id] = job
+        job.future = self._executor.submit(self._run, job, fn)
+        return job
+
+    def _run(self, job: Job, fn: Callable[[Job], Any]):
+        if job.cancel_event.is_set():
+            job.state = Job.CANCELLED
+            return
+
+        job.state = Job.RUNNING
+        job.started_at = time.time()
+        try:
+            job.result = fn(job)
+            job.summary = job.summarize(job.result) if job.summarize else None
+            job.state = Job.SUCCEEDED
+        except Exception as e:
+            if job.cancel_event.is_set():
+                job.state = Job.CANCELLED
+            else:
+                logger.error(f"Job {job.id} ({job.kind} {job.description}) failed: {e}", exc_info=True)
+                job.error = str(e)
+                job.state = Job.FAILED
+        finally:
+            job.finished_at = time.time()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        """All jobs, newest first."""
+        return sorted(self._jobs.values(), key=lambda j: j.created_at, reverse=True)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Request cancellation.
+
+        Returns:
+            The job (state CANCELLED if it had not started yet, CANCELLING if
+            it is running), or None if no such job exists
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job.finished:
+            return job
+
+        job.cancel_event.set()
+        if job.future is not None and job.future.cancel():
+            job.state = Job.CANCELLED
+            job.finished_at = time.time()
+        elif job.state == Job.RUNNING:
+            job.state = Job.CANCELLING
+        return job
+
+    def shutdown(self, cancel_running: bool = True):
+        """Stop accepting work; optionally ask running jobs to stop early."""
+        if cancel_running:
+            for job in self._jobs.values():
+                if not job.finished:
+                    self.cancel(job.id)
+        self._executor.shutdown(wait=False)
@@ -9,7 +9,6 @@ from datetime import datetime
 
 from ..core.registry import Registry
 from ..core.chroma_client import ChromaManager
-from ..vision.gemini_analyzer import GeminiAnalyzer
 from ..config import CONFIDENCE_THRESHOLD, TOP_K_RESULTS, RERANK_TOP_N
 
 logger = logging.getLogger(__name__)
@@ -21,7 +20,15 @@ class QueryEngine:
     def __init__(self, registry: Registry, chroma_manager: ChromaManager):
         self.registry = registry
         self.chroma = chroma_manager
-        self.vision_analyzer = GeminiAnalyzer()
+        self._vision_analyzer = None
+    
+    @property
+    def vision_analyzer(self):
+        """Gemini analyzer, created on first use (imports google.generativeai)."""
+        if self._vision_analyzer is None:
+            from ..vision.gemini_analyzer import GeminiAnalyzer
+            self._vision_analyzer = GeminiAnalyzer()
+        return self._vision_analyzer
     
     def query(
         self,
@@ -40,7 +47,33 @@ class QueryEngine:
         Returns:
             Query results with confidence score and source citations
         """
-        logger.info(f"Query: {query_text}")
+        return self.query_many([query_text], source_filter, source_type_filter)[0]
+    
+    def query_many(
+        self,
+        query_texts: List[str],
+        source_filter: Optional[str] = None,
+        source_type_filter: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Query the knowledge base with several questions at once.
+        
+        All queries are embedded in one batch and searched in one HNSW call;
+        each gets the same response as `query` would return.
+        
+        Args:
+            query_texts: User queries
+            source_filter: Optional filter by source path/URL (applies to all)
+            source_type_filter: Optional filter by type ('pdf', 'github', 'web')
+        
+        Returns:
+            One query result per input, in order
+        """
+        if not query_texts:
+            return []
+        
+        for query_text in query_texts:
+            logger.info(f"Query: {query_text}")
         
         # Build where clause for filtering
         where_clause = {}
@@ -50,16 +83,35 @@ class QueryEngine:
             where_clause['source_type'] = source_type_filter
         
         # Query ChromaDB - increase results for reprocessing queries
-        n_results = TOP_K_RESULTS * 2 if any(term in query_text.lower() for term in ['pin', 'schematic', 'diagram', 'spi', 'i2c', 'uart']) else TOP_K_RESULTS
+        n_results = [self._n_results(query_text) for query_text in query_texts]
         
-        results = self.chroma.query(
-            query_text=query_text,
-            n_results=n_results,
+        results = self.chroma.query_many(
+            query_texts=query_texts,
+            n_results=max(n_results),
             where=where_clause if where_clause else None
         )
         
+        return [
+            self._build_response(query_text, results, idx, n_results[idx])
+            for idx, query_text in enumerate(query_texts)
+        ]
+    
+    def _n_results(self, query_text: str) -> int:
+        """Results to fetch for a query (more for pin/schematic questions)."""
+        if any(term in query_text.lower() for term in ['pin', 'schematic', 'diagram', 'spi', 'i2c', 'uart']):
+            return TOP_K_RESULTS * 2
+        return TOP_K_RESULTS
+    
+    def _build_response(
+        self,
+        query_text: str,
+        raw_results: Dict[str, Any],
+        query_index: int,
+        n_results: int
+    ) -> Dict[str, Any]:
+        """Turn one query's slice of a (batched) ChromaDB result into a response."""
         # Process results
-        processed_results = self._process_results(results, query_text)
+        processed_results = self._process_results(raw_results, query_text, query_index)[:n_results]
         
         # Calculate confidence
         confidence = self._calculate_confidence(processed_results)
@@ -92,7 +144,8 @@ class QueryEngine:
         
         return response
     
-    def format_results(self, results: Dict[str, Any]) -> str:
+    @staticmethod
+    def format_results(results: Dict[str, Any]) -> str:
         """
         Format query results for console display.
         
@@ -148,18 +201,25 @@ class QueryEngine:
         
         return "\n".join(output_parts)
     
-    def query_with_reprocess(self, query_text: str) -> Dict[str, Any]:
+    def query_with_reprocess(
+        self,
+        query_text: str,
+        initial_results: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
         """
         Query with automatic schematic reprocessing if needed.
         
         Args:
             query_text: User query
+            initial_results: Result of `query` for this text, if already run
+                (e.g. as part of `query_many`)
         
         Returns:
             Enhanced query results with vision analysis
         """
         # Initial query
-        initial_results = self.query(query_text)
+        if initial_results is None:
+            initial_results = self.query(query_text)
         
         # Check if reprocessing is needed
         if not initial_results['should_reprocess']:
@@ -193,20 +253,24 @@ class QueryEngine:
     def _process_results(
         self,
         raw_results: Dict[str, Any],
-        query_text: str
+        query_text: str,
+        query_index: int = 0
     ) -> List[Dict[str, Any]]:
-        """Process raw ChromaDB results into structured format."""
+        """Process raw ChromaDB results for one query into structured format."""
         processed = []
         
-        if not raw_results['ids'] or not raw_results['ids'][0]:
+        if not raw_results['ids'] or not raw_results['ids'][query_index]:
             return processed
         
-        for idx in range(len(raw_results['ids'][0])):
+        distances = raw_results.get('distances')
+        
+        for idx in range(len(raw_results['ids'][query_index])):
+            distance = distances[query_index][idx] if distances else 0
             result = {
-                'content': raw_results['documents'][0][idx],
-                'metadata': raw_results['metadatas'][0][idx],
-                'distance': raw_results['distances'][0][idx] if 'distances' in raw_results else 0,
-                'score': 1 - (raw_results['distances'][0][idx] if 'distances' in raw_results else 0)
+                'content': raw_results['documents'][query_index][idx],
+                'metadata': raw_results['metadatas'][query_index][idx],
+                'distance': distance,
+                'score': 1 - distance
             }
             
             # Add citation
@@ -10,11 +10,12 @@ from PIL import Image
 import io
 
 from ..config import (
-    GEMINI_API_KEY,
+    settings,
     GEMINI_MODEL,
     GEMINI_TEMPERATURE,
     VISION_MAX_RETRIES
 )
+from ..core.services import service_slot
 
 logger = logging.getLogger(__name__)
 
@@ -23,10 +24,10 @@ class GeminiAnalyzer:
     """Handles vision analysis using Gemini API."""
     
     def __init__(self):
-        if not GEMINI_API_KEY:
+        if not settings.gemini_api_key:
             raise ValueError("GEMINI_API_KEY not set in environment")
         
-        genai.configure(api_key=GEMINI_API_KEY)
+        genai.configure(api_key=settings.gemini_api_key)
         self.model = genai.GenerativeModel(GEMINI_MODEL)
         logger.info(f"GeminiAnalyzer initialized with model: {GEMINI_MODEL}")
     
@@ -293,12 +294,13 @@ Be precise and technical. Only state what you can clearly see in the diagram."""
         
         for attempt in range(VISION_MAX_RETRIES):
             try:
-                response = self.model.generate_content(
-                    [prompt, image],
-                    generation_config=genai.types.GenerationConfig(
-                        temperature=GEMINI_TEMPERATURE
+                with service_slot("gemini"):
+                    response = self.model.generate_content(
+                        [prompt, image],
+                        generation_config=genai.types.GenerationConfig(
+                            temperature=GEMINI_TEMPERATURE
+                        )
                     )
-                )
                 return response
             except Exception as e:
                 last_error = e
@@ -9,8 +9,9 @@ from typing import List, Dict, Any, Optional
 import logging
 import shutil
 
-import chromadb  # pyright: ignore[reportMissingImports]
-from chromadb.config import Settings  # pyright: ignore[reportMissingImports]
+from ..core.registry import Registry
+from ..core.chroma_client import ChromaManager, count_documents
+from ..core.removal import purge_source
 
 logger = logging.getLogger(__name__)
 
@@ -103,8 +104,11 @@ class DatabaseManager:
             cursor.execute("SELECT COUNT(*) as count FROM sources")
             info['sources_count'] = cursor.fetchone()['count']
             
-            # Get all sources
-            cursor.execute("SELECT * FROM sources ORDER BY indexed_at DESC")
+            # Get all sources (metadata blobs are not needed here)
+            cursor.execute("""
+                SELECT id, source_type, source_path, indexed_at, status, file_size
+                FROM sources ORDER BY indexed_at DESC, id DESC
+            """)
             sources = []
             for row in cursor.fetchall():
                 sources.append({
@@ -121,12 +125,7 @@ class DatabaseManager:
             
             # Get ChromaDB info
             try:
-                client = chromadb.PersistentClient(
-                    path=str(chroma_path),
-                    settings=Settings(anonymized_telemetry=False, allow_reset=False)
-                )
-                collection = client.get_collection(name="smartdoc_workspace")
-                info['documents_count'] = collection.count()
+                info['documents_count'] = count_documents(str(chroma_path))
             except Exception as e:
                 logger.warning(f"Could not read ChromaDB for {project_name}: {e}")
                 info['documents_count'] = 0
@@ -267,27 +266,13 @@ class DatabaseManager:
             if not db_info:
                 raise ValueError(f"Database not found: {workspace_path}")
             
-            registry_path = db_info['registry_path']
-            chroma_path = db_info['chroma_path']
-            
-            # Delete from registry
-            conn = sqlite3.connect(registry_path)
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM sources WHERE source_path = ?", (source_path,))
-            conn.commit()
-            conn.close()
-            
-            # Delete from ChromaDB
-            client = chromadb.PersistentClient(
-                path=chroma_path,
-                settings=Settings(anonymized_telemetry=False, allow_reset=False)
+            # Paged chunk delete, then registry row, schematic cache and logs
+            registry = Registry(db_info['registry_path'])
+            purge_source(
+                registry,
+                ChromaManager(registry=registry, persist_dir=db_info['chroma_path']),
+                source_path
             )
-            collection = client.get_collection(name="smartdoc_workspace")
-            
-            # Get all documents from this source
-            results = collection.get(where={"source": source_path})
-            if results['ids']:
-                collection.delete(ids=results['ids'])
             
             logger.info(f"Deleted source {source_path} from {workspace_path}")
             return True
@@ -333,12 +318,10 @@ class DatabaseManager:
                 raise ValueError(f"Source not found: {source_path}")
             
             # Get all documents from source ChromaDB
-            src_client = chromadb.PersistentClient(
-                path=src_db['chroma_path'],
-                settings=Settings(anonymized_telemetry=False, allow_reset=False)
+            results = ChromaManager(persist_dir=src_db['chroma_path']).get_by_source(
+                source_path,
+                include=["documents", "metadatas", "embeddings"]
             )
-            src_collection = src_client.get_collection(name="smartdoc_workspace")
-            results = src_collection.get(where={"source": source_path})
             
             if not results['ids']:
                 logger.warning(f"No documents found for source: {source_path}")
@@ -387,28 +370,28 @@ class DatabaseManager:
                     ))
                 dest_conn.commit()
             
-            # Add documents to destination ChromaDB
-            dest_client = chromadb.PersistentClient(
-                path=dest_db['chroma_path'],
-                settings=Settings(anonymized_telemetry=False, allow_reset=False)
-            )
-            dest_collection = dest_client.get_collection(name="smartdoc_workspace")
-            
-            # ChromaDB add requires documents, metadatas, ids
-            dest_collection.add(
-                documents=results['documents'],
-                metadatas=results['metadatas'],
-                ids=results['ids']
+            # Copy the stored vectors into the destination's shards (and
+            # chunk counters): re-embedding here would be wasted work
+            ChromaManager(
+                registry=Registry(dest_db['registry_path']),
+                persist_dir=dest_db['chroma_path']
+            ).add_embedded(
+                results['documents'],
+                results['embeddings'],
+                results['metadatas'],
+                results['ids']
             )
             
             logger.info(f"Transferred {len(results['ids'])} documents from {source_workspace} to {dest_workspace}")
             
             # If move, delete from source
             if move:
-                src_collection.delete(ids=results['ids'])
-                src_cursor.execute("DELETE FROM sources WHERE source_path = ?", (source_path,))
-                src_cursor.execute("DELETE FROM schematic_cache WHERE source_id = ?", (source_row['id'],))
-                src_conn.commit()
+                src_registry = Registry(src_db['registry_path'])
+                purge_source(
+                    src_registry,
+                    ChromaManager(registry=src_registry, persist_dir=src_db['chroma_path']),
+                    source_path
+                )
                 logger.info(f"Deleted source from {source_workspace}")
             
             src_conn.close()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Insertion throughput benchmark for ChromaManager.add_documents.
+
+Indexes synthetic chunks into a scratch workspace and reports chunks/second
+for each size and mode:
+
+    single   one collection.add() call with every chunk (the old behaviour)
+    batched  ADD_BATCH_SIZE batches, embedding pipelined with persistence
+    bulk     BULK_BATCH_SIZE batches (bulk-load mode)
+
+By default chunks are embedded with synthetic vectors so the numbers measure
+the write path; pass ``--embed-us`` to simulate model cost per chunk, or
+``--embedder model`` to use the real embedding model.
+
+Usage:
+    python tools/bench_chroma_add.py [--sizes 1000 10000 100000] [--modes single batched bulk]
+                                     [--embedder synthetic|model] [--embed-us 0]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+DIMENSIONS = 384  # bge-small / MiniLM output size
+
+
+class SyntheticEmbedding:
+    """Deterministic random vectors with an optional simulated per-chunk cost."""
+
+    def __init__(self, embed_us: float = 0.0):
+        self.embed_us = embed_us
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        import numpy as np
+
+        if self.embed_us:
+            # sleep() releases the GIL like ONNX inference does
+            time.sleep(len(input) * self.embed_us / 1e6)
+        rng = np.random.default_rng(len(input))
+        return rng.random((len(input), DIMENSIONS), dtype=np.float32).tolist()
+
+
+def make_chunks(count: int, prefix: str) -> Tuple[List[str], List[Dict], List[str]]:
+    """Code-like chunks of roughly CODE_CHUNK_SIZE characters."""
+    documents, metadatas, ids = [], [], []
+    for i in range(count):
+        documents.append(
+            f"// file_{i % 500}.cpp chunk {i}\n"
+            f"void handler_{i}(int pin) {{ digitalWrite(pin, HIGH); delay({i % 1000}); }}\n" * 6
+        )
+        metadatas.append({
+            'source': f"bench://{prefix}",
+            'source_type': 'github',
+            'file_path': f"src/file_{i % 500}.cpp",
+            'chunk_index': i
+        })
+        ids.append(f"{prefix}_chunk_{i}")
+    return documents, metadatas, ids
+
+
+def run_mode(mode: str, size: int, embedding_function) -> Dict:
+    """Insert `size` chunks with a fresh collection; return stats (or error)."""
+    from smartdoc.core.chroma_client import ChromaManager
+
+    chroma = ChromaManager(embedding_function=embedding_function)
+    chroma.reset_collection()
+    documents, metadatas, ids = make_chunks(size, f"{mode}_{size}")
+
+    start = time.perf_counter()
+    try:
+        if mode == 'single':
+            chroma.collection.add(
+                documents=documents,
+                embeddings=embedding_function(documents),
+                metadatas=metadatas,
+                ids=ids
+            )
+            seconds = time.perf_counter() - start
+            return {'seconds': seconds, 'chunks_per_second': size / seconds, 'batches': 1}
+        return chroma.add_documents(documents, metadatas, ids, bulk=(mode == 'bulk'))
+    except Exception as e:
+        return {'error': str(e).splitlines()[0][:60]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="Chunk counts")
+    parser.add_argument("--modes", nargs="+", default=["single", "batched", "bulk"],
+                        choices=["single", "batched", "bulk"], help="Insertion modes")
+    parser.add_argument("--embedder", choices=["synthetic", "model"], default="synthetic",
+                        help="Synthetic vectors (write path only) or the real embedding model")
+    parser.add_argument("--embed-us", type=float, default=0.0,
+                        help="Simulated embedding cost per chunk in microseconds (synthetic only)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="smartdoc_bench_add_") as scratch:
+        # The workspace is resolved from the working directory at import time
+        os.chdir(scratch)
+        import logging
+        logging.basicConfig(level=logging.WARNING)
+
+        if args.embedder == "model":
+            from smartdoc.core.chroma_client import ChromaManager
+            embedding_function = ChromaManager().embedding_function
+        else:
+            embedding_function = SyntheticEmbedding(args.embed_us)
+
+        print(f"\nInsertion benchmark ({args.embedder} embeddings"
+              f"{f', {args.embed_us:.0f}us/chunk' if args.embedder == 'synthetic' and args.embed_us else ''})")
+        print("=" * 70)
+        print(f"  {'chunks':>8}  {'mode':<8} {'batches':>8} {'seconds':>9} {'chunks/s':>10}")
+
+        for size in args.sizes:
+            for mode in args.modes:
+                stats = run_mode(mode, size, embedding_function)
+                if 'error' in stats:
+                    print(f"  {size:>8}  {mode:<8} {'-':>8} {'-':>9} {'-':>10}  ✗ {stats['error']}")
+                    continue
+                print(f"  {size:>8}  {mode:<8} {stats['batches']:>8} {stats['seconds']:>9.2f} "
+                      f"{stats['chunks_per_second']:>10.0f}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Throughput and memory benchmark for the text chunker.
+
+Chunks a synthetic datasheet-like corpus (prose, pin tables, code and
+some very long unbroken lines) with:
+
+    legacy       the former character-window chunk_text (materialized list)
+    approximate  ingestion.chunker with character-estimated token counts
+    tokenizer    ingestion.chunker with the embedding model's tokenizer
+                 (skipped if tokenizer.json cannot be fetched)
+
+Each mode runs in its own process so peak RSS is not inherited from the
+previous one. "Δ RSS" is peak RSS minus RSS after building the corpus,
+i.e. what the chunker itself holds.
+
+Usage:
+    python tools/bench_chunker.py [--mb 50] [--modes legacy approximate tokenizer]
+                                  [--chunk-size 256] [--overlap 48]
+"""
+
+import argparse
+import json
+import random
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+MODES = ["legacy", "approximate", "tokenizer"]
+
+SENTENCES = [
+    "The device operates from a single 3.3V supply and draws 12mA in active mode.",
+    "Pin 7 (MOSI) must be pulled low during reset, otherwise the bootloader starts.",
+    "See Table 4 for the absolute maximum ratings!",
+    "Is the internal oscillator accurate enough for UART at 115200 baud?",
+    "Decouple VDD with 100nF close to the package.",
+]
+TABLE_ROW = "| {pin:>3} | GPIO{pin:<3} | {func:<8} | 3.3V | 8mA |\n"
+CODE_LINES = [
+    "void setup() {\n",
+    "    pinMode(LED_BUILTIN, OUTPUT);\n",
+    "    Serial.begin(115200);\n",
+    "}\n",
+]
+
+
+def rss_mb() -> float:
+    """Peak RSS of this process so far (ru_maxrss is KB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def make_block(size: int, seed: int = 0) -> str:
+    """About `size` characters of mixed datasheet content."""
+    rng = random.Random(seed)
+    parts, length = [], 0
+    while length < size:
+        kind = rng.random()
+        if kind < 0.6:
+            part = " ".join(rng.choice(SENTENCES) for _ in range(rng.randint(3, 12))) + "\n\n"
+        elif kind < 0.8:
+            part = "".join(TABLE_ROW.format(pin=pin, func=rng.choice(["SPI_CLK", "I2C_SDA", "ADC0"]))
+                           for pin in range(rng.randint(4, 40)))
+        elif kind < 0.98:
+            part = "".join(CODE_LINES) * rng.randint(1, 6)
+        else:
+            # Extracted PDF text without a single break
+            part = "0x" + "".join(rng.choice("0123456789ABCDEF") for _ in range(rng.randint(2000, 20000))) + "\n"
+        parts.append(part)
+        length += len(part)
+    return "".join(parts)
+
+
+def make_corpus(megabytes: float) -> str:
+    """Repeats a 1MB block, so building the corpus peaks at little more than its size."""
+    target = int(megabytes * 1024 * 1024)
+    block = make_block(min(target, 1024 * 1024))
+    return block * max(1, round(target / len(block)))
+
+
+def legacy_chunk_text(text: str, chunk_size: int, overlap: int):
+    """The character-window chunker ingestion used before (sizes in characters)."""
+    if len(text) <= chunk_size:
+        return [text]
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = start + chunk_size
+        chunk = text[start:end]
+        if end < len(text):
+            last_period = chunk.rfind('.')
+            last_newline = chunk.rfind('\n')
+            break_point = max(last_period, last_newline)
+            if break_point > chunk_size * 0.7:
+                chunk = chunk[:break_point + 1]
+                end = start + break_point + 1
+        chunks.append(chunk.strip())
+        start = end - overlap
+    return chunks
+
+
+def run(mode: str, megabytes: float, chunk_size: int, overlap: int) -> dict:
+    from smartdoc.config import CHUNK_CHARS_PER_TOKEN
+    from smartdoc.ingestion.chunker import ApproximateCounter, TokenizerCounter, iter_chunks
+
+    counter = None
+    if mode == "tokenizer":
+        from smartdoc.core.embeddings import EmbeddingEngine
+        counter = TokenizerCounter(EmbeddingEngine().length_tokenizer())
+    elif mode == "approximate":
+        counter = ApproximateCounter()
+
+    text = make_corpus(megabytes)
+    baseline = rss_mb()
+
+    start = time.perf_counter()
+    if mode == "legacy":
+        # Same nominal size, expressed in characters as the old settings were
+        chars = int(chunk_size * CHUNK_CHARS_PER_TOKEN)
+        chunks = legacy_chunk_text(text, chars, int(overlap * CHUNK_CHARS_PER_TOKEN))
+        count, longest = len(chunks), max(len(chunk) for chunk in chunks)
+    else:
+        count, longest = 0, 0
+        for chunk in iter_chunks(text, chunk_size, overlap, counter):
+            count += 1
+            longest = max(longest, len(chunk))
+    seconds = time.perf_counter() - start
+
+    return {
+        'mode': mode,
+        'mb_per_second': len(text) / (1024 * 1024) / seconds,
+        'seconds': seconds,
+        'chunks': count,
+        'longest_chars': longest,
+        'peak_rss_mb': rss_mb(),
+        'delta_rss_mb': rss_mb() - baseline
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mb", type=float, default=50, help="Corpus size in MB")
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES, help="Chunkers to compare")
+    parser.add_argument("--chunk-size", type=int, default=256, help="Tokens per chunk")
+    parser.add_argument("--overlap", type=int, default=48, help="Overlap in tokens")
+    parser.add_argument("--only", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.only:
+        print(json.dumps(run(args.only, args.mb, args.chunk_size, args.overlap)))
+        return
+
+    print(f"\nChunker benchmark ({args.mb:.0f}MB corpus, {args.chunk_size} tokens, overlap {args.overlap})")
+    print("=" * 74)
+    print(f"  {'mode':<12} {'MB/s':>8} {'seconds':>8} {'chunks':>9} {'longest':>8} {'peak RSS':>9} {'Δ RSS':>8}")
+
+    for mode in args.modes:
+        proc = subprocess.run(
+            [sys.executable, __file__, "--only", mode, "--mb", str(args.mb),
+             "--chunk-size", str(args.chunk_size), "--overlap", str(args.overlap)],
+            capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            reason = (proc.stderr.strip().splitlines() or ["failed"])[-1]
+            print(f"  {mode:<12} ✗ {reason[:60]}")
+            continue
+        stats = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(f"  {mode:<12} {stats['mb_per_second']:>8.1f} {stats['seconds']:>8.2f} {stats['chunks']:>9} "
+              f"{stats['longest_chars']:>8} {stats['peak_rss_mb']:>8.0f}M {stats['delta_rss_mb']:>7.0f}M")
+    print("  (longest chunk in characters)\n")
+
+
+if __name__ == "__main__":
+    main()
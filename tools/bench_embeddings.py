@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Throughput and latency benchmark for the local embedding engine.
+
+For each intra-op thread count, embeds a corpus of chunk-sized texts and
+reports embeddings/second overall and per core, then measures the latency
+of embedding a single query (what every `smartdoc query` pays).
+
+Usage:
+    python tools/bench_embeddings.py [--threads 1 2 4 8] [--texts 512]
+                                     [--query-runs 50] [--quantize]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from smartdoc.config import EMBEDDING_MODEL, EMBEDDING_BATCH_SIZE  # noqa: E402
+from smartdoc.core.embeddings import EmbeddingEngine  # noqa: E402
+
+QUERY = "Which pins does the SPI interface use?"
+
+
+def make_corpus(count: int) -> List[str]:
+    """Datasheet-like passages of a few hundred tokens."""
+    sentence = (
+        "The peripheral exposes {n} configurable GPIO pins; pin {n} doubles as the SPI clock "
+        "when the alternate function register is set, and draws at most {m} mA. "
+    )
+    return [(sentence.format(n=i % 64, m=i % 40) * (2 + i % 6)).strip() for i in range(count)]
+
+
+def default_thread_counts() -> List[int]:
+    cores = os.cpu_count() or 1
+    counts, n = [], 1
+    while n < cores:
+        counts.append(n)
+        n *= 2
+    counts.append(cores)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, nargs="+", default=None,
+                        help="Intra-op thread counts (default: 1, 2, 4, ... up to all cores)")
+    parser.add_argument("--texts", type=int, default=512, help="Texts embedded per throughput run")
+    parser.add_argument("--batch-size", type=int, default=EMBEDDING_BATCH_SIZE, help="Texts per inference call")
+    parser.add_argument("--query-runs", type=int, default=50, help="Single-query latency samples")
+    parser.add_argument("--quantize", action="store_true", help="Benchmark the int8-quantized model")
+    parser.add_argument("--model", default=EMBEDDING_MODEL, help="Model id")
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.texts)
+    thread_counts = args.threads or default_thread_counts()
+
+    print(f"\nEmbedding benchmark: {args.model} ({'int8' if args.quantize else 'fp32'})")
+    print("=" * 70)
+    print(f"  {args.texts} texts, batch size {args.batch_size}\n")
+    print(f"  {'threads':>7} {'load s':>8} {'emb/s':>9} {'emb/s/core':>11} {'query p50':>10} {'query p95':>10}")
+
+    for threads in thread_counts:
+        engine = EmbeddingEngine(
+            args.model,
+            quantize=args.quantize,
+            threads=threads,
+            batch_size=args.batch_size
+        )
+
+        start = time.perf_counter()
+        engine.embed_query("warmup")
+        load_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        engine.embed(corpus)
+        rate = len(corpus) / (time.perf_counter() - start)
+
+        latencies = []
+        for _ in range(args.query_runs):
+            start = time.perf_counter()
+            engine.embed_query(QUERY)
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+        p50 = statistics.median(latencies)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+
+        print(f"  {threads:>7} {load_seconds:>8.2f} {rate:>9.1f} {rate / threads:>11.1f} "
+              f"{p50:>8.1f}ms {p95:>8.1f}ms")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Cold-start import benchmark for the SmartDoc CLI.
+
+Runs ``python -X importtime -c "import smartdoc.cli"`` in a scratch
+directory and reports the slowest modules. Exits non-zero if the
+cumulative import time exceeds the budget, or if importing touched the
+disk (created a ``.smartdoc_*`` workspace) or pulled in one of the heavy
+dependencies that only individual subcommands need.
+
+Usage:
+    python tools/bench_import_time.py [--budget-ms 250] [--runs 5] [--top 15]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Imported lazily by the subcommands that need them; never at CLI startup
+HEAVY_MODULES = [
+    "chromadb",
+    "llama_parse",
+    "google.generativeai",
+    "git",
+    "trafilatura",
+    "PyPDF2",
+    "pdf2image",
+]
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """
+    Parse ``-X importtime`` output.
+
+    Returns:
+        List of (module, self_us, cumulative_us) in import order
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us = int(parts[0].strip())
+            cumulative_us = int(parts[1].strip())
+        except ValueError:
+            continue
+        rows.append((parts[2].strip(), self_us, cumulative_us))
+    return rows
+
+
+def run_once(module: str, cwd: Path) -> Tuple[List[Tuple[str, int, int]], float]:
+    """Import `module` in a fresh interpreter; return (importtime rows, wall seconds)."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(REPO_ROOT), env.get("PYTHONPATH")]))
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd, env=env, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - start
+
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr)
+        raise SystemExit(f"✗ Importing {module} failed")
+
+    return parse_importtime(proc.stderr), wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="smartdoc.cli", help="Module to import (default: smartdoc.cli)")
+    parser.add_argument("--budget-ms", type=float, default=250.0, help="Max cumulative import time in ms")
+    parser.add_argument("--runs", type=int, default=5, help="Number of cold runs (best run is reported)")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest modules to show")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="smartdoc_importtime_") as scratch:
+        scratch_path = Path(scratch)
+
+        # First run warms the bytecode cache so we measure imports, not compilation
+        run_once(args.module, scratch_path)
+
+        best_rows, best_total_us, walls = None, None, []
+        for _ in range(max(1, args.runs)):
+            rows, wall = run_once(args.module, scratch_path)
+            walls.append(wall)
+            totals: Dict[str, int] = {name: cumulative for name, _, cumulative in rows}
+            total_us = totals.get(args.module, 0)
+            if best_total_us is None or total_us < best_total_us:
+                best_rows, best_total_us = rows, total_us
+
+        side_effects = sorted(p.name for p in scratch_path.iterdir())
+
+    imported = {name for name, _, _ in best_rows}
+    heavy_imported = [module for module in HEAVY_MODULES if module in imported]
+
+    print(f"\nImport benchmark: {args.module}")
+    print("=" * 70)
+    print(f"  Cumulative import time (best of {len(walls)}): {best_total_us / 1000:.1f} ms")
+    print(f"  Interpreter wall time (best):            {min(walls) * 1000:.1f} ms")
+    print(f"  Budget:                                  {args.budget_ms:.1f} ms")
+
+    print(f"\nTop {args.top} modules by self time:")
+    for name, self_us, cumulative_us in sorted(best_rows, key=lambda r: r[1], reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:8.2f} ms self  {cumulative_us / 1000:8.2f} ms cum  {name}")
+
+    failures = []
+    if best_total_us / 1000 > args.budget_ms:
+        failures.append(f"import took {best_total_us / 1000:.1f} ms (budget {args.budget_ms:.1f} ms)")
+    if side_effects:
+        failures.append(f"import created files in the working directory: {', '.join(side_effects)}")
+    if heavy_imported:
+        failures.append(f"heavy modules imported at startup: {', '.join(heavy_imported)}")
+
+    print()
+    if failures:
+        for failure in failures:
+            print(f"✗ {failure}")
+        sys.exit(1)
+    print("✓ Cold start within budget, side-effect free and free of heavy imports")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Recall/latency benchmark for the HNSW index profiles.
+
+Loads the stored vectors of a real workspace, builds an in-memory
+collection per profile from them, and for a sample of query vectors
+reports recall@k against brute-force cosine search plus p50/p99 query
+latency and build time. Nothing in the workspace is modified.
+
+Query vectors are stored chunk vectors with a little Gaussian noise, so
+they behave like questions close to, but not identical with, a chunk.
+
+Usage:
+    python tools/bench_index_profiles.py [--workspace PROJECT_DIR] [--profiles fast balanced accurate]
+                                         [--queries 200] [--k 5] [--limit 100000]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+
+def load_vectors(chroma, limit: int, page_size: int = 5000):
+    """(ids, embeddings) of up to `limit` stored chunks, across shards."""
+    import numpy as np
+
+    ids, vectors = [], []
+    for collection in chroma.collections():
+        offset = 0
+        while len(ids) < limit:
+            page = collection.get(
+                include=["embeddings"],
+                limit=min(page_size, limit - len(ids)),
+                offset=offset
+            )
+            if not page['ids']:
+                break
+            ids.extend(page['ids'])
+            vectors.extend(page['embeddings'])
+            offset += len(page['ids'])
+    return ids, np.asarray(vectors, dtype=np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workspace", default=".", help="Project directory holding the .smartdoc_* workspace")
+    parser.add_argument("--profiles", nargs="+", default=None, help="Profiles to compare (default: all)")
+    parser.add_argument("--queries", type=int, default=200, help="Number of sampled queries")
+    parser.add_argument("--k", type=int, default=5, help="Results per query (recall@k)")
+    parser.add_argument("--limit", type=int, default=100000, help="Max chunks loaded from the workspace")
+    parser.add_argument("--noise", type=float, default=0.05, help="Std-dev of the noise added to query vectors")
+    args = parser.parse_args()
+
+    # The workspace is resolved from the working directory at import time
+    os.chdir(Path(args.workspace).expanduser().resolve())
+
+    import numpy as np
+    import chromadb
+    from smartdoc.config import INDEX_PROFILES
+    from smartdoc.core.chroma_client import ChromaManager
+
+    profiles = args.profiles or list(INDEX_PROFILES)
+    for profile in profiles:
+        if profile not in INDEX_PROFILES:
+            raise SystemExit(f"✗ Unknown profile: {profile}")
+
+    ids, vectors = load_vectors(ChromaManager(), args.limit)
+    if len(ids) < args.k:
+        raise SystemExit(f"✗ Workspace has {len(ids)} chunks; index something first")
+
+    rng = np.random.default_rng(0)
+    sample = rng.choice(len(ids), size=min(args.queries, len(ids)), replace=False)
+    queries = vectors[sample] + rng.normal(0, args.noise, (len(sample), vectors.shape[1])).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    # Brute-force cosine ground truth
+    normalized = vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+    truth = np.argsort(-(queries @ normalized.T), axis=1)[:, :args.k]
+    truth_ids = [{ids[i] for i in row} for row in truth]
+
+    print(f"\nIndex profile benchmark: {len(ids)} chunks x {vectors.shape[1]} dims, "
+          f"{len(queries)} queries, k={args.k}")
+    print("=" * 70)
+    print(f"  {'profile':<10} {'build s':>8} {'recall@k':>9} {'p50 ms':>8} {'p99 ms':>8}")
+
+    client = chromadb.EphemeralClient()
+    for profile in profiles:
+        name = f"bench_{profile}"
+        collection = client.create_collection(
+            name=name,
+            metadata=ChromaManager._collection_metadata(profile, embedding_model=None)
+        )
+
+        start = time.perf_counter()
+        for offset in range(0, len(ids), 5000):
+            collection.add(
+                ids=ids[offset:offset + 5000],
+                embeddings=vectors[offset:offset + 5000].tolist()
+            )
+        build_seconds = time.perf_counter() - start
+
+        latencies, recalls = [], []
+        for query, expected in zip(queries, truth_ids):
+            start = time.perf_counter()
+            result = collection.query(query_embeddings=[query.tolist()], n_results=args.k, include=[])
+            latencies.append((time.perf_counter() - start) * 1000)
+            recalls.append(len(expected & set(result['ids'][0])) / args.k)
+
+        latencies.sort()
+        p50 = statistics.median(latencies)
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"  {profile:<10} {build_seconds:>8.2f} {statistics.mean(recalls):>9.3f} {p50:>8.2f} {p99:>8.2f}")
+
+        client.delete_collection(name)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Registry operations/second: per-call connections vs persistent connections.
+
+Runs the registry's hot-path calls against a scratch database twice:
+
+    per-call    a fresh sqlite3 connection per call, default journal
+                (how Registry worked before connections were kept open)
+    persistent  the thread's long-lived WAL connection
+    grouped     persistent, with the writes batched in transaction()
+
+Usage:
+    python tools/bench_registry.py [--ops 2000]
+"""
+
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from smartdoc.core.registry import Registry
+
+
+class PerCallRegistry(Registry):
+    """Registry opening and closing a connection for every call."""
+
+    @contextmanager
+    def _get_connection(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    @contextmanager
+    def transaction(self):
+        yield self
+
+
+OPERATIONS = {
+    'get_source': lambda registry, i: registry.get_source(f"doc_{i % 100}.pdf"),
+    'log_processing_step': lambda registry, i: registry.log_processing_step(1, f"step_{i % 10}", "success", "ok"),
+    'get_schematic_cache': lambda registry, i: registry.get_schematic_cache(f"hash_{i % 100}", "pinout?"),
+    'adjust_chunk_counts': lambda registry, i: registry.adjust_chunk_counts({(f"doc_{i % 100}.pdf", "pdf"): 1}),
+}
+
+
+def seed(registry: Registry):
+    for i in range(100):
+        source_id = registry.add_source("pdf", f"doc_{i}.pdf", file_size=1024)
+        registry.cache_vision_result(source_id, f"hash_{i}", "pinout?", "VCC on pin 1")
+
+
+def ops_per_second(registry: Registry, operation, ops: int, grouped: bool = False) -> float:
+    start = time.perf_counter()
+    if grouped:
+        with registry.transaction():
+            for i in range(ops):
+                operation(registry, i)
+    else:
+        for i in range(ops):
+            operation(registry, i)
+    return ops / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ops", type=int, default=2000, help="Calls per operation and mode")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="smartdoc_bench_registry_") as scratch:
+        per_call = PerCallRegistry(str(Path(scratch) / "per_call.db"))
+        # The per-call baseline keeps SQLite's default rollback journal
+        with per_call._get_connection() as conn:
+            conn.execute("PRAGMA journal_mode=DELETE")
+        persistent = Registry(str(Path(scratch) / "persistent.db"))
+        seed(per_call)
+        seed(persistent)
+
+        print(f"\nRegistry benchmark ({args.ops} calls per operation)")
+        print("=" * 70)
+        print(f"  {'operation':<22} {'per-call/s':>11} {'persistent/s':>13} {'grouped/s':>10} {'speedup':>8}")
+
+        for name, operation in OPERATIONS.items():
+            before = ops_per_second(per_call, operation, args.ops)
+            after = ops_per_second(persistent, operation, args.ops)
+            grouped = ops_per_second(persistent, operation, args.ops, grouped=True)
+            print(f"  {name:<22} {before:>11.0f} {after:>13.0f} {grouped:>10.0f} {after / before:>7.1f}x")
+
+        persistent.close()
+        print()
+
+
+if __name__ == "__main__":
+    main()
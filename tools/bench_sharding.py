@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for ChromaManager sharding.
+
+Indexes synthetic chunks of several source types into a scratch workspace
+once per sharding mode and reports, for each size:
+
+    insert   chunks/second through add_documents (bulk mode)
+    all      p50/p95 latency of unfiltered queries (fan-out + top-k merge)
+    typed    p50/p95 latency of queries filtered on one source type
+             (routed to that type's shards)
+
+Vectors are synthetic, so the numbers measure storage and search only.
+The 1M run needs several GB of RAM and disk; drop it with ``--sizes``.
+
+Usage:
+    python tools/bench_sharding.py [--sizes 10000 100000 1000000] [--modes none source_type size]
+                                   [--shard-max 0] [--queries 100] [--k 5]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+DIMENSIONS = 384  # bge-small / MiniLM output size
+SOURCE_TYPES = ["pdf", "github", "web"]
+
+
+class SyntheticEmbedding:
+    """Unit-length random vectors, seeded by the batch so runs are repeatable."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        import numpy as np
+
+        self.calls += 1
+        rng = np.random.default_rng(self.calls)
+        vectors = rng.standard_normal((len(input), DIMENSIONS)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors.tolist()
+
+
+def make_chunks(start: int, count: int) -> Tuple[List[str], List[Dict], List[str]]:
+    """Short chunks spread evenly over SOURCE_TYPES."""
+    documents, metadatas, ids = [], [], []
+    for i in range(start, start + count):
+        source_type = SOURCE_TYPES[i % len(SOURCE_TYPES)]
+        documents.append(f"{source_type} chunk {i}")
+        metadatas.append({'source': f"bench://{source_type}/{i % 100}", 'source_type': source_type})
+        ids.append(f"chunk_{i}")
+    return documents, metadatas, ids
+
+
+def percentiles(latencies: List[float]) -> Tuple[float, float]:
+    latencies = sorted(latencies)
+    return statistics.median(latencies), latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+
+
+def run_mode(mode: str, size: int, shard_max: int, queries: int, k: int, scratch: Path) -> Dict:
+    """Index `size` chunks with one sharding mode and time inserts and queries."""
+    from smartdoc.core.chroma_client import ChromaManager
+
+    chroma = ChromaManager(
+        embedding_function=SyntheticEmbedding(),
+        persist_dir=str(scratch / f"chroma_{mode}_{size}"),
+        sharding=mode,
+        shard_max_chunks=shard_max
+    )
+
+    # Generate in slices so 1M chunks of text never sit in memory at once
+    start = time.perf_counter()
+    for offset in range(0, size, 100000):
+        documents, metadatas, ids = make_chunks(offset, min(100000, size - offset))
+        chroma.add_documents(documents, metadatas, ids, bulk=True)
+    insert_seconds = time.perf_counter() - start
+
+    texts = [f"query {i}" for i in range(queries)]
+    unfiltered, typed = [], []
+    for i, text in enumerate(texts):
+        start = time.perf_counter()
+        chroma.query(text, n_results=k)
+        unfiltered.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        chroma.query(text, n_results=k, where={'source_type': SOURCE_TYPES[i % len(SOURCE_TYPES)]})
+        typed.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'collections': len(chroma.collections()),
+        'chunks_per_second': size / insert_seconds,
+        'all': percentiles(unfiltered),
+        'typed': percentiles(typed)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000], help="Chunk counts")
+    parser.add_argument("--modes", nargs="+", default=["none", "source_type", "size"],
+                        choices=["none", "source_type", "size"], help="Sharding modes")
+    parser.add_argument("--shard-max", type=int, default=0,
+                        help="Chunks per shard before roll-over (default: a quarter of each size)")
+    parser.add_argument("--queries", type=int, default=100, help="Queries per measurement")
+    parser.add_argument("--k", type=int, default=5, help="Results per query")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="smartdoc_bench_shard_") as scratch:
+        # The workspace is resolved from the working directory at import time
+        os.chdir(scratch)
+        import logging
+        logging.basicConfig(level=logging.WARNING)
+
+        print(f"\nSharding benchmark ({DIMENSIONS} dims, {len(SOURCE_TYPES)} source types, "
+              f"{args.queries} queries, k={args.k})")
+        print("=" * 78)
+        print(f"  {'chunks':>8}  {'mode':<12} {'colls':>5} {'chunks/s':>9} "
+              f"{'all p50':>8} {'all p95':>8} {'typed p50':>10} {'typed p95':>10}")
+
+        for size in args.sizes:
+            shard_max = args.shard_max or max(1, size // 4)
+            for mode in args.modes:
+                try:
+                    stats = run_mode(mode, size, shard_max, args.queries, args.k, Path(scratch))
+                except Exception as e:
+                    print(f"  {size:>8}  {mode:<12} ✗ {str(e).splitlines()[0][:50]}")
+                    continue
+                print(f"  {size:>8}  {mode:<12} {stats['collections']:>5} {stats['chunks_per_second']:>9.0f} "
+                      f"{stats['all'][0]:>8.2f} {stats['all'][1]:>8.2f} "
+                      f"{stats['typed'][0]:>10.2f} {stats['typed'][1]:>10.2f}")
+        print("  (latencies in ms)\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,59 +1,83 @@
 #!/usr/bin/env python3
 """
 SmartDoc2 MCP Server for Cursor/Claude integration.
+
+Requests are handled concurrently on an asyncio loop: queries run on a
+thread pool and ingestion tools return a job id immediately, so a long
+indexing run never blocks queries. Use smartdoc_job_status and
+smartdoc_job_cancel to follow or stop a job.
 """
 
+import asyncio
 import json
 import sys
-from typing import Any, Dict
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-from smartdoc.core.registry import Registry
-from smartdoc.core.chroma_client import ChromaManager
-from smartdoc.ingestion.pdf_ingestor import PDFIngestor
-from smartdoc.ingestion.github_ingestor import GitHubIngestor
-from smartdoc.ingestion.web_ingestor import WebIngestor
-from smartdoc.query.query_engine import QueryEngine
+from smartdoc.config import QUERY_WORKERS
+from smartdoc.context import ResourceContext
+from smartdoc.jobs import JobManager
 
+# stdout carries the JSON-RPC stream only; anything else printed by the
+# library (welcome banner, rich progress) is redirected to stderr in main()
+PROTOCOL_OUT = sys.stdout
 
-def read_request():
-    """Read JSON-RPC request from stdin."""
-    try:
-        line = sys.stdin.readline()
-        if not line:
-            return None
-        return json.loads(line)
-    except json.JSONDecodeError as e:
-        logger.error(f"Failed to parse JSON: {e}")
-        return None
+
+class ServerState:
+    """Resources and timings held for the lifetime of the server process."""
+    
+    def __init__(self):
+        self.context = ResourceContext(interactive=False)
+        self.started_at = time.perf_counter()
+        self.time_to_first_query: Optional[float] = None
+        self._warm_thread: Optional[threading.Thread] = None
+    
+    def start_warmup(self):
+        """Open Registry, ChromaDB and the embedding model in the background."""
+        if self._warm_thread is None:
+            self._warm_thread = threading.Thread(target=self._warm, name="smartdoc-warmup", daemon=True)
+            self._warm_thread.start()
+    
+    def _warm(self):
+        try:
+            self.context.warm()
+            logger.info(f"Resources warmed in {self.context.warmup_seconds:.2f}s")
+        except Exception as e:
+            # Leave the context empty; the first tool call will retry
+            logger.warning(f"Warmup failed: {e}")
+            self.context.reset()
+    
+    def record_query(self):
+        """Remember how long the first query took to be answered after startup."""
+        if self.time_to_first_query is None:
+            self.time_to_first_query = time.perf_counter() - self.started_at
+            logger.info(f"Time to first query: {self.time_to_first_query:.2f}s")
+
+
+STATE = ServerState()
+JOBS = JobManager()
 
 
 def write_response(response: Dict[str, Any]):
-    """Write JSON-RPC response to stdout."""
-    sys.stdout.write(json.dumps(response) + "\n")
-    sys.stdout.flush()
+    """Write JSON-RPC response to stdout (call from the event loop thread only)."""
+    PROTOCOL_OUT.write(json.dumps(response) + "\n")
+    PROTOCOL_OUT.flush()
 
 
-def handle_index_pdf(arguments: Dict[str, Any]) -> str:
-    """Handle PDF indexing."""
-    pdf_path = arguments.get("pdf_path")
-    analyze_schematics = arguments.get("analyze_schematics", True)
-    initial_query = arguments.get("initial_query")
-    
-    registry = Registry()
-    chroma = ChromaManager()
-    ingestor = PDFIngestor(registry, chroma)
-    
-    result = ingestor.ingest(
-        pdf_path,
-        analyze_schematics=analyze_schematics,
-        initial_query=initial_query
-    )
-    
+def format_job_started(job) -> str:
+    """Reply for an ingestion tool: the job id to poll."""
+    return f"""⏳ Started job {job.id}: {job.kind} {job.description}
+Use smartdoc_job_status with job_id "{job.id}" to follow progress, or smartdoc_job_cancel to stop it."""
+
+
+def summarize_pdf(pdf_path: str, result: Dict[str, Any]) -> str:
     return f"""✅ Successfully indexed PDF: {pdf_path}
 - Total chunks: {result['chunks_added']}
 - Text chunks: {result['metadata']['text_chunks']}
@@ -61,21 +85,7 @@ def handle_index_pdf(arguments: Dict[str, Any]) -> str:
 - Pages: {result['metadata']['pages']}"""
 
 
-def handle_fetch_repo(arguments: Dict[str, Any]) -> str:
-    """Handle GitHub repository indexing."""
-    repo_url = arguments.get("repo_url")
-    branch = arguments.get("branch")
-    
-    registry = Registry()
-    chroma = ChromaManager()
-    ingestor = GitHubIngestor(registry, chroma)
-    
-    kwargs = {}
-    if branch:
-        kwargs['branch'] = branch
-    
-    result = ingestor.ingest(repo_url, **kwargs)
-    
+def summarize_repo(repo_url: str, result: Dict[str, Any]) -> str:
     return f"""✅ Successfully indexed repository: {repo_url}
 - Files processed: {result['files_processed']}
 - Total chunks: {result['chunks_added']}
@@ -83,19 +93,145 @@ def handle_fetch_repo(arguments: Dict[str, Any]) -> str:
 - Branch: {result['metadata']['branch']}"""
 
 
+def summarize_web(url: str, result: Dict[str, Any]) -> str:
+    return f"""✅ Successfully indexed web page: {url}
+- Title: {result['metadata'].get('title', 'N/A')}
+- Total chunks: {result['chunks_added']}"""
+
+
+def handle_index_pdf(arguments: Dict[str, Any]) -> str:
+    """Handle PDF indexing (runs as a background job)."""
+    pdf_path = arguments.get("pdf_path")
+    analyze_schematics = arguments.get("analyze_schematics", True)
+    initial_query = arguments.get("initial_query")
+    resume = arguments.get("resume", False)
+    
+    job = JOBS.submit(
+        'index_pdf', pdf_path,
+        lambda job: STATE.context.index_pdf(
+            pdf_path,
+            analyze_schematics=analyze_schematics,
+            initial_query=initial_query,
+            resume=resume,
+            job=job
+        ),
+        summarize=lambda result: summarize_pdf(pdf_path, result)
+    )
+    return format_job_started(job)
+
+
+def handle_fetch_repo(arguments: Dict[str, Any]) -> str:
+    """Handle GitHub repository indexing (runs as a background job)."""
+    repo_url = arguments.get("repo_url")
+    branch = arguments.get("branch")
+    resume = arguments.get("resume", False)
+    
+    job = JOBS.submit(
+        'fetch_repo', repo_url,
+        lambda job: STATE.context.fetch_repo(repo_url, branch=branch, resume=resume, job=job),
+        summarize=lambda result: summarize_repo(repo_url, result)
+    )
+    return format_job_started(job)
+
+
 def handle_index_web(arguments: Dict[str, Any]) -> str:
-    """Handle web page indexing."""
+    """Handle web page indexing (runs as a background job)."""
     url = arguments.get("url")
     
-    registry = Registry()
-    chroma = ChromaManager()
-    ingestor = WebIngestor(registry, chroma)
+    job = JOBS.submit(
+        'index_web', url,
+        lambda job: STATE.context.index_web(url, job=job),
+        summarize=lambda result: summarize_web(url, result)
+    )
+    return format_job_started(job)
+
+
+def summarize_batch(summary: Dict[str, Any]) -> str:
+    output = [
+        f"✅ Batch finished: {summary['success']}/{summary['total']} indexed, {summary['chunks']} chunks "
+        f"in {summary['seconds']:.1f}s ({summary['skipped']} skipped, {summary['failed']} failed, "
+        f"{summary['cancelled']} cancelled)"
+    ]
+    for record in summary['sources']:
+        line = f"- [{record['status']}] {record['type']} {record['source']}: {record['chunks']} chunks, {record['seconds']:.1f}s"
+        if record['error']:
+            line += f" ({record['error']})"
+        output.append(line)
+    return '\n'.join(output)
+
+
+def handle_ingest_batch(arguments: Dict[str, Any]) -> str:
+    """Handle bulk ingestion from a manifest (runs as one background job)."""
+    manifest_path = arguments.get("manifest_path")
+    sources = arguments.get("sources")
+    workers = arguments.get("workers")
+    resume = arguments.get("resume", False)
+    if not manifest_path and not sources:
+        return "Give manifest_path or sources."
+    
+    job = JOBS.submit(
+        'ingest_batch', manifest_path or f"{len(sources)} sources",
+        lambda job: STATE.context.ingest_batch(
+            manifest_path=manifest_path,
+            sources=sources,
+            workers=workers,
+            resume=resume,
+            job=job
+        ),
+        summarize=summarize_batch
+    )
+    return format_job_started(job)
+
+
+def format_job(job) -> str:
+    """One job's state, progress and outcome."""
+    output = [f"{job.id}: {job.kind} {job.description}"]
+    output.append(f"   State: {job.state} ({job.elapsed:.1f}s)")
+    if job.stage and not job.finished:
+        stage = f"   Stage: {job.stage}"
+        if job.progress is not None:
+            stage += f" ({job.progress:.0%})"
+        if job.message:
+            stage += f" - {job.message}"
+        output.append(stage)
+    if job.summary:
+        output.append(job.summary)
+    if job.error:
+        output.append(f"   Error: {job.error}")
+    return '\n'.join(output)
+
+
+def handle_job_status(arguments: Dict[str, Any]) -> str:
+    """Handle job status (one job, or all jobs when no id is given)."""
+    job_id = arguments.get("job_id")
     
-    result = ingestor.ingest(url)
+    if job_id:
+        job = JOBS.get(job_id)
+        if job is None:
+            return f"Unknown job: {job_id}"
+        return format_job(job)
     
-    return f"""✅ Successfully indexed web page: {url}
-- Title: {result['metadata'].get('title', 'N/A')}
-- Total chunks: {result['chunks_added']}"""
+    jobs = JOBS.list()
+    if not jobs:
+        return "No jobs."
+    
+    output = [f"Jobs ({len(jobs)} total):\n"]
+    for job in jobs:
+        output.append(format_job(job))
+        output.append("")
+    return '\n'.join(output)
+
+
+def handle_job_cancel(arguments: Dict[str, Any]) -> str:
+    """Handle job cancellation."""
+    job_id = arguments.get("job_id")
+    
+    job = JOBS.cancel(job_id)
+    if job is None:
+        return f"Unknown job: {job_id}"
+    if job.state == job.CANCELLING:
+        return f"🛑 Cancelling {job.id}; it will stop at its next checkpoint."
+    return f"{job.id} is {job.state}."
 
 
 def handle_query(arguments: Dict[str, Any]) -> str:
@@ -105,20 +241,46 @@ def handle_query(arguments: Dict[str, Any]) -> str:
     source_filter = arguments.get("source_filter")
     source_type = arguments.get("source_type")
     
-    registry = Registry()
-    chroma = ChromaManager()
-    engine = QueryEngine(registry, chroma)
+    results = STATE.context.run(
+        'query',
+        query_text=query_text,
+        source_filter=source_filter,
+        source_type_filter=source_type,
+        reprocess=reprocess
+    )
+    STATE.record_query()
     
-    if reprocess:
-        results = engine.query_with_reprocess(query_text)
-    else:
-        results = engine.query(
-            query_text,
-            source_filter=source_filter,
-            source_type_filter=source_type
-        )
+    return format_query_results(query_text, results)
+
+
+def handle_query_batch(arguments: Dict[str, Any]) -> str:
+    """Handle several documentation queries in one batched search."""
+    queries = [q for q in arguments.get("queries", []) if q and q.strip()]
+    reprocess = arguments.get("reprocess", False)
+    source_filter = arguments.get("source_filter")
+    source_type = arguments.get("source_type")
+    
+    if not queries:
+        return "No queries given."
     
-    # Format results
+    all_results = STATE.context.run(
+        'query_many',
+        query_texts=queries,
+        source_filter=source_filter,
+        source_type_filter=source_type,
+        reprocess=reprocess
+    )
+    STATE.record_query()
+    
+    sections = [
+        f"[{idx}/{len(all_results)}] " + format_query_results(results['query'], results)
+        for idx, results in enumerate(all_results, 1)
+    ]
+    return ('\n\n' + '=' * 80 + '\n\n').join(sections)
+
+
+def format_query_results(query_text: str, results: Dict[str, Any]) -> str:
+    """Format one query's results for the client."""
     output = []
     output.append(f"Query: {query_text}")
     output.append(f"Confidence: {results['confidence']:.2f}")
@@ -148,17 +310,18 @@ def handle_list_sources(arguments: Dict[str, Any]) -> str:
     """Handle listing sources."""
     source_type = arguments.get("source_type", "all")
     
-    registry = Registry()
-    
-    if source_type == "all":
-        sources = registry.list_sources()
-    else:
-        sources = registry.list_sources(source_type)
+    page = STATE.context.run(
+        'list_sources_page',
+        source_type=None if source_type == "all" else source_type,
+        limit=min(max(int(arguments.get("limit", 50)), 1), 500),
+        cursor=arguments.get("cursor")
+    )
+    sources = page['sources']
     
     if not sources:
         return "No sources found."
     
-    output = [f"Indexed Sources ({len(sources)} total):\n"]
+    output = [f"Indexed Sources ({len(sources)} shown, {page['total']} total):\n"]
     
     for source in sources:
         output.append(f"📄 {source['source_type'].upper()}: {source['source_path']}")
@@ -168,32 +331,57 @@ def handle_list_sources(arguments: Dict[str, Any]) -> str:
             output.append(f"   Size: {source['file_size'] / 1024 / 1024:.1f}MB")
         output.append("")
     
+    if page['next_cursor']:
+        output.append(f"More sources available: call again with cursor=\"{page['next_cursor']}\"")
+    
     return '\n'.join(output)
 
 
 def handle_stats(arguments: Dict[str, Any]) -> str:
     """Handle database statistics."""
-    registry = Registry()
-    chroma = ChromaManager()
-    
-    reg_stats = registry.get_stats()
-    chroma_stats = chroma.get_stats()
+    # ResourceContext.stats is retried on a dropped client and degrades
+    # field by field, unlike ChromaManager.get_stats which swallows errors
+    stats = STATE.context.run('stats')
+    schematics = STATE.context.run('schematic_cache_stats')
     
     output = ["SmartDoc2 Database Statistics\n"]
     
-    output.append(f"Total Sources: {reg_stats['total_sources']}")
-    output.append(f"Cached Schematics: {reg_stats['cached_schematics']}")
-    output.append(f"Total Documents: {chroma_stats['total_documents']}")
+    output.append(f"Total Sources: {stats['total_sources']}")
+    output.append(f"Cached Schematics: {schematics['entries']}")
+    output.append(f"Total Documents: {stats['total_documents']}")
+    if stats.get('index'):
+        output.append(f"Index Profile: {stats['index']['profile']}")
+    storage = stats.get('storage')
+    if storage and storage['mode'] == 'compact':
+        output.append(f"Vector Storage: compact ({storage['full_dims']} → {storage['index_dims']} dims, {storage['disk_mb']:.1f}MB)")
+    if len(stats.get('shards') or []) > 1:
+        output.append(f"Collections: {len(stats['shards'])} (sharding by {STATE.context.chroma.sharding})")
     
-    if reg_stats['sources_by_type']:
+    if stats['sources_by_type']:
         output.append("\nSources by Type:")
-        for st in reg_stats['sources_by_type']:
-            output.append(f"  {st['source_type']}: {st['count']}")
+        for source_type, count in stats['sources_by_type'].items():
+            output.append(f"  {source_type}: {count}")
     
-    if chroma_stats.get('documents_by_type'):
+    if stats.get('documents_by_type'):
         output.append("\nDocuments by Type:")
-        for doc_type, count in chroma_stats['documents_by_type'].items():
+        for doc_type, count in stats['documents_by_type'].items():
             output.append(f"  {doc_type}: {count}")
+    if stats.get('counts_stale'):
+        output.append("  (counts out of date; run `smartdoc stats --recount`)")
+    
+    cache_stats = stats.get('embedding_cache')
+    if cache_stats is not None:
+        output.append("\nEmbedding Cache:")
+        output.append(f"  Entries: {cache_stats['entries']} ({cache_stats['size_mb']:.1f}MB)")
+        output.append(f"  Hit rate: {cache_stats['hit_rate']:.1%} ({cache_stats['hits']} hits, {cache_stats['misses']} misses)")
+    
+    output.append("\nServer:")
+    if STATE.context.warmup_seconds is not None:
+        output.append(f"  Warmup: {STATE.context.warmup_seconds:.2f}s")
+    if STATE.time_to_first_query is not None:
+        output.append(f"  Time to first query: {STATE.time_to_first_query:.2f}s")
+    else:
+        output.append("  Time to first query: (no query yet)")
     
     return '\n'.join(output)
 
@@ -207,12 +395,20 @@ def handle_tool_call(tool_name: str, arguments: Dict[str, Any]) -> str:
             return handle_fetch_repo(arguments)
         elif tool_name == "smartdoc_index_web":
             return handle_index_web(arguments)
+        elif tool_name == "smartdoc_ingest_batch":
+            return handle_ingest_batch(arguments)
         elif tool_name == "smartdoc_query":
             return handle_query(arguments)
+        elif tool_name == "smartdoc_query_batch":
+            return handle_query_batch(arguments)
         elif tool_name == "smartdoc_list_sources":
             return handle_list_sources(arguments)
         elif tool_name == "smartdoc_stats":
             return handle_stats(arguments)
+        elif tool_name == "smartdoc_job_status":
+            return handle_job_status(arguments)
+        elif tool_name == "smartdoc_job_cancel":
+            return handle_job_cancel(arguments)
         else:
             return f"Unknown tool: {tool_name}"
     except Exception as e:
@@ -226,7 +422,7 @@ def get_tool_definitions():
         "tools": [
             {
                 "name": "smartdoc_index_pdf",
-                "description": "Index a PDF datasheet or technical document with automatic schematic analysis. Use this when the user asks to index, add, or process a PDF file.",
+                "description": "Index a PDF datasheet or technical document with automatic schematic analysis. Use this when the user asks to index, add, or process a PDF file. Runs in the background and returns a job id.",
                 "inputSchema": {
                     "type": "object",
                     "properties": {
@@ -242,6 +438,11 @@ def get_tool_definitions():
                         "initial_query": {
                             "type": "string",
                             "description": "Optional initial query context for better schematic analysis (e.g., 'SPI and I2C pinout')"
+                        },
+                        "resume": {
+                            "type": "boolean",
+                            "description": "Continue an interrupted indexing of this PDF from its checkpoint, skipping text extraction and schematics already analyzed",
+                            "default": False
                         }
                     },
                     "required": ["pdf_path"]
@@ -249,7 +450,7 @@ def get_tool_definitions():
             },
             {
                 "name": "smartdoc_fetch_repo",
-                "description": "Clone and index a GitHub repository with code-aware chunking. Use when user wants to index code from GitHub.",
+                "description": "Clone and index a GitHub repository with code-aware chunking. Use when user wants to index code from GitHub. Runs in the background and returns a job id.",
                 "inputSchema": {
                     "type": "object",
                     "properties": {
@@ -260,6 +461,11 @@ def get_tool_definitions():
                         "branch": {
                             "type": "string",
                             "description": "Optional branch name (default: main/master)"
+                        },
+                        "resume": {
+                            "type": "boolean",
+                            "description": "Continue an interrupted indexing of this repository from its checkpoint, reusing its clone",
+                            "default": False
                         }
                     },
                     "required": ["repo_url"]
@@ -267,7 +473,7 @@ def get_tool_definitions():
             },
             {
                 "name": "smartdoc_index_web",
-                "description": "Scrape and index a web page or documentation site. Use when user wants to index online documentation.",
+                "description": "Scrape and index a web page or documentation site. Use when user wants to index online documentation. Runs in the background and returns a job id.",
                 "inputSchema": {
                     "type": "object",
                     "properties": {
@@ -279,6 +485,34 @@ def get_tool_definitions():
                     "required": ["url"]
                 }
             },
+            {
+                "name": "smartdoc_ingest_batch",
+                "description": "Index many PDFs, repositories and web pages at once, several in parallel, from a YAML manifest or an inline source list. Use when onboarding a project with many documents. Runs in the background and returns a job id; the job summary lists each source's status, chunk count and duration.",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "manifest_path": {
+                            "type": "string",
+                            "description": "Path to a YAML manifest with a 'sources' list (entries like {pdf: 'docs/*.pdf'}, {repo: URL, branch: NAME}, {web: URL})"
+                        },
+                        "sources": {
+                            "type": "array",
+                            "description": "Manifest entries given inline instead of a file",
+                            "items": {"type": "object"}
+                        },
+                        "workers": {
+                            "type": "integer",
+                            "description": "Sources indexed at once (default: 4)",
+                            "minimum": 1
+                        },
+                        "resume": {
+                            "type": "boolean",
+                            "description": "Continue interrupted PDFs and repositories from their checkpoints",
+                            "default": False
+                        }
+                    }
+                }
+            },
             {
                 "name": "smartdoc_query",
                 "description": "Query the indexed documentation with semantic search. Returns relevant information with source citations. Use this to answer technical questions about indexed content.",
@@ -307,9 +541,38 @@ def get_tool_definitions():
                     "required": ["query"]
                 }
             },
+            {
+                "name": "smartdoc_query_batch",
+                "description": "Run several related questions against the indexed documentation in one batched search. Prefer this over repeated smartdoc_query calls when you have multiple questions.",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "queries": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "The questions or search queries"
+                        },
+                        "reprocess": {
+                            "type": "boolean",
+                            "description": "Whether to reprocess schematics with query-specific context for low-confidence answers",
+                            "default": False
+                        },
+                        "source_filter": {
+                            "type": "string",
+                            "description": "Optional filter by specific source path/URL (applies to all queries)"
+                        },
+                        "source_type": {
+                            "type": "string",
+                            "enum": ["pdf", "github", "web"],
+                            "description": "Optional filter by source type (applies to all queries)"
+                        }
+                    },
+                    "required": ["queries"]
+                }
+            },
             {
                 "name": "smartdoc_list_sources",
-                "description": "List all indexed sources in the database. Use to show what documentation is available.",
+                "description": "List indexed sources in the database, newest first, one page at a time. Use to show what documentation is available.",
                 "inputSchema": {
                     "type": "object",
                     "properties": {
@@ -318,6 +581,17 @@ def get_tool_definitions():
                             "enum": ["pdf", "github", "web", "all"],
                             "description": "Filter by source type (default: all)",
                             "default": "all"
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "description": "Sources per page (default: 50)",
+                            "default": 50,
+                            "minimum": 1,
+                            "maximum": 500
+                        },
+                        "cursor": {
+                            "type": "string",
+                            "description": "Cursor returned with the previous page, to continue the listing"
                         }
                     }
                 }
@@ -329,82 +603,155 @@ def get_tool_definitions():
                     "type": "object",
                     "properties": {}
                 }
+            },
+            {
+                "name": "smartdoc_job_status",
+                "description": "Show the state and progress of an indexing job started by smartdoc_index_pdf, smartdoc_fetch_repo or smartdoc_index_web, or of all jobs if no id is given.",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "job_id": {
+                            "type": "string",
+                            "description": "Job id returned by an indexing tool (default: list all jobs)"
+                        }
+                    }
+                }
+            },
+            {
+                "name": "smartdoc_job_cancel",
+                "description": "Cancel a queued or running indexing job. A running job stops at its next progress checkpoint.",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "job_id": {
+                            "type": "string",
+                            "description": "Job id returned by an indexing tool"
+                        }
+                    },
+                    "required": ["job_id"]
+                }
             }
         ]
     }
 
 
-def main():
-    """Main MCP server loop."""
-    logger.info("SmartDoc2 MCP Server starting...")
+def handle_request(request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Build the JSON-RPC response for one request (runs on a worker thread)."""
+    method = request.get("method")
+    params = request.get("params") or {}
+    request_id = request.get("id")
     
-    while True:
-        try:
-            request = read_request()
-            
-            if request is None:
-                break
-            
-            method = request.get("method")
-            params = request.get("params", {})
-            request_id = request.get("id")
-            
-            response = {"jsonrpc": "2.0", "id": request_id}
-            
-            if method == "initialize":
-                response["result"] = {
-                    "protocolVersion": "0.1.0",
-                    "capabilities": {
-                        "tools": {}
-                    },
-                    "serverInfo": {
-                        "name": "smartdoc",
-                        "version": "0.1.0"
-                    }
-                }
-            
-            elif method == "tools/list":
-                response["result"] = get_tool_definitions()
-            
-            elif method == "tools/call":
-                tool_name = params.get("name")
-                arguments = params.get("arguments", {})
-                
-                result_text = handle_tool_call(tool_name, arguments)
-                
-                response["result"] = {
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": result_text
-                        }
-                    ]
-                }
-            
-            else:
-                response["error"] = {
-                    "code": -32601,
-                    "message": f"Method not found: {method}"
+    response = {"jsonrpc": "2.0", "id": request_id}
+    
+    if method == "initialize":
+        STATE.start_warmup()
+        response["result"] = {
+            "protocolVersion": "0.1.0",
+            "capabilities": {
+                "tools": {}
+            },
+            "serverInfo": {
+                "name": "smartdoc",
+                "version": "0.1.0"
+            }
+        }
+    
+    elif method == "tools/list":
+        response["result"] = get_tool_definitions()
+    
+    elif method == "tools/call":
+        tool_name = params.get("name")
+        arguments = params.get("arguments", {})
+        
+        result_text = handle_tool_call(tool_name, arguments)
+        
+        response["result"] = {
+            "content": [
+                {
+                    "type": "text",
+                    "text": result_text
                 }
+            ]
+        }
+    
+    elif request_id is None:
+        # Notification (e.g. notifications/initialized): no reply
+        return None
+    
+    else:
+        response["error"] = {
+            "code": -32601,
+            "message": f"Method not found: {method}"
+        }
+    
+    return response
+
+
+async def serve_request(request: Dict[str, Any], executor: ThreadPoolExecutor):
+    """Handle one request off the loop and write its response."""
+    loop = asyncio.get_running_loop()
+    try:
+        response = await loop.run_in_executor(executor, handle_request, request)
+    except Exception as e:
+        logger.error(f"Server error: {e}", exc_info=True)
+        response = {
+            "jsonrpc": "2.0",
+            "id": request.get("id"),
+            "error": {
+                "code": -32603,
+                "message": str(e)
+            }
+        }
+    if response is not None:
+        write_response(response)
+
+
+async def serve():
+    """Read requests from stdin and serve each one concurrently."""
+    loop = asyncio.get_running_loop()
+    reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="smartdoc-stdin")
+    executor = ThreadPoolExecutor(max_workers=QUERY_WORKERS, thread_name_prefix="smartdoc-query")
+    pending = set()
+    
+    try:
+        while True:
+            line = await loop.run_in_executor(reader, sys.stdin.readline)
+            if not line:
+                break
+            if not line.strip():
+                continue
             
-            write_response(response)
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.error(f"Failed to parse JSON: {e}")
+                continue
             
-        except KeyboardInterrupt:
-            logger.info("Server shutting down...")
-            break
-        except Exception as e:
-            logger.error(f"Server error: {e}", exc_info=True)
-            error_response = {
-                "jsonrpc": "2.0",
-                "id": request.get("id") if request else None,
-                "error": {
-                    "code": -32603,
-                    "message": str(e)
-                }
-            }
-            write_response(error_response)
+            task = asyncio.create_task(serve_request(request, executor))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        
+        # stdin closed: answer what is in flight before exiting
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+    finally:
+        JOBS.shutdown()
+        executor.shutdown(wait=False)
+        reader.shutdown(wait=False)
+
+
+def main():
+    """Main MCP server loop."""
+    logger.info("SmartDoc2 MCP Server starting...")
+    
+    # Keep stray prints from corrupting the protocol stream
+    sys.stdout = sys.stderr
+    
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        logger.info("Server shutting down...")
 
 
 if __name__ == "__main__":
     main()
-